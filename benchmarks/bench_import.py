@@ -0,0 +1,55 @@
+"""
+Import-time benchmark for `import autoagent.tools`.
+
+Each sample runs in a fresh interpreter. Reports the cost of the bare import
+(registry + manifest only) and of the import plus the first lookup of one
+tool (which pulls in pydantic and that tool's module), plus the heaviest
+modules from `-X importtime` for the bare import.
+
+    python benchmarks/bench_import.py [--runs 10]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+CASES = {
+    "import": "import autoagent.tools",
+    "import+first_lookup": "import autoagent.tools as t; t.tool_registry['menu_lookup']",
+}
+
+TIMER = "import time; _s = time.perf_counter(); {stmt}; print((time.perf_counter() - _s) * 1000)"
+
+
+def sample(stmt: str) -> float:
+    out = subprocess.run([sys.executable, "-c", TIMER.format(stmt=stmt)],
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def heaviest(stmt: str, top: int = 8):
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", stmt],
+                         capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = [p.strip() for p in line.split(":", 1)[1].split("|")]
+        rows.append((int(cumulative_us), name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    for name, stmt in CASES.items():
+        samples = sorted(sample(stmt) for _ in range(args.runs))
+        print(name, {"median_ms": round(statistics.median(samples), 1), "min_ms": round(samples[0], 1)})
+    print("heaviest (cumulative us):", heaviest(CASES["import"]))
+
+
+if __name__ == "__main__":
+    main()
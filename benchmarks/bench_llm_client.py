@@ -0,0 +1,65 @@
+"""
+Tail latency and error handling of LLMClient against the local fake server.
+
+Scenarios:
+  - slow_tail: 5% of responses take +800ms; plain calls vs p95-hedged calls
+  - flaky: 20% 500s and 10% 429s (Retry-After 50ms); no retries vs retries
+
+    python benchmarks/bench_llm_client.py [--calls 300] [--concurrency 8]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from autoagent.llm.client import LLMClient
+from autoagent.llm.retry import RetryPolicy
+
+from fake_openai_server import start_fake_server
+
+MESSAGES = [{"role": "user", "content": "What is on the menu today?"}]
+
+
+def run(client: LLMClient, calls: int, concurrency: int) -> dict:
+    def one(_):
+        start = time.perf_counter()
+        try:
+            client.chat(MESSAGES, max_tokens=32)
+            ok = True
+        except Exception:
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, range(calls)))
+    lat = sorted(ms for ms, ok in results if ok)
+    pick = lambda q: round(lat[min(len(lat) - 1, int(len(lat) * q))], 1) if lat else None
+    return {"ok": len(lat), "errors": calls - len(lat), "p50_ms": pick(0.50), "p95_ms": pick(0.95),
+            "p99_ms": pick(0.99), "max_ms": round(lat[-1], 1) if lat else None}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server, url = start_fake_server(latency_ms=20, jitter_ms=5, tail_prob=0.05, tail_ms=800)
+    plain = RetryPolicy(timeout=5.0, max_retries=0)
+    hedged = RetryPolicy(timeout=5.0, max_retries=0, hedge_after="p95", hedge_min_samples=20)
+    # warm the latency window so p95 hedging is active from the first measured call
+    run(LLMClient("sk-fake", "fake-model", base_url=url, retry=hedged), 40, args.concurrency)
+    print("slow_tail/plain ", run(LLMClient("sk-fake", "fake-model", base_url=url, retry=plain), args.calls, args.concurrency))
+    print("slow_tail/hedged", run(LLMClient("sk-fake", "fake-model", base_url=url, retry=hedged), args.calls, args.concurrency))
+    server.shutdown()
+
+    server, url = start_fake_server(latency_ms=20, jitter_ms=5, error_rate=0.2, rate_limit_rate=0.1, retry_after=0.05)
+    no_retry = RetryPolicy(timeout=5.0, max_retries=0)
+    retrying = RetryPolicy(timeout=5.0, max_retries=4, base_delay=0.05)
+    print("flaky/no_retry  ", run(LLMClient("sk-fake", "fake-model", base_url=url, retry=no_retry), args.calls, args.concurrency))
+    print("flaky/retry     ", run(LLMClient("sk-fake", "fake-model", base_url=url, retry=retrying), args.calls, args.concurrency))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
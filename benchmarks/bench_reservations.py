@@ -0,0 +1,89 @@
+"""
+Load test: thousands of concurrent booking attempts against ReservationEngine.
+
+Threads (and optionally several processes sharing the same SQLite file)
+hammer a handful of restaurants and evening slots, then the database is
+checked for overbooking.
+
+    python benchmarks/bench_reservations.py [--attempts 5000] [--threads 64] [--processes 1]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from autoagent.tools.builtin_tools.reservation import ReservationEngine
+
+RESTAURANTS = [f"r{i}" for i in range(5)]
+SEATS = 40
+
+
+def worker(path: str, attempts: int, threads: int, seed: int) -> dict:
+    engine = ReservationEngine(path, default_seats=SEATS)
+    rng = random.Random(seed)
+    base = datetime(2030, 6, 1, 18, 0)
+    jobs = []
+    for _ in range(attempts):
+        batch = [(rng.choice(RESTAURANTS), base + timedelta(minutes=15 * rng.randrange(12)), rng.randint(1, 6))
+                 for _ in range(1 if rng.random() < 0.9 else 3)]
+        jobs.append(batch)
+
+    def attempt(batch):
+        try:
+            engine.book_many(batch)
+            return "confirmed"
+        except ValueError:
+            return "full"
+        except TimeoutError:
+            return "gave_up"
+
+    with ThreadPoolExecutor(threads) as pool:
+        outcomes = list(pool.map(attempt, jobs))
+    return {k: outcomes.count(k) for k in ("confirmed", "full", "gave_up")} | {"conflicts": engine.conflicts}
+
+
+def max_occupancy(path: str) -> int:
+    conn = sqlite3.connect(path)
+    row = conn.execute("SELECT MAX(booked) FROM slots").fetchone()
+    conn.close()
+    return row[0] or 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--attempts", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "reservations.db")
+        ReservationEngine(path).is_available(RESTAURANTS[0], datetime(2030, 6, 1), 1)  # create schema
+        per_proc = args.attempts // args.processes
+        start = time.perf_counter()
+        if args.processes == 1:
+            results = [worker(path, per_proc, args.threads, 0)]
+        else:
+            with mp.get_context("spawn").Pool(args.processes) as pool:
+                results = pool.starmap(worker, [(path, per_proc, args.threads, i) for i in range(args.processes)])
+        elapsed = time.perf_counter() - start
+
+        totals = {k: sum(r[k] for r in results) for k in results[0]}
+        peak = max_occupancy(path)
+        print({
+            **totals,
+            "attempts": per_proc * args.processes,
+            "attempts_per_s": round(per_proc * args.processes / elapsed, 1),
+            "max_slot_occupancy": peak,
+            "overbooked": peak > SEATS,
+        })
+
+
+if __name__ == "__main__":
+    main()
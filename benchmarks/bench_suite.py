@@ -0,0 +1,359 @@
+"""
+Benchmark suite against the local fake OpenAI server.
+
+Groups (select with --groups):
+  - agents:     every agent type in AGENT_MAP, one turn per call
+  - retrievers: every retriever in rag/retrievers over a FAISS corpus
+  - stores:     vector store query latency at 10k / 100k / 1M vectors
+  - tools:      run_tool on the builtin tools
+
+Each case reports throughput and p50/p99/mean latency. Results are written
+as JSON (--out) with the git revision and settings, and --compare prints
+the change against an earlier run (exit code 1 if any p50 regressed by
+more than --threshold).
+
+    python benchmarks/bench_suite.py --out results.json
+    python benchmarks/bench_suite.py --groups stores --sizes 10000,100000 --out new.json --compare results.json
+
+Needs faiss-cpu and numpy (project dependencies); chromadb is benchmarked
+when installed, up to --chroma-max vectors.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+os.environ.setdefault("AUTOAGENT_RESERVATIONS_DB", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+from fake_openai_server import start_fake_server
+
+BENCH_MENU = [{"item_name": n, "price": 3.5} for n in ("Latte", "Espresso", "Mocha", "Cold brew")]
+
+REACT_TOOL_CALL = json.dumps({"action": "menu_lookup", "input": {"restaurant_id": "r1", "item_name": "Latte"}})
+REACT_FINAL = json.dumps({"action": "final_answer", "output": "A latte costs 4.50."})
+
+# Scripted replies so every agent takes its normal path (tool call, code, scores, ...)
+RULES = [
+    ("Observation", REACT_FINAL),                         # ReAct: answer after one tool call
+    ("Question: ", REACT_TOOL_CALL),                      # ReAct: first step
+    ("Write Python code", "```python\nprint(sum(range(10)))\n```"),
+    ("Reply with one line per candidate", "0: 0.9\n1: 0.5\n2: 0.4"),  # ToT scoring
+    ("VERDICT", "VERDICT: OK"),                           # self-refine critique
+    ("how relevant is the following passage", "0.7"),     # reranker
+    ("Break this into 3 specific search queries", "latte price\nlatte size\nlatte milk"),
+    ("GOAL COMPLETE", "GOAL COMPLETE: done."),            # autonomous agent
+]
+
+QUESTION = "How much is a latte at r1?"
+
+
+def measure(fn: Callable[[int], object], iterations: int, concurrency: int, warmup: int = 2) -> dict:
+    for i in range(warmup):
+        fn(i)
+    latencies, errors = [], 0
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            fn(i)
+            return (time.perf_counter() - start) * 1000, None
+        except Exception as exc:  # recorded, the run continues
+            return None, f"{type(exc).__name__}: {exc}"
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        results = [one(i) for i in range(iterations)]
+    else:
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(one, range(iterations)))
+    wall = time.perf_counter() - start
+    first_error = None
+    for ms, err in results:
+        if err is None:
+            latencies.append(ms)
+        else:
+            errors += 1
+            first_error = first_error or err
+    latencies.sort()
+    pick = lambda q: round(latencies[min(len(latencies) - 1, int(len(latencies) * q))], 3) if latencies else None
+    row = {
+        "iterations": iterations, "concurrency": concurrency, "errors": errors,
+        "throughput_per_s": round(len(latencies) / wall, 2) if wall else None,
+        "p50_ms": pick(0.50), "p99_ms": pick(0.99),
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else None,
+    }
+    if first_error:
+        row["first_error"] = first_error
+    return row
+
+
+# ---------------------------------------------------------------- agents
+
+def bench_agents(args, base_url: str, retriever) -> List[dict]:
+    from autoagent.llm.factory import AGENT_MAP
+    from autoagent.tools import tool_registry
+    from autoagent.tools.builtin_tools.menu_lookup import menu_catalog
+
+    menu_catalog.load("r1", BENCH_MENU)
+    config = {"api_key": "sk-fake", "model": "fake-model", "base_url": base_url, "source": "bench"}
+    tools = {name: tool_registry[name] for name in ("menu_lookup", "menu_bulk_lookup")}
+    params = {
+        "rag": {"retriever": retriever},
+        "tot": {"depth": 2},
+        "code": {"max_attempts": 1},
+        "autonomous": {"max_iters": 2},
+        "self_refine": {"iterations": 2},
+    }
+    rows = []
+    for agent_type, agent_cls in AGENT_MAP.items():
+        def turn(i, agent_cls=agent_cls, kw=params.get(agent_type, {})):
+            agent = agent_cls(config, tools, **kw)
+            return agent.run(f"{QUESTION} #{i}", context=[])
+        rows.append({"group": "agents", "name": agent_type,
+                     **measure(turn, args.iterations, args.concurrency)})
+        print_row(rows[-1])
+    return rows
+
+
+# ---------------------------------------------------------------- retrievers
+
+class KeywordStore:
+    """Naive keyword index standing in for HybridRAG's text_store."""
+
+    def __init__(self, docs: List[dict]):
+        self.docs = docs
+
+    def keyword_search(self, query: str, top_k: int) -> List[dict]:
+        words = set(query.lower().split())
+        hits = []
+        for doc in self.docs:
+            score = len(words & set(doc["text"].lower().split()))
+            if score:
+                hits.append({**doc, "score": float(score)})
+                if len(hits) >= top_k:
+                    break
+        return hits
+
+
+def build_corpus(base_url: str, size: int, dim: int):
+    """FAISSStore filled with `size` docs embedded by the fake server."""
+    import faiss
+    from autoagent.rag.embedder import OpenAIEmbedder
+    from autoagent.rag.vector_store import FAISSStore
+
+    embedder = OpenAIEmbedder("sk-fake", base_url=base_url)
+    store = FAISSStore(index=faiss.IndexFlatL2(dim))
+    docs = [{"source": f"doc{i}", "text": f"menu item {i} latte espresso price {i % 97}"} for i in range(size)]
+    for i in range(0, size, 256):
+        batch = docs[i:i + 256]
+        store.add(embedder.embed([d["text"] for d in batch]), batch)
+    return store, docs
+
+
+def bench_retrievers(args, base_url: str) -> tuple:
+    from autoagent.rag.reranker import Reranker
+    from autoagent.llm.client import LLMClient
+    from autoagent.rag.retrievers.contextual_rag import ContextualRAG
+    from autoagent.rag.retrievers.hybrid_rag import HybridRAG
+    from autoagent.rag.retrievers.hyde_rag import HyDERAG
+    from autoagent.rag.retrievers.long_rag import LongRAG
+    from autoagent.rag.retrievers.query_based_rag import QueryBasedRAG
+    from autoagent.rag.retrievers.speculative_rag import SpeculativeRAG
+    from autoagent.rag.retrievers.standard_rag import StandardRAG
+    from autoagent.rag.embedder import OpenAIEmbedder
+
+    store, docs = build_corpus(base_url, args.corpus, args.dim)
+    standard = StandardRAG("sk-fake", store)
+    retrievers = {
+        "standard": standard,
+        "long": LongRAG("sk-fake", store),
+        "contextual": ContextualRAG(standard),
+        "hybrid": HybridRAG(KeywordStore(docs), standard),
+        "hybrid_rerank": HybridRAG(KeywordStore(docs), standard, Reranker(LLMClient("sk-fake", "fake-model"))),
+        "hyde": HyDERAG("sk-fake", "fake-model", "text-embedding-ada-002", store),
+        "query_based": QueryBasedRAG("sk-fake", "fake-model", standard),
+        "speculative": SpeculativeRAG("sk-fake", "fake-model", OpenAIEmbedder("sk-fake"), store),
+    }
+    rows = []
+    for name, retriever in retrievers.items():
+        fn = lambda i, r=retriever: r.retrieve(f"latte price {i}", top_k=5)
+        rows.append({"group": "retrievers", "name": name, "corpus": args.corpus,
+                     **measure(fn, args.iterations, args.concurrency)})
+        print_row(rows[-1])
+    return rows, standard
+
+
+# ---------------------------------------------------------------- vector stores
+
+def bench_stores(args) -> List[dict]:
+    import numpy as np
+    import faiss
+    from autoagent.rag.vector_store import FAISSStore
+
+    try:
+        import chromadb
+    except ImportError:
+        chromadb = None
+
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((256, args.dim), dtype=np.float32)
+    rows = []
+    for size in args.sizes:
+        vectors = rng.standard_normal((size, args.dim), dtype=np.float32)
+        metas = [{"source": f"doc{i}"} for i in range(size)]
+
+        store = FAISSStore(index=faiss.IndexFlatL2(args.dim))
+        start = time.perf_counter()
+        store.index.add(vectors)  # bulk load without the list round-trip of add()
+        store.metadatas.extend(metas)
+        build_s = time.perf_counter() - start
+        fn = lambda i, s=store: s.query(queries[i % len(queries)].tolist(), top_k=10)
+        rows.append({"group": "stores", "name": "faiss_flat_l2", "vectors": size, "dim": args.dim,
+                     "build_s": round(build_s, 3), **measure(fn, args.store_queries, 1)})
+        print_row(rows[-1])
+
+        if chromadb is not None and size <= args.chroma_max:
+            from autoagent.rag.vector_store import ChromaStore
+            store = ChromaStore(chromadb.EphemeralClient(), collection_name=f"bench_{size}")
+            start = time.perf_counter()
+            store.add(vectors.tolist(), metas)
+            build_s = time.perf_counter() - start
+            fn = lambda i, s=store: s.query(queries[i % len(queries)].tolist(), top_k=10)
+            rows.append({"group": "stores", "name": "chroma", "vectors": size, "dim": args.dim,
+                         "build_s": round(build_s, 3), **measure(fn, args.store_queries, 1)})
+            print_row(rows[-1])
+        del vectors, metas, store
+    return rows
+
+
+# ---------------------------------------------------------------- tools
+
+def bench_tools(args) -> List[dict]:
+    from autoagent.tools import run_tool
+    from autoagent.tools.builtin_tools.menu_lookup import menu_catalog
+
+    menu_catalog.load("r1", BENCH_MENU)
+    cases = {
+        "menu_lookup": lambda i: run_tool("menu_lookup", {"restaurant_id": "r1", "item_name": "Latte"}),
+        "menu_bulk_lookup": lambda i: run_tool("menu_bulk_lookup", {
+            "restaurant_id": "r1", "item_names": ["Latte", "Espresso", "Mocha", "Cold brew"]}),
+        "menu_lookup_timeout": lambda i: run_tool(
+            "menu_lookup", {"restaurant_id": "r1", "item_name": "Latte"}, timeout=2.0),
+        "reservation": lambda i: run_tool("reservation", {
+            "date": f"2030-01-{i % 28 + 1:02d}", "time": f"{12 + i % 10}:00", "party_size": 2,
+            "restaurant_id": f"bench{i % 50}"}),
+    }
+    rows = []
+    for name, fn in cases.items():
+        rows.append({"group": "tools", "name": name,
+                     **measure(fn, args.tool_calls, args.concurrency)})
+        print_row(rows[-1])
+    return rows
+
+
+# ---------------------------------------------------------------- output
+
+def print_row(row: dict):
+    extra = {k: row[k] for k in ("corpus", "vectors") if k in row}
+    print(f"{row['group']:10s} {row['name']:20s} {extra or ''} "
+          f"{row['throughput_per_s']}/s p50 {row['p50_ms']}ms p99 {row['p99_ms']}ms errors {row['errors']}",
+          flush=True)
+
+
+def case_key(row: dict) -> tuple:
+    return row["group"], row["name"], row.get("vectors"), row.get("corpus"), row.get("concurrency")
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(rows: List[dict], baseline_path: str, threshold: float) -> bool:
+    """Print p50/p99 changes against a previous result file; True if nothing regressed."""
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = {case_key(r): r for r in json.load(fh)["results"]}
+    ok = True
+    print(f"\ncompared with {baseline_path} (threshold {threshold:.0%}):")
+    for row in rows:
+        old = baseline.get(case_key(row))
+        if not old or not old.get("p50_ms") or not row.get("p50_ms"):
+            continue
+        change = row["p50_ms"] / old["p50_ms"] - 1
+        flag = "REGRESSION" if change > threshold else ""
+        ok = ok and not flag
+        print(f"  {row['group']:10s} {row['name']:20s} p50 {old['p50_ms']} -> {row['p50_ms']}ms "
+              f"({change:+.1%})  p99 {old['p99_ms']} -> {row['p99_ms']}ms {flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", default="agents,retrievers,stores,tools")
+    parser.add_argument("--iterations", type=int, default=50, help="calls per agent/retriever case")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="fake server base latency")
+    parser.add_argument("--tokens-per-s", type=float, default=0.0, help="fake generation speed (0: instant)")
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--corpus", type=int, default=10000, help="documents behind the retrievers")
+    parser.add_argument("--sizes", default="10000,100000,1000000",
+                        type=lambda s: [int(x) for x in s.split(",")], help="vector store sizes")
+    parser.add_argument("--store-queries", type=int, default=200)
+    parser.add_argument("--chroma-max", type=int, default=100000)
+    parser.add_argument("--tool-calls", type=int, default=2000)
+    parser.add_argument("--out", help="write JSON results here")
+    parser.add_argument("--compare", help="earlier JSON results to diff against")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+    groups = set(args.groups.split(","))
+
+    server, base_url = start_fake_server(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 10,
+                                         tokens_per_s=args.tokens_per_s, dim=args.dim, rules=RULES)
+    # retrievers build LLMClients without a base_url; the SDK falls back to this
+    os.environ["OPENAI_BASE_URL"] = base_url
+
+    rows, retriever = [], None
+    if "retrievers" in groups or "agents" in groups:
+        if "retrievers" in groups:
+            group_rows, retriever = bench_retrievers(args, base_url)
+            rows += group_rows
+        else:
+            from autoagent.rag.retrievers.standard_rag import StandardRAG
+            retriever = StandardRAG("sk-fake", build_corpus(base_url, args.corpus, args.dim)[0])
+    if "agents" in groups:
+        rows += bench_agents(args, base_url, retriever)
+    if "tools" in groups:
+        rows += bench_tools(args)
+    if "stores" in groups:
+        rows += bench_stores(args)
+    server.shutdown()
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "results": rows,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    if args.compare and not compare(rows, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Micro-benchmark: per-call overhead of run_tool with a timeout.
+
+Compares the previous strategy (new tool instance + a throwaway
+ThreadPoolExecutor per call) with the shared tool executor and cached
+stateless instances.
+
+    python benchmarks/bench_tool_runner.py [--calls 5000]
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from autoagent.tools import run_tool, tool_registry
+from autoagent.tools.builtin_tools.menu_lookup import menu_catalog
+
+
+def per_call_executor(tool_name: str, input_data: dict, timeout: float) -> dict:
+    """The pre-pool run_tool execution path, kept here as the baseline."""
+    tool = tool_registry[tool_name]()
+    parsed = tool.input_model.parse_obj(input_data)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        out = executor.submit(tool.execute, parsed).result(timeout=timeout)
+    return out.dict()
+
+
+def measure(fn, calls: int) -> dict:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        "mean_us": round(statistics.fmean(samples), 1),
+        "p50_us": round(samples[len(samples) // 2], 1),
+        "p99_us": round(samples[int(len(samples) * 0.99) - 1], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    menu_catalog.load("r1", [{"item_name": "Latte", "price": 3.5}])
+    payload = {"restaurant_id": "r1", "item_name": "Latte"}
+    cases = {
+        "per_call_executor": lambda: per_call_executor("menu_lookup", payload, 2.0),
+        "shared_executor": lambda: run_tool("menu_lookup", payload, timeout=2.0),
+    }
+    for name, fn in cases.items():
+        fn()  # warm-up
+        print(name, measure(fn, args.calls))
+
+
+if __name__ == "__main__":
+    main()
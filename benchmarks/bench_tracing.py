@@ -0,0 +1,108 @@
+"""
+Overhead of span tracing, disabled and enabled.
+
+  - micro: a trivial traced function and a `with span(...)` block against
+    an untraced baseline
+  - run_tool: a cheap builtin tool through run_tool
+  - turn: AgentRunner.handle_message on a CoT flow against the local fake
+    OpenAI server with no injected latency (so overhead is not hidden)
+
+Backends measured: disabled, memory, and otel when opentelemetry-sdk is
+installed (spans go to a provider with no exporter). The turn is also run
+with a RequestProfiler attached (stage timings plus the stack sampler).
+
+    python benchmarks/bench_tracing.py [--calls 20000] [--turns 300]
+"""
+
+import argparse
+import os
+import time
+
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("FERNET_SECRET", Fernet.generate_key().decode())
+
+from autoagent.config.llm_config import BaseConfig, TenantConfig, UserConfig
+from autoagent.executor.agent_runner import AgentRunner
+from autoagent.telemetry import tracing
+from autoagent.telemetry.profiling import RequestProfiler
+from autoagent.tools import run_tool
+from autoagent.tools.builtin_tools.menu_lookup import menu_catalog
+
+from fake_openai_server import start_fake_server
+
+
+def plain(x):
+    return x + 1
+
+@tracing.traced("bench.traced")
+def traced_fn(x):
+    return x + 1
+
+def with_span(x):
+    with tracing.span("bench.span", n=x):
+        return x + 1
+
+
+def per_call_us(fn, calls: int) -> float:
+    fn(0)  # warm-up
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def backends():
+    yield "disabled", tracing.disable
+    yield "memory", lambda: tracing.enable("memory")
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.trace import TracerProvider
+    except ImportError:
+        return
+    trace.set_tracer_provider(TracerProvider())
+    yield "otel", lambda: tracing.enable("otel")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--turns", type=int, default=300)
+    args = parser.parse_args()
+
+    server, url = start_fake_server(latency_ms=0, jitter_ms=0)
+    fernet = Fernet(os.environ["FERNET_SECRET"].encode())
+    base_cfg = BaseConfig(fernet.encrypt(b"sk-fake").decode(), model="fake-model", base_url=url)
+    runner = AgentRunner(base_cfg, {})
+    menu_catalog.load("r1", [{"item_name": "Latte", "price": 3.5}])
+    payload = {"restaurant_id": "r1", "item_name": "Latte"}
+
+    print(f"baseline (untraced fn)  {per_call_us(plain, args.calls):.3f} us/call")
+    for name, switch in backends():
+        switch()
+        tracing.recorder.clear()
+        # fresh session per backend, so every run starts from the same history length
+        runner.start_session(name, TenantConfig(False, tenant_id="bench"), UserConfig(False),
+                             {"qa": {"agent_type": "cot"}})
+        micro_traced = per_call_us(traced_fn, args.calls)
+        micro_span = per_call_us(with_span, args.calls)
+        tool = per_call_us(lambda _: run_tool("menu_lookup", payload), args.calls // 10)
+        turn = per_call_us(lambda i: runner.handle_message(name, f"question {i}", "qa"), args.turns)
+        print(f"{name:9s} traced_fn {micro_traced:.3f} us  span {micro_span:.3f} us  "
+              f"run_tool {tool:.1f} us  turn {turn / 1000:.2f} ms")
+    tracing.disable()
+
+    for mode in (None, "sample", "cprofile"):
+        name = f"profiler-{mode}"
+        profiler = RequestProfiler(threshold_ms=float("inf"), mode=mode)
+        runner.profiler = profiler
+        runner.start_session(name, TenantConfig(False, tenant_id="bench"), UserConfig(False),
+                             {"qa": {"agent_type": "cot"}})
+        turn = per_call_us(lambda i: runner.handle_message(name, f"question {i}", "qa"), args.turns)
+        print(f"{name:18s} turn {turn / 1000:.2f} ms")
+        profiler.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Micro-benchmark: per-call validation overhead in run_tool.
+
+"before" is the pydantic v1-style path run_tool used to take
+(parse_obj + .dict() + stringified input size); "after" is the current
+validate_input / dump_output path, for a trusted builtin tool and for the
+same tool with output re-validation enabled.
+
+    python benchmarks/bench_validation.py [--calls 20000]
+"""
+
+import argparse
+import statistics
+import time
+import warnings
+
+from autoagent.tools import tool_registry
+from autoagent.tools.builtin_tools.menu_lookup import menu_catalog
+from autoagent.tools.tool_runner import dump_output, validate_input, get_tool_instance
+
+
+def legacy_path(tool, payload):
+    parsed = tool.input_model.parse_obj(payload)
+    out = tool.execute(parsed)
+    len(str(payload).encode("utf-8"))
+    return out.dict()
+
+
+def current_path(tool, payload):
+    parsed = validate_input(tool, payload)
+    return dump_output(tool, tool.execute(parsed))
+
+
+def measure(fn, calls: int) -> dict:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        "mean_us": round(statistics.fmean(samples), 2),
+        "p50_us": round(samples[len(samples) // 2], 2),
+        "p99_us": round(samples[int(len(samples) * 0.99) - 1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    menu_catalog.load("r1", [{"item_name": "Latte", "price": 3.5}])
+    tool_cls = tool_registry["menu_lookup"]
+    trusted = get_tool_instance(tool_cls)
+    untrusted = tool_cls()
+    untrusted.trusted = False
+    payload = {"restaurant_id": "r1", "item_name": "Latte"}
+
+    cases = {
+        "before (parse_obj/.dict)": lambda: legacy_path(trusted, payload),
+        "after (trusted output)": lambda: current_path(trusted, payload),
+        "after (re-validated output)": lambda: current_path(untrusted, payload),
+    }
+    for name, fn in cases.items():
+        fn()
+        print(f"{name:30s}", measure(fn, args.calls))
+
+
+if __name__ == "__main__":
+    main()
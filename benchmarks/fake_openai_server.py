@@ -0,0 +1,237 @@
+"""
+Local fake OpenAI-compatible server for tests and benchmarks.
+
+Serves /v1/chat/completions (plain and SSE streaming), /v1/completions and
+/v1/embeddings with configurable latency, generation speed (tokens_per_s),
+slow-tail probability and error injection (`error_status`, 500 by default,
+and 429s carrying Retry-After). Embeddings are deterministic per input text. `rules` script
+replies: the first (substring, reply) whose substring occurs in the last
+message (or prompt) is answered with that reply instead of `answer`.
+
+    python benchmarks/fake_openai_server.py --port 8999 --latency-ms 30 --tail-prob 0.05 --tail-ms 800
+
+or in-process:
+
+    server, base_url = start_fake_server(latency_ms=20, error_rate=0.1)
+    ...
+    server.shutdown()
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+
+class FakeOptions:
+    def __init__(self, latency_ms: float = 20.0, jitter_ms: float = 5.0, tail_prob: float = 0.0,
+                 tail_ms: float = 500.0, error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 retry_after: float = 0.05, dim: int = 256, chunk_delay_ms: float = 2.0,
+                 tokens_per_s: float = 0.0, error_status: int = 500,
+                 answer: str = "This is a fake answer from the local test server.",
+                 rules: list = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tail_prob = tail_prob
+        self.tail_ms = tail_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.dim = dim
+        self.chunk_delay_ms = chunk_delay_ms
+        self.tokens_per_s = tokens_per_s  # 0: no generation delay beyond latency_ms
+        self.error_status = error_status  # status of the error_rate failures
+        self.answer = answer
+        self.rules = list(rules or [])
+
+    def reply_for(self, text: str) -> str:
+        for needle, reply in self.rules:
+            if needle in text:
+                return reply
+        return self.answer
+
+
+def completion_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def fake_embedding(text: str, dim: int):
+    """Deterministic unit vector derived from the text."""
+    rng = random.Random(hashlib.sha256(text.encode()).digest())
+    vec = [rng.gauss(0, 1) for _ in range(dim)]
+    norm = sum(v * v for v in vec) ** 0.5 or 1.0
+    return [v / norm for v in vec]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "FakeOpenAI/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def opts(self) -> FakeOptions:
+        return self.server.options
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _generation_delay(self, tokens: int):
+        if self.opts.tokens_per_s:
+            time.sleep(tokens / self.opts.tokens_per_s)
+
+    def _delay(self):
+        ms = max(0.0, random.gauss(self.opts.latency_ms, self.opts.jitter_ms))
+        if random.random() < self.opts.tail_prob:
+            ms += self.opts.tail_ms
+        time.sleep(ms / 1000.0)
+
+    def _inject_error(self) -> bool:
+        roll = random.random()
+        if roll < self.opts.rate_limit_rate:
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                            {"Retry-After": str(self.opts.retry_after),
+                             "retry-after-ms": str(int(self.opts.retry_after * 1000))})
+            return True
+        if roll < self.opts.rate_limit_rate + self.opts.error_rate:
+            self._send_json(self.opts.error_status,
+                            {"error": {"message": "Injected failure", "type": "server_error"}})
+            return True
+        return False
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "fake-model", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        req = json.loads(self.rfile.read(length) or b"{}")
+        with self.server.stats_lock:
+            self.server.stats[self.path] = self.server.stats.get(self.path, 0) + 1
+        self._delay()
+        if self._inject_error():
+            return
+        model = req.get("model", "fake-model")
+        now = int(time.time())
+        if self.path.endswith("/chat/completions"):
+            messages = req.get("messages", [])
+            prompt_tokens = sum(len(str(m.get("content", ""))) // 4 + 4 for m in messages)
+            answer = self.opts.reply_for(str(messages[-1].get("content", "")) if messages else "")
+            if req.get("stream"):
+                return self._stream(model, now, answer)
+            tokens = completion_tokens(answer)
+            self._generation_delay(tokens)
+            self._send_json(200, {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": now, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": answer}}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": tokens,
+                          "total_tokens": prompt_tokens + tokens},
+            })
+        elif self.path.endswith("/completions"):
+            prompt = str(req.get("prompt", ""))
+            answer = self.opts.reply_for(prompt)
+            tokens = completion_tokens(answer)
+            self._generation_delay(tokens)
+            self._send_json(200, {
+                "id": "cmpl-fake", "object": "text_completion", "created": now, "model": model,
+                "choices": [{"index": 0, "text": answer, "finish_reason": "stop", "logprobs": None}],
+                "usage": {"prompt_tokens": len(prompt) // 4 + 1, "completion_tokens": tokens,
+                          "total_tokens": len(prompt) // 4 + 1 + tokens},
+            })
+        elif self.path.endswith("/embeddings"):
+            inputs = req.get("input", [])
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            tokens = sum(len(t) // 4 + 1 for t in inputs)
+            self._send_json(200, {
+                "object": "list", "model": model,
+                "data": [{"object": "embedding", "index": i, "embedding": fake_embedding(t, self.opts.dim)}
+                         for i, t in enumerate(inputs)],
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            })
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def _stream(self, model: str, now: int, answer: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def emit(payload: str):
+            data = f"data: {payload}\n\n".encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        for word in answer.split(" "):
+            emit(json.dumps({
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": now, "model": model,
+                "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}],
+            }))
+            if self.opts.tokens_per_s:
+                self._generation_delay(completion_tokens(word + " "))
+            else:
+                time.sleep(self.opts.chunk_delay_ms / 1000.0)
+        emit("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return  # the client went away mid-reply, e.g. an abandoned stream
+        super().handle_error(request, client_address)
+
+
+def start_fake_server(host: str = "127.0.0.1", port: int = 0, **options) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the server on a daemon thread; returns (server, base_url ending in /v1)."""
+    server = _Server((host, port), _Handler)
+    server.options = FakeOptions(**options)
+    server.stats = {}
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8999)
+    for name, default in vars(FakeOptions()).items():
+        if name not in ("answer", "rules"):
+            parser.add_argument("--" + name.replace("_", "-"), type=type(default), default=default)
+    args = vars(parser.parse_args())
+    host, port = args.pop("host"), args.pop("port")
+    server, url = start_fake_server(host, port, **args)
+    print(f"fake OpenAI server on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
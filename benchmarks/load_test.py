@@ -0,0 +1,180 @@
+"""
+Load test for RunnerPool: throughput as the number of worker processes grows.
+
+Every turn is a RAG turn whose CPU work happens in the worker: a local
+hash embedder (standing in for HFEmbedder) and an exact FAISS search over
+a memory-mapped index shared by all workers (FAISSStore.save / load). The
+LLM answer comes from the fake OpenAI server, run in its own process so the
+front-end's GIL is not the bottleneck. FAISS is pinned to one thread per
+worker, so any speed-up comes from the processes.
+
+    python benchmarks/load_test.py [--workers 1,2,4,8] [--vectors 200000] [--dim 384]
+                                   [--turns-per-worker 200] [--clients-per-worker 8]
+
+Reports turns/s, speed-up and efficiency against one worker, p50/p99 turn
+latency, and per-worker private (RssAnon) vs shared file-backed (RssFile)
+memory to show the index is mapped once.
+"""
+
+import argparse
+import functools
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import zlib
+
+import numpy as np
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("FERNET_SECRET", Fernet.generate_key().decode())
+
+from autoagent.config.llm_config import BaseConfig, TenantConfig, UserConfig
+from autoagent.executor.agent_runner import AgentRunner
+from autoagent.executor.runner_pool import RunnerPool
+from autoagent.rag.embedder import BaseEmbedder
+from autoagent.rag.retrievers.standard_rag import StandardRAG
+from autoagent.rag.vector_store import FAISSStore
+
+from fake_openai_server import start_fake_server
+
+
+class HashEmbedder(BaseEmbedder):
+    """Bag of hashed tokens; local and CPU-bound like HFEmbedder, without a model download."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def embed(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype="float32")
+        for row, text in enumerate(texts):
+            for tok in text.lower().split():
+                out[row, zlib.crc32(tok.encode()) % self.dim] += 1.0
+        out /= np.linalg.norm(out, axis=1, keepdims=True) + 1e-9
+        return out.tolist()
+
+
+def build_index(directory: str, vectors: int, dim: int):
+    import faiss
+    rng = np.random.default_rng(0)
+    store = FAISSStore(faiss.IndexFlatL2(dim))
+    for start in range(0, vectors, 50000):
+        n = min(50000, vectors - start)
+        block = rng.standard_normal((n, dim), dtype="float32")
+        block /= np.linalg.norm(block, axis=1, keepdims=True)
+        store.index.add(block)
+    store.metadatas = [{"text": f"Menu item {i}: seasonal dish number {i}", "source": f"menu/{i}"}
+                       for i in range(vectors)]
+    store.save(directory)
+
+
+def build_runner(index_dir: str, base_url: str, dim: int):
+    """Worker-side factory: shares the mapped index, returns (runner, flows)."""
+    import faiss
+    faiss.omp_set_num_threads(1)
+    store = FAISSStore.load(index_dir)
+    retriever = StandardRAG("sk-fake", store)
+    retriever.embedder = HashEmbedder(dim)
+    fernet = Fernet(os.environ["FERNET_SECRET"].encode())
+    base_cfg = BaseConfig(fernet.encrypt(b"sk-fake").decode(), model="fake-model", base_url=base_url)
+    flows = {"qa": {"agent_type": "rag", "agent_params": {"retriever": retriever}}}
+    return AgentRunner(base_cfg, {}), flows
+
+
+def serve_fake(conn, latency_ms: float):
+    server, url = start_fake_server(latency_ms=latency_ms, jitter_ms=0)
+    conn.send(url)
+    conn.recv()  # block until the parent says stop
+    server.shutdown()
+
+
+def memory_mb(pid: int) -> dict:
+    fields = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("RssAnon", "RssFile"):
+                fields[key] = int(value.split()[0]) // 1024
+    return fields
+
+
+def run(pool: RunnerPool, turns: int, clients: int) -> dict:
+    sessions = [f"client{c}" for c in range(clients)]
+    tenant, user = TenantConfig(False, tenant_id="bench"), UserConfig(False)
+    for sid in sessions:
+        pool.start_session(sid, tenant, user)
+    for sid in sessions:
+        pool.handle_message(sid, "warm up", "qa")
+
+    latencies, lock = [], threading.Lock()
+    per_client = max(1, turns // clients)
+
+    def client(sid: str):
+        for i in range(per_client):
+            start = time.perf_counter()
+            pool.handle_message(sid, f"what is in dish {i} today", "qa")
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(sid,)) for sid in sessions]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {"turns": len(latencies), "turns_per_s": len(latencies) / elapsed,
+            "p50_ms": statistics.median(latencies) * 1000,
+            "p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000}
+
+
+def main():
+    cores = os.cpu_count() or 1
+    default_workers = ",".join(str(n) for n in (1, 2, 4, 8, 16, 32) if n <= cores) or "1"
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default=default_workers)
+    parser.add_argument("--vectors", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--turns-per-worker", type=int, default=200)
+    parser.add_argument("--clients-per-worker", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe()
+    fake = ctx.Process(target=serve_fake, args=(child, args.latency_ms), daemon=True)
+    fake.start()
+    base_url = parent.recv()
+
+    index_dir = tempfile.mkdtemp(prefix="autoagent-index-")
+    try:
+        build_index(index_dir, args.vectors, args.dim)
+        index_mb = os.path.getsize(os.path.join(index_dir, FAISSStore.INDEX_FILE)) / 2**20
+        print(f"{cores} cores, index {args.vectors} x {args.dim} ({index_mb:.0f} MB), "
+              f"LLM latency {args.latency_ms:.0f} ms")
+        print(f"{'workers':>7} {'turns/s':>9} {'speedup':>8} {'eff':>6} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'anon MB/worker':>15} {'file MB/worker':>15}")
+        factory = functools.partial(build_runner, index_dir, base_url, args.dim)
+        baseline = None
+        for n in (int(x) for x in args.workers.split(",")):
+            with RunnerPool(factory, workers=n, threads_per_worker=args.clients_per_worker) as pool:
+                row = run(pool, args.turns_per_worker * n, args.clients_per_worker * n)
+                mem = [memory_mb(p.pid) for p in pool._procs]
+            baseline = baseline or row["turns_per_s"] / n
+            speedup = row["turns_per_s"] / baseline
+            anon = sum(m.get("RssAnon", 0) for m in mem) / len(mem)
+            file = sum(m.get("RssFile", 0) for m in mem) / len(mem)
+            print(f"{n:>7} {row['turns_per_s']:>9.1f} {speedup:>7.2f}x {speedup / n:>6.0%} "
+                  f"{row['p50_ms']:>8.1f} {row['p99_ms']:>8.1f} {anon:>15.0f} {file:>15.0f}")
+    finally:
+        parent.send("stop")
+        fake.join(5)
+        shutil.rmtree(index_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,99 @@
 import os
-from cryptography.fernet import Fernet
+import threading
+from collections import OrderedDict
+from typing import Optional
 
-FERNET_SECRET = os.getenv("FERNET_SECRET")
-cipher = Fernet(FERNET_SECRET)
+_cipher = None
+_cipher_lock = threading.Lock()
+
+def get_cipher():
+    """
+    Fernet cipher built on first use, so importing config does not need
+    FERNET_SECRET (or cryptography) until something is actually decrypted.
+    """
+    global _cipher
+    if _cipher is None:
+        with _cipher_lock:
+            if _cipher is None:
+                from cryptography.fernet import Fernet
+                secret = os.getenv("FERNET_SECRET")
+                if not secret:
+                    raise RuntimeError("FERNET_SECRET is not set")
+                _cipher = Fernet(secret)
+    return _cipher
+
+def __getattr__(name):
+    # Backwards-compatible `encryption.cipher`
+    if name == "cipher":
+        return get_cipher()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def encrypt_value(value: str) -> str:
-    return cipher.encrypt(value.encode()).decode()
+    return get_cipher().encrypt(value.encode()).decode()
 
 def decrypt_value(encrypted_value: str) -> str:
-    return cipher.decrypt(encrypted_value.encode()).decode()
+    return get_cipher().decrypt(encrypted_value.encode()).decode()
+
+
+class SecretCache:
+    """
+    Bounded LRU of decrypted secrets keyed by ciphertext.
+
+    Plaintexts are held in bytearrays that are overwritten with zeros when
+    evicted or cleared. Strings already handed to callers are ordinary
+    Python objects and are outside its control.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, bytearray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _wipe(buf: bytearray):
+        buf[:] = bytes(len(buf))
+
+    def get(self, encrypted_value: str) -> Optional[str]:
+        with self._lock:
+            buf = self._data.get(encrypted_value)
+            if buf is None:
+                return None
+            self._data.move_to_end(encrypted_value)
+            return buf.decode()
+
+    def put(self, encrypted_value: str, plaintext: str):
+        with self._lock:
+            old = self._data.pop(encrypted_value, None)
+            if old is not None:
+                self._wipe(old)
+            self._data[encrypted_value] = bytearray(plaintext.encode())
+            while len(self._data) > self.maxsize:
+                _, evicted = self._data.popitem(last=False)
+                self._wipe(evicted)
+
+    def discard(self, encrypted_value: str):
+        with self._lock:
+            buf = self._data.pop(encrypted_value, None)
+            if buf is not None:
+                self._wipe(buf)
+
+    def clear(self):
+        """Zeroize and drop every cached secret (e.g. on key rotation)."""
+        with self._lock:
+            for buf in self._data.values():
+                self._wipe(buf)
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+secret_cache = SecretCache()
+
+def decrypt_cached(encrypted_value: str) -> str:
+    """decrypt_value, done once per ciphertext and kept in `secret_cache`."""
+    plaintext = secret_cache.get(encrypted_value)
+    if plaintext is None:
+        plaintext = decrypt_value(encrypted_value)
+        secret_cache.put(encrypted_value, plaintext)
+    return plaintext
@@ -1,58 +1,169 @@
-from typing import Optional
-from config.encryption import decrypt_value
+from typing import Any, List, Optional
+from autoagent.config.encryption import decrypt_cached, secret_cache
 
 
-class BaseConfig:
-    """Default LLM config set by the superuser (founder). Always active."""
-    def __init__(self, api_key: str, model: str = "gpt-4", base_url: str = "https://api.openai.com/v1"):
-        self.api_key = decrypt_value(api_key)
+def _decrypt_endpoints(endpoints: Optional[List[dict]]) -> Optional[List[dict]]:
+    """
+    Extra LLM endpoints as given to LLMClient: each
+    {"base_url", "encrypted_api_key"?, "model"?, "internal_model"?} with the
+    key decrypted; endpoints without a key share the config's key.
+    """
+    if not endpoints:
+        return None
+    resolved = []
+    for ep in endpoints:
+        ep = dict(ep)
+        encrypted = ep.pop("encrypted_api_key", None)
+        if encrypted:
+            ep["api_key"] = decrypt_cached(encrypted)
+        resolved.append(ep)
+    return resolved
+
+
+class _VersionedConfig:
+    """
+    Config fields plus a `version` that increases on every `update()`, so
+    cached resolutions built from an older version can be detected as stale.
+    Encrypted keys are only decrypted when first read.
+    """
+    version: int = 0
+
+    def update(self, **changes: Any):
+        old_key = getattr(self, "encrypted_api_key", None)
+        for field, value in changes.items():
+            if field not in vars(self):
+                raise AttributeError(f"{type(self).__name__} has no field '{field}'")
+            setattr(self, field, value)
+        if old_key and old_key != getattr(self, "encrypted_api_key", None):
+            secret_cache.discard(old_key)  # rotated: wipe the old plaintext
+        self.version += 1
+
+    @property
+    def rate_limits(self) -> Optional[dict]:
+        """{"rpm", "tpm", "max_in_flight"} that are set, or None."""
+        limits = {k: getattr(self, k) for k in ("rpm", "tpm", "max_in_flight") if getattr(self, k, None)}
+        return limits or None
+
+
+class BaseConfig(_VersionedConfig):
+    """
+    Default LLM config set by the superuser (founder). Always active.
+    rpm/tpm/max_in_flight are the provider limits of this (shared) key.
+    `endpoints` are further OpenAI-compatible backends balanced and failed
+    over with the primary one; `internal_model` is a cheaper model for
+    internal calls (rerank, query rewrite, critique).
+    """
+    def __init__(self, api_key: str, model: str = "gpt-4", base_url: str = "https://api.openai.com/v1",
+                 version: int = 0, rpm: Optional[int] = None, tpm: Optional[int] = None,
+                 max_in_flight: Optional[int] = None, endpoints: Optional[List[dict]] = None,
+                 internal_model: Optional[str] = None):
+        self.encrypted_api_key = api_key
         self.model = model
         self.base_url = base_url
+        self.version = version
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_in_flight = max_in_flight
+        self.endpoints = endpoints
+        self.internal_model = internal_model
+
+    @property
+    def api_key(self) -> str:
+        return decrypt_cached(self.encrypted_api_key)
 
     def get_config(self):
         return {
             "api_key": self.api_key,
             "model": self.model,
             "base_url": self.base_url,
-            "source": "base"
+            "source": "base",
+            "key_rate_limits": self.rate_limits,
+            "endpoints": _decrypt_endpoints(self.endpoints),
+            "internal_model": self.internal_model
         }
 
 
-class TenantConfig:
-    """Tenant-level config set by your business client."""
+class TenantConfig(_VersionedConfig):
+    """
+    Tenant-level config set by your business client.
+    rpm/tpm/max_in_flight cap this tenant's LLM usage, whichever key it uses.
+    endpoints/internal_model work as on BaseConfig; a tenant with its own
+    key does not inherit the founder's.
+    """
     def __init__(self, llm_enabled: bool, encrypted_api_key: Optional[str] = None,
-                 model: Optional[str] = None, base_url: Optional[str] = None):
+                 model: Optional[str] = None, base_url: Optional[str] = None,
+                 tenant_id: Optional[str] = None, version: int = 0,
+                 rpm: Optional[int] = None, tpm: Optional[int] = None,
+                 max_in_flight: Optional[int] = None, endpoints: Optional[List[dict]] = None,
+                 internal_model: Optional[str] = None):
         self.llm_enabled = llm_enabled
-        self.api_key = decrypt_value(encrypted_api_key) if encrypted_api_key and llm_enabled else None
+        self.encrypted_api_key = encrypted_api_key
         self.model = model
         self.base_url = base_url
+        self.tenant_id = tenant_id
+        self.version = version
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_in_flight = max_in_flight
+        self.endpoints = endpoints
+        self.internal_model = internal_model
+
+    @property
+    def api_key(self) -> Optional[str]:
+        if self.encrypted_api_key and self.llm_enabled:
+            return decrypt_cached(self.encrypted_api_key)
+        return None
 
     def get_config(self, fallback: BaseConfig):
         if not self.llm_enabled:
-            return fallback.get_config()
-        return {
-            "api_key": self.api_key or fallback.api_key,
-            "model": self.model or fallback.model,
-            "base_url": self.base_url or fallback.base_url,
-            "source": "tenant"
-        }
+            cfg = fallback.get_config()
+        else:
+            own_key = self.api_key
+            inherit = not own_key
+            cfg = {
+                "api_key": own_key or fallback.api_key,
+                "model": self.model or fallback.model,
+                "base_url": self.base_url or fallback.base_url,
+                "source": "tenant",
+                "key_rate_limits": fallback.rate_limits if inherit else None,
+                "endpoints": _decrypt_endpoints(self.endpoints or (fallback.endpoints if inherit else None)),
+                "internal_model": self.internal_model or (fallback.internal_model if inherit else None)
+            }
+        cfg["tenant_id"] = self.tenant_id
+        cfg["rate_limits"] = self.rate_limits
+        return cfg
 
 
-class UserConfig:
+class UserConfig(_VersionedConfig):
     """Per-user config, used only if tenant or founder allows it (very rare)."""
     def __init__(self, use_llm: bool, encrypted_api_key: Optional[str] = None,
-                 model: Optional[str] = None, base_url: Optional[str] = None):
+                 model: Optional[str] = None, base_url: Optional[str] = None,
+                 user_id: Optional[str] = None, version: int = 0):
         self.use_llm = use_llm
-        self.api_key = decrypt_value(encrypted_api_key) if encrypted_api_key and use_llm else None
+        self.encrypted_api_key = encrypted_api_key
         self.model = model
         self.base_url = base_url
+        self.user_id = user_id
+        self.version = version
+
+    @property
+    def api_key(self) -> Optional[str]:
+        if self.encrypted_api_key and self.use_llm:
+            return decrypt_cached(self.encrypted_api_key)
+        return None
 
     def get_config(self, tenant_or_fallback_config: dict):
         if not self.use_llm:
             return tenant_or_fallback_config
+        own_key = self.api_key
         return {
-            "api_key": self.api_key or tenant_or_fallback_config["api_key"],
+            **tenant_or_fallback_config,
+            "api_key": own_key or tenant_or_fallback_config["api_key"],
             "model": self.model or tenant_or_fallback_config["model"],
             "base_url": self.base_url or tenant_or_fallback_config["base_url"],
-            "source": "user"
+            "source": "user",
+            "key_rate_limits": None if own_key else tenant_or_fallback_config.get("key_rate_limits"),
+            # a user's own key/endpoint is used alone
+            "endpoints": None if own_key or self.base_url else tenant_or_fallback_config.get("endpoints"),
+            "internal_model": None if own_key else tenant_or_fallback_config.get("internal_model")
         }
@@ -1,3 +1,8 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional
+
+from autoagent.config.encryption import decrypt_cached
 from autoagent.config.llm_config import BaseConfig
 from autoagent.config.llm_config import TenantConfig
 from autoagent.config.llm_config import UserConfig
@@ -24,3 +29,114 @@ def resolve_llm_config(
     cfg = user_cfg.get_config(cfg)
 
     return cfg
+
+
+def _ciphertexts(*configs) -> Iterator[str]:
+    """Every encrypted key the configs hold, their endpoints' included."""
+    for cfg in configs:
+        if getattr(cfg, "encrypted_api_key", None):
+            yield cfg.encrypted_api_key
+        for ep in getattr(cfg, "endpoints", None) or ():
+            if ep.get("encrypted_api_key"):
+                yield ep["encrypted_api_key"]
+
+
+def _seal(cfg: dict, configs: tuple) -> Optional[tuple]:
+    """
+    (cfg without plaintext keys, ciphertext of api_key, ciphertexts of the
+    endpoints' keys), or None if a key can't be traced to its ciphertext.
+    """
+    plain_to_cipher: Dict[str, str] = {}
+    for cipher in _ciphertexts(*configs):
+        try:
+            plain_to_cipher.setdefault(decrypt_cached(cipher), cipher)
+        except Exception:
+            continue  # e.g. a disabled user's stale key; it can't be in cfg
+    key = plain_to_cipher.get(cfg.get("api_key"))
+    if key is None:
+        return None
+    template = dict(cfg, api_key=None)
+    endpoint_keys = []
+    if cfg.get("endpoints"):
+        template["endpoints"] = []
+        for ep in cfg["endpoints"]:
+            ep = dict(ep)
+            plain = ep.pop("api_key", None)
+            if plain is not None and plain not in plain_to_cipher:
+                return None
+            endpoint_keys.append(plain_to_cipher.get(plain))
+            template["endpoints"].append(ep)
+    return template, key, endpoint_keys
+
+
+def _unseal(template: dict, key: str, endpoint_keys: list) -> dict:
+    cfg = dict(template, api_key=decrypt_cached(key))
+    if template.get("endpoints"):
+        cfg["endpoints"] = [dict(ep, api_key=decrypt_cached(k)) if k else dict(ep)
+                            for ep, k in zip(template["endpoints"], endpoint_keys)]
+    return cfg
+
+
+class ConfigResolver:
+    """
+    Memoised `resolve_llm_config` for the per-message hot path.
+
+    Results are cached per (tenant, user) — keyed by `tenant_id`/`user_id`
+    when set, else by the config objects themselves — together with the
+    three configs' versions. Calling `update()` on any of them bumps its
+    version, so the next resolve recomputes. At most `maxsize` entries are
+    kept (LRU).
+
+    Entries hold the encrypted keys, not plaintext: each resolve fetches
+    the plaintext from `encryption.secret_cache`, so rotating or clearing
+    that cache is enough to get keys out of memory.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(tenant_cfg: TenantConfig, user_cfg: UserConfig) -> tuple:
+        tenant = getattr(tenant_cfg, "tenant_id", None) or id(tenant_cfg)
+        user = getattr(user_cfg, "user_id", None) or id(user_cfg)
+        return tenant, user
+
+    def resolve(self, base_cfg: BaseConfig, tenant_cfg: TenantConfig, user_cfg: UserConfig) -> dict:
+        key = self._key(tenant_cfg, user_cfg)
+        stamp = (base_cfg, tenant_cfg, user_cfg,
+                 getattr(base_cfg, "version", 0), getattr(tenant_cfg, "version", 0), getattr(user_cfg, "version", 0))
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and all(a is b for a, b in zip(entry[0][:3], stamp[:3])) \
+                    and entry[0][3:] == stamp[3:]:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                sealed = entry[1]
+            else:
+                sealed = None
+                self.misses += 1
+        if sealed is not None:
+            return _unseal(*sealed)
+
+        cfg = resolve_llm_config(base_cfg, tenant_cfg, user_cfg)
+        sealed = _seal(cfg, (base_cfg, tenant_cfg, user_cfg))
+        if sealed is not None:
+            with self._lock:
+                self._cache[key] = (stamp, sealed)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+        return cfg
+
+    def invalidate(self, tenant_id: Optional[str] = None):
+        """Drop cached entries for one tenant id, or everything when None."""
+        with self._lock:
+            if tenant_id is None:
+                self._cache.clear()
+            else:
+                for key in [k for k in self._cache if k[0] == tenant_id]:
+                    del self._cache[key]
@@ -0,0 +1,213 @@
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+import yaml
+
+from autoagent.config.llm_config import TenantConfig
+from autoagent.executor.session_router import FlowSpec
+
+logger = logging.getLogger(__name__)
+
+_LLM_FIELDS = {"enabled", "encrypted_api_key", "model", "base_url", "endpoints", "internal_model"}
+_LIMIT_FIELDS = {"rpm", "tpm", "max_in_flight"}
+
+
+class TenantEntry:
+    """One loaded tenant: its TenantConfig and precompiled flows."""
+    __slots__ = ("tenant_id", "path", "mtime", "tenant_cfg", "flows", "raw")
+
+    def __init__(self, tenant_id: str, path: str, mtime: float,
+                 tenant_cfg: TenantConfig, flows: Dict[str, FlowSpec], raw: dict):
+        self.tenant_id = tenant_id
+        self.path = path
+        self.mtime = mtime
+        self.tenant_cfg = tenant_cfg
+        self.flows = flows
+        self.raw = raw
+
+
+class TenantLoader:
+    """
+    Loads a directory of tenant YAML files (one tenant per `<tenant_id>.yaml`):
+
+        tenant_id: pizza_palace          # optional, defaults to the file name
+        llm:
+          enabled: true
+          encrypted_api_key: gAAAA...
+          model: gpt-4o-mini
+          internal_model: gpt-4o-mini    # optional, for rerank/rewrite/critique
+          endpoints:                     # optional extra backends
+            - {base_url: "https://eu.example.com/v1", encrypted_api_key: gAAAA...}
+        limits:                          # optional per-tenant quotas
+          rpm: 600
+          tpm: 200000
+          max_in_flight: 8
+        flows:
+          order:
+            agent_type: react
+            tools: [menu_lookup, menu_bulk_lookup]
+            agent_params: {max_steps: 4}
+
+    Every file is validated and its flows compiled into FlowSpecs once
+    (their tools are imported on first use). A background thread rescans
+    the directory every `check_interval` seconds and reloads files whose
+    mtime changed, so `get()` is a dict lookup; pass `watch=False` to
+    reload only on explicit `reload()` calls. A file that fails validation,
+    including one claiming a tenant_id another file already defines, is
+    logged and the last good version is kept.
+    """
+
+    def __init__(self, directory: str, tool_registry: dict = None, check_interval: float = 2.0,
+                 watch: bool = True):
+        if tool_registry is None:
+            from autoagent.tools import tool_registry
+        self.directory = directory
+        self.tool_registry = tool_registry
+        self.check_interval = check_interval
+        self.errors: Dict[str, str] = {}          # path → last validation error
+        self._failed_mtime: Dict[str, float] = {} # path → mtime of the rejected version
+        self._tenants: Dict[str, TenantEntry] = {}
+        self._by_path: Dict[str, str] = {}        # path → tenant_id
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.reload()
+        self._watcher = None
+        if watch and check_interval:
+            self._watcher = threading.Thread(target=self._watch, name="autoagent-tenant-watcher", daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        while not self._stop_event.wait(self.check_interval):
+            try:
+                self.reload()
+            except OSError as exc:  # e.g. the directory is briefly unavailable
+                logger.error("Tenant config directory %s unreadable: %s", self.directory, exc)
+
+    def close(self):
+        """Stop the background watcher."""
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _files(self) -> Dict[str, float]:
+        files = {}
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith((".yaml", ".yml")):
+                    files[entry.path] = entry.stat().st_mtime
+        return files
+
+    def compile(self, path: str, raw: dict, mtime: float = 0.0) -> TenantEntry:
+        """Validate one parsed tenant document. Raises ValueError."""
+        if not isinstance(raw, dict):
+            raise ValueError("top level must be a mapping")
+        default_id = os.path.splitext(os.path.basename(path))[0]
+        tenant_id = str(raw.get("tenant_id") or default_id)
+
+        llm = raw.get("llm") or {}
+        if not isinstance(llm, dict):
+            raise ValueError("'llm' must be a mapping")
+        unknown = set(llm) - _LLM_FIELDS
+        if unknown:
+            raise ValueError(f"unknown llm fields {sorted(unknown)}")
+
+        endpoints = llm.get("endpoints")
+        if endpoints is not None and not (
+                isinstance(endpoints, list)
+                and all(isinstance(ep, dict) and ep.get("base_url") for ep in endpoints)):
+            raise ValueError("'llm.endpoints' must be a list of mappings with a base_url")
+
+        limits = raw.get("limits") or {}
+        if not isinstance(limits, dict) or set(limits) - _LIMIT_FIELDS:
+            raise ValueError(f"'limits' must be a mapping of {sorted(_LIMIT_FIELDS)}")
+
+        flows = raw.get("flows") or {}
+        if not isinstance(flows, dict) or not flows:
+            raise ValueError("'flows' must be a non-empty mapping")
+        specs = {}
+        for name, flow in flows.items():
+            if not isinstance(flow, dict):
+                raise ValueError(f"Flow '{name}' must be a mapping")
+            specs[name] = FlowSpec.compile(name, flow, self.tool_registry)
+
+        previous = self._tenants.get(tenant_id)
+        if previous is not None and previous.path != path:
+            raise ValueError(f"tenant_id '{tenant_id}' is already defined in {previous.path}")
+        tenant_cfg = TenantConfig(
+            llm_enabled=bool(llm.get("enabled", False)),
+            encrypted_api_key=llm.get("encrypted_api_key"),
+            model=llm.get("model"),
+            base_url=llm.get("base_url"),
+            endpoints=endpoints,
+            internal_model=llm.get("internal_model"),
+            tenant_id=tenant_id,
+            version=previous.tenant_cfg.version + 1 if previous else 0,
+            **limits,
+        )
+        return TenantEntry(tenant_id, path, mtime, tenant_cfg, specs, raw)
+
+    def _load_file(self, path: str, mtime: float) -> Optional[TenantEntry]:
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                raw = yaml.safe_load(fh)
+            entry = self.compile(path, raw, mtime)
+        except (OSError, yaml.YAMLError, ValueError) as exc:
+            self.errors[path] = str(exc)
+            logger.error("Tenant config %s rejected: %s", path, exc)
+            return None
+        self.errors.pop(path, None)
+        other = self._by_path.get(path)
+        if other and other != entry.tenant_id:
+            self._tenants.pop(other, None)
+            self._failed_mtime.clear()  # a file rejected as a duplicate of `other` may load now
+        self._tenants[entry.tenant_id] = entry
+        self._by_path[path] = entry.tenant_id
+        return entry
+
+    def reload(self) -> Dict[str, int]:
+        """Load new/changed files and drop deleted ones. Returns counts."""
+        with self._lock:
+            return self._reload_locked()
+
+    def _reload_locked(self) -> Dict[str, int]:
+        files = self._files()
+        loaded = failed = removed = 0
+        # drop deleted files first, so their tenant_ids are free to be claimed
+        for path in [p for p in self._by_path if p not in files]:
+            self._tenants.pop(self._by_path.pop(path), None)
+            removed += 1
+        if removed:
+            self._failed_mtime.clear()  # retry files rejected as duplicates
+        for path in [p for p in self.errors if p not in files]:
+            self.errors.pop(path)
+        for path, mtime in sorted(files.items()):
+            tenant_id = self._by_path.get(path)
+            current = self._tenants.get(tenant_id) if tenant_id else None
+            if current is not None and current.mtime == mtime:
+                continue
+            if self._failed_mtime.get(path) == mtime:
+                continue  # still the same broken file
+            if self._load_file(path, mtime):
+                self._failed_mtime.pop(path, None)
+                loaded += 1
+            else:
+                self._failed_mtime[path] = mtime
+                failed += 1
+        for path in [p for p in self._failed_mtime if p not in files]:
+            self._failed_mtime.pop(path)
+        if loaded or failed or removed:
+            logger.info("Tenant configs: %d loaded, %d rejected, %d removed", loaded, failed, removed)
+        return {"loaded": loaded, "failed": failed, "removed": removed}
+
+    def get(self, tenant_id: str) -> TenantEntry:
+        """Current entry for a tenant (kept fresh by the watcher). Raises KeyError."""
+        entry = self._tenants.get(tenant_id)
+        if entry is None:
+            raise KeyError(f"Tenant '{tenant_id}' not configured")
+        return entry
+
+    def tenant_ids(self):
+        return list(self._tenants)
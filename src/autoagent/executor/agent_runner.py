@@ -1,21 +1,45 @@
-from autoagent.config.llm_resolver import resolve_llm_config
+import asyncio
+import contextvars
+import sys
+from contextlib import ExitStack, nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterator
+
+from autoagent.config.llm_resolver import ConfigResolver
+from autoagent.llm.rate_limit import get_rate_limiter
+from autoagent.llm.usage import TurnUsage
+from autoagent.telemetry.tracing import span, traced
 from autoagent.executor.session_router import SessionRouter
 from autoagent.executor.conversation_manager import ConversationManager
 
+# Drives sync agent generators on behalf of `astream_message`
+_stream_executor = ThreadPoolExecutor(thread_name_prefix="autoagent-stream")
+_DONE = object()
+
 class AgentRunner:
     """
     Common library entrypoint to manage sessions and execute agents.
     """
 
-    def __init__(self, base_cfg, tool_registry):
+    def __init__(self, base_cfg, tool_registry, tenant_loader=None, rate_limiter=None, profiler=None):
         """
         base_cfg: BaseConfig instance
         tool_registry: {tool_key: ToolClass, ...}
+        tenant_loader: optional TenantLoader for `start_tenant_session`
+        rate_limiter: RateLimiter queueing this runner's LLM calls per
+            tenant / API key (default: the shared process-wide one)
+        profiler: optional RequestProfiler (telemetry/profiling.py) timing
+            every handle_message by stage and keeping slow-request profiles
         """
         self.base_cfg = base_cfg
         self.tool_registry = tool_registry
+        self.tenant_loader = tenant_loader
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.profiler = profiler
         self.convo_mgr = ConversationManager()
-        # session_id → {tenant_cfg, user_cfg, flows}
+        # Resolved LLM config per (tenant, user), recomputed on config updates
+        self.config_resolver = ConfigResolver()
+        # session_id → {tenant_cfg, user_cfg, flows, state[, tenant_id]}
         self._sessions = {}
 
     def start_session(self, session_id: str, tenant_cfg, user_cfg, tenant_flows: dict):
@@ -29,9 +53,61 @@ class AgentRunner:
         self._sessions[session_id] = {
             "tenant_cfg": tenant_cfg,
             "user_cfg": user_cfg,
-            "flows": tenant_flows
+            "flows": tenant_flows,
+            "state": {}
         }
 
+    def start_tenant_session(self, session_id: str, tenant_id: str, user_cfg):
+        """
+        Start a session for a tenant defined in `tenant_loader`. The tenant's
+        config and precompiled flows are looked up on every turn, so edits to
+        its YAML file apply to running sessions without a restart.
+        """
+        if self.tenant_loader is None:
+            raise RuntimeError("AgentRunner has no tenant_loader")
+        self.tenant_loader.get(tenant_id)  # fail fast on unknown tenants
+        self.start_session(session_id, None, user_cfg, None)
+        self._sessions[session_id]["tenant_id"] = tenant_id
+
+    def _prepare_turn(self, session_id: str, user_message: str, flow_name: str):
+        """
+        Shared setup for one user turn: resolve config, build the agent,
+        snapshot prior history and record the user message.
+        Returns (agent, history, usage).
+        """
+        meta = self._sessions[session_id]
+        tenant_cfg, flows = meta["tenant_cfg"], meta["flows"]
+        tenant_id = meta.get("tenant_id") or getattr(tenant_cfg, "tenant_id", None)
+        if meta.get("tenant_id") is not None:
+            entry = self.tenant_loader.get(meta["tenant_id"])
+            tenant_cfg, flows = entry.tenant_cfg, entry.flows
+
+        # Prior turns only; the agent receives the new message separately
+        history = self.convo_mgr.get_llm_history(session_id)
+
+        # Record user message
+        self.convo_mgr.append_user(session_id, user_message)
+
+        # Resolve LLM config
+        llm_cfg = self.config_resolver.resolve(
+            self.base_cfg,
+            tenant_cfg,
+            meta["user_cfg"]
+        )
+        # Agents' LLM clients queue on this limiter using the tenant/key limits above
+        llm_cfg["rate_limiter"] = self.rate_limiter
+        # ...and record token usage / latency per tenant, flow and agent
+        usage = TurnUsage({"tenant": tenant_id, "flow": flow_name})
+        llm_cfg["usage"] = usage
+
+        # Pick and build agent
+        router = SessionRouter(flows, self.tool_registry)
+        agent = router.get_agent(flow_name, llm_cfg, session_state=meta["state"])
+        usage.labels["agent"] = type(agent).__name__
+        return agent, history, usage
+
+    @traced("agent_runner.handle_message",
+            attributes=lambda self, session_id, user_message, flow_name: {"session_id": session_id, "flow": flow_name})
     def handle_message(self, session_id: str, user_message: str, flow_name: str) -> dict:
         """
         Process one user message:
@@ -40,36 +116,132 @@ class AgentRunner:
           - Resolve LLM config
           - Instantiate the right agent
           - Run it and append assistant reply
-        Returns: {"answer": str, "trace": list}
+        Returns: {"answer": str, "trace": list}; the trace ends with
+        {"usage": {...}}, the turn's LLM tokens, latency and cost, followed
+        by {"stages": {...}} when a profiler is attached.
         """
-        meta = self._sessions.get(session_id)
-        if not meta:
+        if session_id not in self._sessions:
             raise KeyError(f"Session '{session_id}' not found")
 
         if self.convo_mgr.is_paused(session_id):
             return {"answer": None, "status": "paused"}
 
-        # Record user message
-        self.convo_mgr.append(session_id, "user", user_message)
+        profiled = (self.profiler.request(session_id=session_id, flow=flow_name)
+                    if self.profiler is not None else nullcontext())
+        with profiled as prof:
+            with span("agent_runner.prepare_turn"):
+                agent, history, usage = self._prepare_turn(session_id, user_message, flow_name)
+            if prof is not None:
+                prof.labels.update(usage.labels)
 
-        # Resolve LLM config
-        llm_cfg = resolve_llm_config(
-            self.base_cfg,
-            meta["tenant_cfg"],
-            meta["user_cfg"]
-        )
+            # Run agent
+            result = agent.run(user_message, context=history)
 
-        # Pick and build agent
-        router = SessionRouter(meta["flows"], self.tool_registry)
-        agent = router.get_agent(flow_name, llm_cfg)
-
-        # Run agent
-        history = self.convo_mgr.get_history(session_id)
-        result = agent.run(user_message, context=history)
-
-        # Record and return
-        self.convo_mgr.append(session_id, "assistant", result["answer"])
-        return {
-            "answer": result["answer"],
-            "trace": result.get("trace", [])
-        }
+            # Record and return
+            self.convo_mgr.append_assistant(session_id, result["answer"])
+
+        trace = result.get("trace", []) + [{"usage": usage.summary()}]
+        if prof is not None:
+            trace.append({"stages": prof.summary()})
+        return {"answer": result["answer"], "trace": trace}
+
+    def stream_message(self, session_id: str, user_message: str, flow_name: str) -> Iterator[str]:
+        """
+        Streaming variant of `handle_message`: yields answer text deltas.
+
+        The pause flag is checked before every delta, so a supervisor
+        take-over stops the stream mid-answer. Whatever text was delivered
+        (complete, paused or abandoned by the caller) is recorded as the
+        assistant turn.
+
+        The whole stream is one "agent_runner.stream_message" span and, with
+        a profiler attached, one profiled request (stage timings only).
+        Every step runs in a context of its own, so spans and stage timings
+        stay consistent when the steps are pulled from different threads
+        (as `astream_message` does).
+
+        The generator's return value is
+        {"answer": str, "trace": list, "status": "complete"|"paused"}.
+        """
+        if session_id not in self._sessions:
+            raise KeyError(f"Session '{session_id}' not found")
+
+        if self.convo_mgr.is_paused(session_id):
+            return {"answer": None, "status": "paused"}
+
+        ctx = contextvars.copy_context()
+        scope = ExitStack()
+
+        def open_stream():
+            prof = None
+            if self.profiler is not None:
+                prof = scope.enter_context(
+                    self.profiler.request(stacks=False, session_id=session_id, flow=flow_name, stream=True))
+            scope.enter_context(span("agent_runner.stream_message", session_id=session_id, flow=flow_name))
+            with span("agent_runner.prepare_turn"):
+                agent, history, usage = self._prepare_turn(session_id, user_message, flow_name)
+            if prof is not None:
+                prof.labels.update(usage.labels)
+            return prof, usage, agent.stream(user_message, context=history)
+
+        try:
+            prof, usage, agent_stream = ctx.run(open_stream)
+        except BaseException:
+            ctx.run(scope.__exit__, *sys.exc_info())
+            raise
+
+        parts = []
+        result = {}
+        status = "complete"
+        error = (None, None, None)
+        try:
+            while True:
+                if self.convo_mgr.is_paused(session_id):
+                    status = "paused"
+                    break
+                try:
+                    delta = ctx.run(next, agent_stream)
+                except StopIteration as stop:
+                    result = stop.value or {}
+                    break
+                parts.append(delta)
+                yield delta
+        except GeneratorExit:
+            raise  # closed by the caller: not an error
+        except BaseException:
+            error = sys.exc_info()
+            raise
+        finally:
+            try:
+                ctx.run(agent_stream.close)
+                answer = result.get("answer", "".join(parts).strip())
+                if answer:
+                    self.convo_mgr.append_assistant(session_id, answer)
+            finally:
+                ctx.run(scope.__exit__, *error)
+
+        trace = result.get("trace", []) + [{"usage": usage.summary()}]
+        if prof is not None:
+            trace.append({"stages": prof.summary()})
+        return {"answer": answer, "trace": trace, "status": status}
+
+    async def astream_message(self, session_id: str, user_message: str, flow_name: str) -> AsyncIterator[str]:
+        """
+        Async iterator over `stream_message`. Agents and the LLM client are
+        synchronous, so each delta is pulled on a worker thread.
+        """
+        stream = self.stream_message(session_id, user_message, flow_name)
+        pending = None
+        try:
+            while True:
+                pending = _stream_executor.submit(next, stream, _DONE)
+                delta = await asyncio.wrap_future(pending)
+                if delta is _DONE:
+                    break
+                yield delta
+        finally:
+            # If the consumer went away mid-delta, close once the worker returns
+            if pending is not None and not pending.done():
+                pending.add_done_callback(lambda _: stream.close())
+            else:
+                stream.close()
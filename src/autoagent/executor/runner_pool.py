@@ -0,0 +1,339 @@
+# autoagent/executor/runner_pool.py
+"""
+Multi-process serving front-end for AgentRunner.
+
+    def build_runner():                      # module-level, runs in each worker
+        store = FAISSStore.load("/srv/menu_index")   # memory-mapped, shared
+        return AgentRunner(base_cfg, tools, tenant_loader=TenantLoader("/srv/tenants"))
+
+    with RunnerPool(build_runner, workers=8) as pool:
+        pool.start_tenant_session("s1", "cafe_123", user_cfg)
+        pool.handle_message("s1", "What's the price of a latte?", "food_ordering")
+
+Each worker process builds its own AgentRunner with `runner_factory` and
+serves requests on `threads_per_worker` threads (LLM calls are I/O-bound;
+the processes are for the CPU-bound parts: embedding, index search,
+parsing). A session is pinned to one worker by a stable hash of its id, so
+its conversation history and session state never leave that process, and
+turns of one session run one at a time, in order.
+
+Workers are started with the "spawn" method: `runner_factory` and call
+arguments must be picklable, and indexes should be opened inside the
+factory (e.g. FAISSStore.load) rather than passed in. Flows holding such
+worker-local objects (a RAG flow's retriever) can be returned by the
+factory as `(runner, flows)`; `start_session(..., tenant_flows=None)` then
+uses those.
+"""
+
+import asyncio
+import atexit
+import itertools
+import multiprocessing
+import os
+import pickle
+import queue
+import signal
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+_METHODS = ("start_session", "start_tenant_session", "handle_message")
+
+
+def _portable(exc: BaseException) -> BaseException:
+    # exceptions cross the process boundary by pickle; some can't
+    try:
+        pickle.loads(pickle.dumps(exc))
+        return exc
+    except Exception:
+        return RuntimeError(f"{type(exc).__name__}: {exc}")
+
+
+def _encode(req_id, index: int, ok: bool, value) -> bytes:
+    """
+    Pickle a reply here rather than in the queue's feeder thread, where a
+    failure is only printed and the caller's future would never resolve.
+    """
+    try:
+        return pickle.dumps((req_id, index, ok, value))
+    except Exception as exc:
+        err = TypeError(f"RunnerPool reply is not picklable: {type(exc).__name__}: {exc}")
+        return pickle.dumps((req_id, index, False, err))
+
+
+def _worker_main(index: int, factory: Callable, requests, results, threads: int):
+    # Ctrl-C goes to the front-end, which drains the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        runner = factory()
+        local_flows = None
+        if isinstance(runner, tuple):
+            runner, local_flows = runner
+    except BaseException as exc:
+        results.put(_encode(None, index, False, _portable(exc)))
+        return
+    results.put(_encode(None, index, True, os.getpid()))
+
+    # session_id -> turns not yet run, oldest first. A session is in the
+    # dict exactly while one pool task is draining it, so its turns run in
+    # arrival order and a burst of them occupies a single thread.
+    backlog: Dict[str, Deque[tuple]] = {}
+    backlog_lock = threading.Lock()
+
+    def drain(session_id: str):
+        while True:
+            with backlog_lock:
+                turns = backlog[session_id]
+                if not turns:
+                    del backlog[session_id]  # idle sessions leave no state behind
+                    return
+                req_id, method, args, kwargs = turns.popleft()
+            try:
+                out = _encode(req_id, index, True, getattr(runner, method)(*args, **kwargs))
+            except Exception as exc:
+                out = _encode(req_id, index, False, _portable(exc))
+            results.put(out)
+
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix=f"autoagent-worker{index}") as ex:
+        while True:
+            item = requests.get()
+            if item is None:
+                break  # leaving the with-block waits for queued and in-flight turns
+            req_id, method, args, kwargs = pickle.loads(item)
+            if method == "start_session" and args[3] is None:
+                args = args[:3] + (local_flows,)
+            with backlog_lock:
+                turns = backlog.get(args[0])
+                idle = turns is None
+                if idle:
+                    turns = backlog[args[0]] = deque()
+                turns.append((req_id, method, args, kwargs))
+            if idle:
+                ex.submit(drain, args[0])
+
+
+class RunnerPool:
+    """
+    N AgentRunner worker processes behind one front-end.
+
+    runner_factory: picklable zero-argument callable returning an
+        AgentRunner (or `(runner, flows)`), called once in every worker
+    workers: number of processes (default: os.cpu_count())
+    threads_per_worker: concurrent turns per worker
+    start_timeout: seconds to wait for every factory to finish
+    """
+
+    def __init__(self, runner_factory: Callable, workers: Optional[int] = None,
+                 threads_per_worker: int = 16, start_timeout: float = 120.0):
+        self.runner_factory = runner_factory
+        self.workers = workers or os.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker
+        self.start_timeout = start_timeout
+        self._ctx = multiprocessing.get_context("spawn")
+        self._procs = []
+        self._queues = []
+        self._results = None
+        self._pending: Dict[int, Tuple[int, Future]] = {}  # req_id -> (worker, future)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._accepting = False
+        self._collector = None
+        self._closed = threading.Event()
+        self.completed = [0] * self.workers
+
+    # ------------------------------------------------------------ lifecycle
+
+    def start(self) -> "RunnerPool":
+        self._results = self._ctx.Queue()
+        for i in range(self.workers):
+            q = self._ctx.Queue()
+            # not daemonic: workers may start processes of their own
+            # (SandboxPool, cpu_bound tools, run_isolated)
+            p = self._ctx.Process(target=_worker_main, name=f"autoagent-worker{i}",
+                                  args=(i, self.runner_factory, q, self._results, self.threads_per_worker))
+            p.start()
+            self._queues.append(q)
+            self._procs.append(p)
+
+        deadline = time.monotonic() + self.start_timeout
+        ready = 0
+        try:
+            while ready < self.workers:
+                try:
+                    _, index, ok, value = pickle.loads(
+                        self._results.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    raise TimeoutError(f"RunnerPool workers not ready after {self.start_timeout}s") from None
+                if not ok:
+                    raise RuntimeError(f"RunnerPool worker {index} failed to start") from value
+                ready += 1
+        except BaseException:
+            self._terminate()
+            raise
+
+        self._accepting = True
+        self._closed.clear()
+        self._collector = threading.Thread(target=self._collect, name="autoagent-pool-results", daemon=True)
+        self._collector.start()
+        # workers are not daemonic, so make sure a forgotten pool doesn't
+        # keep the interpreter from exiting
+        atexit.register(self._atexit)
+        return self
+
+    def _atexit(self):
+        self.shutdown(drain=False)
+
+    def shutdown(self, drain: bool = True, timeout: float = 30.0):
+        """
+        Stop accepting requests. With drain=True, turns already submitted
+        finish (up to `timeout` seconds) before workers exit; whatever is
+        still pending afterwards, or everything with drain=False, fails
+        with RuntimeError and the workers are terminated.
+        """
+        with self._lock:
+            if not self._procs:
+                return
+            self._accepting = False
+        atexit.unregister(self._atexit)
+        deadline = time.monotonic() + timeout
+        if drain:
+            with self._idle:
+                self._idle.wait_for(lambda: not self._pending, timeout=timeout)
+            for q in self._queues:
+                q.put(None)
+            for p in self._procs:
+                p.join(max(0.0, deadline - time.monotonic()))
+        self._terminate()
+        self._fail_pending(RuntimeError("RunnerPool shut down"))
+        self._closed.set()
+
+    def _terminate(self):
+        for p in self._procs:
+            if p.is_alive():
+                p.terminate()
+        for p in self._procs:
+            p.join()
+        self._procs = []
+        self._queues = []
+
+    def install_signal_handlers(self, drain_timeout: float = 30.0):
+        """
+        Drain on SIGTERM / SIGINT (call from the main thread). The handler
+        only starts `shutdown` on another thread: it may interrupt the main
+        thread while that holds the pool's lock. Use `wait_closed()` to
+        block until the drain is over.
+        """
+        def handler(signum, frame):
+            threading.Thread(target=self.shutdown, kwargs={"drain": True, "timeout": drain_timeout},
+                             name="autoagent-pool-drain").start()
+        signal.signal(signal.SIGTERM, handler)
+        signal.signal(signal.SIGINT, handler)
+
+    def wait_closed(self, timeout: Optional[float] = None) -> bool:
+        """Block until `shutdown` has finished; False on timeout."""
+        return self._closed.wait(timeout)
+
+    def __enter__(self) -> "RunnerPool":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        return False
+
+    # ------------------------------------------------------------ routing
+
+    def worker_for(self, session_id: str) -> int:
+        """Stable across processes and restarts, unlike hash()."""
+        return zlib.crc32(session_id.encode()) % self.workers
+
+    def submit(self, method: str, session_id: str, *args, **kwargs) -> Future:
+        """Run `AgentRunner.<method>(session_id, *args, **kwargs)` on the session's worker."""
+        if method not in _METHODS:
+            raise ValueError(f"Unsupported RunnerPool method '{method}'")
+        worker = self.worker_for(session_id)
+        fut: Future = Future()
+        with self._lock:
+            if not self._accepting:
+                raise RuntimeError("RunnerPool is not accepting requests")
+            req_id = next(self._ids)
+            # pickled here, not in the queue's feeder thread, so bad arguments raise in the caller
+            payload = pickle.dumps((req_id, method, (session_id,) + args, kwargs))
+            self._pending[req_id] = (worker, fut)
+            # under the lock, so shutdown can't slip in between
+            self._queues[worker].put(payload)
+        return fut
+
+    def _collect(self):
+        checked = time.monotonic()
+        while True:
+            if time.monotonic() - checked > 0.5:
+                if not self._procs:
+                    return
+                self._check_workers()
+                checked = time.monotonic()
+            try:
+                data = self._results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            try:
+                req_id, index, ok, value = pickle.loads(data)
+            except Exception:
+                continue  # e.g. an exception type the front-end can't import
+            with self._lock:
+                entry = self._pending.pop(req_id, None)
+                self.completed[index] += 1
+                if not self._pending:
+                    self._idle.notify_all()
+            if entry is None:
+                continue
+            if ok:
+                entry[1].set_result(value)
+            else:
+                entry[1].set_exception(value)
+
+    def _check_workers(self):
+        # no restart: a dead worker's sessions (and their history) are gone
+        dead = {i for i, p in enumerate(self._procs) if not p.is_alive()}
+        if dead:
+            self._fail_pending(RuntimeError("RunnerPool worker died"), workers=dead)
+
+    def _fail_pending(self, exc: BaseException, workers=None):
+        with self._lock:
+            failed = [(rid, fut) for rid, (w, fut) in self._pending.items() if workers is None or w in workers]
+            for rid, _ in failed:
+                del self._pending[rid]
+            if not self._pending:
+                self._idle.notify_all()
+        for _, fut in failed:
+            if not fut.done():
+                fut.set_exception(exc)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = [0] * self.workers
+            for worker, _ in self._pending.values():
+                pending[worker] += 1
+            return {"workers": self.workers, "accepting": self._accepting,
+                    "pending": pending, "completed": list(self.completed),
+                    "alive": [p.is_alive() for p in self._procs]}
+
+    # ------------------------------------------------------------ AgentRunner API
+
+    def start_session(self, session_id: str, tenant_cfg, user_cfg, tenant_flows: Optional[dict] = None):
+        self.submit("start_session", session_id, tenant_cfg, user_cfg, tenant_flows).result()
+
+    def start_tenant_session(self, session_id: str, tenant_id: str, user_cfg):
+        self.submit("start_tenant_session", session_id, tenant_id, user_cfg).result()
+
+    def handle_message(self, session_id: str, user_message: str, flow_name: str,
+                       timeout: Optional[float] = None) -> dict:
+        return self.submit("handle_message", session_id, user_message, flow_name).result(timeout)
+
+    async def ahandle_message(self, session_id: str, user_message: str, flow_name: str) -> dict:
+        return await asyncio.wrap_future(self.submit("handle_message", session_id, user_message, flow_name))
@@ -0,0 +1,258 @@
+# autoagent/executor/sandbox.py
+"""
+Local, resource-limited Python execution for generated code.
+
+A `SandboxPool` keeps a few warm worker interpreters (spawned, not forked,
+so they never inherit secrets from the host process). Each worker runs
+snippets under rlimits (CPU seconds, address space, file size), with the
+network disabled and a scrubbed environment. The parent enforces the
+wall-clock limit and replaces any worker that is killed or times out; a
+snippet handed to a worker that died while idle is retried once on its
+replacement.
+
+Each snippet gets its own copy of the builtins, and after it runs the
+real `builtins` module is restored and modules it imported are dropped.
+Changes it makes to modules that were already loaded persist in the warm
+worker until it is recycled; use `max_tasks_per_worker=1` to give every
+snippet a fresh interpreter.
+
+Network isolation is best-effort. A new network namespace is used where
+available (Python 3.12+ with unprivileged user namespaces). Otherwise,
+including on Python 3.11, the socket module is stubbed out, which code in
+the sandbox can undo.
+
+This is defence in depth for model-written code, not a security boundary
+against a determined attacker: run the host itself in a container (with
+networking disabled) if the code is untrusted.
+"""
+
+import atexit
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_ENV_ALLOWLIST = ("PATH", "LANG", "LC_ALL", "PYTHONIOENCODING")
+
+
+def _disable_network():
+    """
+    Give the worker its own empty network namespace or, where that is not
+    possible (os.unshare needs Python 3.12+; user namespaces may be off),
+    stub out the socket module. The stub is best-effort only: user code
+    can reload the module or use _socket directly.
+    """
+    import os
+    try:
+        os.unshare(os.CLONE_NEWUSER | os.CLONE_NEWNET)  # Python 3.12+, Linux
+        return
+    except (AttributeError, OSError):
+        pass
+
+    import socket
+
+    def _blocked(*args, **kwargs):
+        raise PermissionError("network access is disabled in the sandbox")
+
+    socket.socket = _blocked
+    socket.create_connection = _blocked
+    socket.getaddrinfo = _blocked
+    socket.socketpair = _blocked
+
+
+def _worker_main(conn, memory_mb: int, max_output: int):
+    import builtins
+    import contextlib
+    import io
+    import os
+    import resource
+    import sys
+    import traceback
+
+    for key in list(os.environ):
+        if key not in _ENV_ALLOWLIST:
+            del os.environ[key]
+    _disable_network()
+
+    mem = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (mem, mem))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (10 * 1024 * 1024, 10 * 1024 * 1024))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+    pristine_builtins = dict(vars(builtins))
+
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+        if msg is None:
+            return
+        code, cpu_seconds = msg
+
+        # RLIMIT_CPU counts the process lifetime, so give each job a fresh allowance
+        used = resource.getrusage(resource.RUSAGE_SELF)
+        used = int(used.ru_utime + used.ru_stime) + 1
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = used + cpu_seconds
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+        out, err = io.StringIO(), io.StringIO()
+        error = None
+        modules = set(sys.modules)
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                # a private builtins dict, so one snippet can't redefine
+                # print/open/... for the next (possibly another tenant's)
+                exec(compile(code, "<sandbox>", "exec"),
+                     {"__name__": "__main__", "__builtins__": dict(pristine_builtins)})
+        except BaseException:  # SystemExit too: user code must not stop the worker
+            error = traceback.format_exc(limit=5)
+        finally:
+            # ...and undo changes made through `import builtins`
+            live = vars(builtins)
+            for name in set(live) - set(pristine_builtins):
+                del live[name]
+            live.update(pristine_builtins)
+            for name in set(sys.modules) - modules:
+                del sys.modules[name]
+        conn.send({
+            "ok": error is None,
+            "stdout": out.getvalue()[:max_output],
+            "stderr": err.getvalue()[:max_output],
+            "error": error,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        })
+
+
+class _Worker:
+    def __init__(self, ctx, memory_mb: int, max_output: int):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn, memory_mb, max_output), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+
+class SandboxPool:
+    """
+    Pool of warm, resource-limited Python workers.
+
+    :param size: number of worker processes
+    :param cpu_seconds: CPU time allowed per snippet
+    :param memory_mb: address-space limit per worker
+    :param wall_timeout: wall-clock seconds allowed per snippet
+    :param max_tasks_per_worker: recycle a worker after this many snippets
+    :param max_output: characters of stdout/stderr kept per snippet
+    """
+
+    def __init__(self, size: int = 2, cpu_seconds: int = 5, memory_mb: int = 512,
+                 wall_timeout: float = 10.0, max_tasks_per_worker: int = 100,
+                 max_output: int = 10_000):
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.wall_timeout = wall_timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_output = max_output
+        self._ctx = mp.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._closed = False
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.memory_mb, self.max_output)
+
+    def _release(self, worker: _Worker, healthy: bool):
+        if healthy and not self._closed and worker.tasks < self.max_tasks_per_worker:
+            self._idle.put(worker)
+            return
+        if healthy:
+            worker.stop()
+        else:
+            worker.kill()
+        if not self._closed:
+            self._idle.put(self._spawn())
+
+    def run(self, code: str, timeout: Optional[float] = None) -> dict:
+        """
+        Execute `code` in a warm worker.
+        Returns {"ok", "stdout", "stderr", "error", "elapsed_ms"}.
+        """
+        if self._closed:
+            raise RuntimeError("SandboxPool is shut down")
+        timeout = timeout or self.wall_timeout
+        start = time.perf_counter()
+        for attempt in range(2):
+            worker = self._idle.get()
+            worker.tasks += 1
+            healthy = True
+            try:
+                try:
+                    worker.conn.send((code, self.cpu_seconds))
+                except OSError:
+                    # the idle worker died before taking the snippet: nothing
+                    # ran, so retry once on its replacement
+                    healthy = False
+                    error = "sandbox worker died while idle"
+                    continue
+                if worker.conn.poll(timeout):
+                    return worker.conn.recv()
+                healthy = False
+                error = f"wall-clock limit exceeded ({timeout}s)"
+            except (EOFError, OSError):
+                # SIGXCPU / OOM kill or a crashed interpreter
+                healthy = False
+                error = "sandbox worker terminated (CPU or memory limit exceeded)"
+            finally:
+                self._release(worker, healthy)
+            break
+        logger.warning("Sandbox run failed: %s", error)
+        return {
+            "ok": False, "stdout": "", "stderr": "", "error": error,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    def shutdown(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+
+
+_default_pool: Optional[SandboxPool] = None
+_default_lock = threading.Lock()
+
+def get_sandbox_pool() -> SandboxPool:
+    """Process-wide pool shared by agents; created on first use."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = SandboxPool()
+            atexit.register(_default_pool.shutdown)
+        return _default_pool
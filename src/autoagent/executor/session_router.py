@@ -1,5 +1,63 @@
+import inspect
+
 from autoagent.llm.factory import AGENT_MAP
 
+class FlowSpec:
+    """
+    A flow definition resolved once: agent class, tool names and constructor
+    params, ready to instantiate on every turn. Tool classes are imported
+    from the registry on the first build (or `warm()`), not at compile time.
+    """
+    __slots__ = ("name", "agent_cls", "tool_names", "params", "_registry", "_tools")
+
+    def __init__(self, name: str, agent_cls, tool_names, params: dict, tool_registry):
+        self.name = name
+        self.agent_cls = agent_cls
+        self.tool_names = tuple(tool_names)
+        self.params = params
+        self._registry = tool_registry
+        self._tools = None
+
+    @classmethod
+    def compile(cls, name: str, flow: dict, tool_registry) -> "FlowSpec":
+        """
+        Validate a flow dict ({agent_type, tools, agent_params}) and resolve it.
+        Raises ValueError describing the first problem found.
+        """
+        agent_type = flow.get("agent_type")
+        agent_cls = AGENT_MAP.get(agent_type)
+        if not agent_cls:
+            raise ValueError(f"Flow '{name}': agent type '{agent_type}' not supported")
+        tool_names = flow.get("tools", []) or []
+        if not isinstance(tool_names, list):
+            raise ValueError(f"Flow '{name}': 'tools' must be a list")
+        # membership only: the lazy registry knows names without importing tools
+        missing = [t for t in tool_names if t not in tool_registry]
+        if missing:
+            raise ValueError(f"Flow '{name}': unknown tools {missing}")
+        params = flow.get("agent_params", {}) or {}
+        if not isinstance(params, dict):
+            raise ValueError(f"Flow '{name}': 'agent_params' must be a mapping")
+        try:
+            inspect.signature(agent_cls).bind({}, {}, **params)
+        except TypeError as exc:
+            raise ValueError(f"Flow '{name}': bad agent_params for {agent_cls.__name__}: {exc}") from None
+        return cls(name, agent_cls, tool_names, params, tool_registry)
+
+    @property
+    def tools(self) -> dict:
+        """Tool sub-registry of this flow, imported on first access."""
+        if self._tools is None:
+            self._tools = {k: self._registry[k] for k in self.tool_names}
+        return self._tools
+
+    def build(self, llm_config: dict, session_state: dict = None):
+        agent = self.agent_cls(llm_config, self.tools, **self.params)
+        if session_state is not None:
+            agent.session_state = session_state
+        return agent
+
+
 class SessionRouter:
     """
     Library class to map a flow name → agent instance.
@@ -16,23 +74,45 @@ class SessionRouter:
           ...
         }
         tool_registry: {tool_key: ToolClass, ...}
+
+        Flow values may also be precompiled FlowSpec objects (see
+        autoagent.config.tenant_loader), which skip per-turn resolution.
         """
         self.flows = tenant_flows
         self.tool_registry = tool_registry
 
-    def get_agent(self, flow_name: str, llm_config: dict):
+    def get_agent(self, flow_name: str, llm_config: dict, session_state: dict = None):
+        """
+        session_state: optional per-session scratch dict that agents may use
+        to keep caches across turns (e.g. ReAct tool results).
+        """
         flow = self.flows.get(flow_name)
         if not flow:
             raise KeyError(f"Flow '{flow_name}' not defined in tenant config")
+        if isinstance(flow, FlowSpec):
+            return flow.build(llm_config, session_state)
 
         agent_type = flow["agent_type"]
         agent_cls = AGENT_MAP.get(agent_type)
         if not agent_cls:
             raise KeyError(f"Agent type '{agent_type}' not supported")
 
-        # Build a sub-registry of only the tools this flow allows
+        # Build a sub-registry of only the tools this flow allows; with the
+        # lazy global registry this imports just those tools, on first use
         tools = {k: self.tool_registry[k] for k in flow.get("tools", [])}
 
         params = flow.get("agent_params", {})
         # Instantiate and return the agent
-        return agent_cls(llm_config, tools, **params)
+        agent = agent_cls(llm_config, tools, **params)
+        if session_state is not None:
+            agent.session_state = session_state
+        return agent
+
+    def warm(self):
+        """Import every tool used by any flow now, e.g. before a worker takes traffic."""
+        for flow in self.flows.values():
+            if isinstance(flow, FlowSpec):
+                flow.tools
+                continue
+            for k in flow.get("tools", []):
+                self.tool_registry[k]
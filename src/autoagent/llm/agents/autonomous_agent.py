@@ -1,31 +1,87 @@
 # autoagent/llm/agents/autonomous_agent.py
 
 from autoagent.llm.client import LLMClient
+from autoagent.llm.tokens import estimate_tokens
 from .base_agent import BaseAgent
 
+DONE_MARKER = "GOAL COMPLETE:"
+
 class AutonomousAgent(BaseAgent):
     """
     AutoGPT–style: plan → execute → evaluate → re-plan in a loop.
+
+    Working memory is bounded: the last `keep_last` steps are kept verbatim
+    and older ones are folded into a rolling summary, so prompt size stays
+    flat as iterations grow. The loop ends as soon as the model reports
+    the goal complete.
     """
 
-    def __init__(self, config: dict, tool_registry: dict, max_iters: int = 5):
+    def __init__(self, config: dict, tool_registry: dict, max_iters: int = 5,
+                 keep_last: int = 3, summary_max_tokens: int = 256):
         super().__init__(config, tool_registry)
-        self.llm = LLMClient(
-            api_key=config["api_key"],
-            model=config["model"],
-            base_url=config.get("base_url")
-        )
+        self.llm = LLMClient.from_config(config)
         self.max_iters = max_iters
+        self.keep_last = max(1, keep_last)
+        self.summary_max_tokens = summary_max_tokens
+
+    def _build_prompt(self, goal: str, summary: str, recent: list) -> str:
+        parts = [f"Goal: {goal}"]
+        if summary:
+            parts.append(f"Summary of earlier steps:\n{summary}")
+        if recent:
+            parts.append("Recent steps:\n" + "\n".join(recent))
+        parts.append(
+            "Next action? If the goal has been achieved, reply "
+            f"`{DONE_MARKER}` followed by the final answer."
+        )
+        return "\n".join(parts)
+
+    def _summarize(self, goal: str, summary: str, steps: list) -> str:
+        prompt = (
+            f"Goal: {goal}\n"
+            f"Current summary:\n{summary or '(none)'}\n"
+            "New steps:\n" + "\n".join(steps) + "\n"
+            "Update the summary so it keeps every fact and decision still "
+            "relevant to the goal. Be concise."
+        )
+        return self.llm.chat([{"role": "user", "content": prompt}],
+                             temperature=0.0, max_tokens=self.summary_max_tokens)
 
     def run(self, input_text: str, context: str = "") -> dict:
         trace = []
-        memory = []
+        summary = ""
+        recent = []
         goal = input_text
+        answer = ""
+        total_tokens = 0
+        model = self.config.get("model")
 
         for i in range(self.max_iters):
-            prompt = f"Goal: {goal}\nMemory:\n{memory}\nNext action?"
+            prompt = self._build_prompt(goal, summary, recent)
             resp = self.llm.chat([{"role": "user", "content": prompt}])
-            trace.append({f"step_{i+1}": resp})
-            memory.append(resp)
+            step = {
+                f"step_{i+1}": resp,
+                "prompt_tokens": estimate_tokens(prompt, model),
+                "completion_tokens": estimate_tokens(resp, model),
+            }
+
+            done = DONE_MARKER in resp
+            answer = resp.split(DONE_MARKER, 1)[1].strip() if done else resp
+            recent.append(f"Step {i+1}: {resp}")
+
+            # Fold older steps into the summary in batches, one call per keep_last steps
+            if not done and len(recent) >= 2 * self.keep_last:
+                folded, recent = recent[:-self.keep_last], recent[-self.keep_last:]
+                summary_prompt_tokens = estimate_tokens(summary, model) + sum(
+                    estimate_tokens(s, model) for s in folded)
+                summary = self._summarize(goal, summary, folded)
+                step["summary_tokens"] = summary_prompt_tokens + estimate_tokens(summary, model)
+
+            total_tokens += step["prompt_tokens"] + step["completion_tokens"] + step.get("summary_tokens", 0)
+            trace.append(step)
+            if done:
+                trace.append({"goal_complete": i + 1})
+                break
 
-        return {"answer": memory[-1] if memory else "", "trace": trace}
+        trace.append({"total_tokens": total_tokens})
+        return {"answer": answer, "trace": trace}
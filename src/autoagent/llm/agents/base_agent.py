@@ -1,13 +1,23 @@
 from abc import ABC, abstractmethod
+from typing import Iterator
+
+from autoagent.telemetry.tracing import trace_method
 
 class BaseAgent(ABC):
     """
     Common interface for all agents.
+    Subclasses' `run` is traced as an "agent.run" span.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        trace_method(cls, "run", "agent.run", agent=cls.__name__)
+
     def __init__(self, config: dict, tool_registry: dict):
         self.config = config
         self.tools = tool_registry
+        # Per-session scratch space; AgentRunner swaps in the session's dict
+        self.session_state = {}
 
     @abstractmethod
     def run(self, input_text: str, context: str = "") -> dict:
@@ -16,3 +26,15 @@ class BaseAgent(ABC):
         Returns dict with keys 'answer', 'trace', and optionally 'tools'.
         """
         pass
+
+    def stream(self, input_text: str, context=None) -> Iterator[str]:
+        """
+        Execute the agent’s logic, yielding answer text deltas as they arrive.
+        The generator's return value is the same dict `run` returns.
+
+        Agents without native streaming yield the full answer once.
+        """
+        result = self.run(input_text, context=context)
+        if result.get("answer"):
+            yield result["answer"]
+        return result
@@ -1,28 +1,61 @@
 # autoagent/llm/agents/code_agent.py
 
+import re
+
 from autoagent.llm.client import LLMClient
+from autoagent.executor.sandbox import SandboxPool, get_sandbox_pool
 from .base_agent import BaseAgent
 
+_CODE_FENCE = re.compile(r"```(?:python|py)?\s*\n(.*?)```", re.DOTALL)
+
 class CodeAgent(BaseAgent):
     """
     Generates code and (optionally) loops on execution errors.
+
+    Execution of model-written code is opt-in: with `execute=True` each
+    attempt runs in the shared sandbox pool (see executor/sandbox.py for
+    what it does and does not isolate); on failure the error is fed back
+    to the model, up to `max_attempts` tries.
     """
 
-    def __init__(self, config: dict, tool_registry: dict):
+    def __init__(self, config: dict, tool_registry: dict, execute: bool = False,
+                 max_attempts: int = 3, sandbox: SandboxPool = None):
         super().__init__(config, tool_registry)
-        self.llm = LLMClient(
-            api_key=config["api_key"],
-            model=config["model"],
-            base_url=config.get("base_url")
-        )
+        self.llm = LLMClient.from_config(config)
+        self.execute = execute
+        self.max_attempts = max(1, max_attempts)
+        self.sandbox = sandbox
+
+    @staticmethod
+    def _extract_code(reply: str) -> str:
+        """Take the first fenced block if the model used Markdown."""
+        m = _CODE_FENCE.search(reply)
+        return (m.group(1) if m else reply).strip()
 
     def run(self, input_text: str, context: str = "") -> dict:
         trace = []
         # 1) Prompt for code
         prompt = f"Write Python code for the following:\n{input_text}"
-        code = self.llm.chat([{"role": "user", "content": prompt}])
+        messages = [{"role": "user", "content": prompt}]
+        code = self._extract_code(self.llm.chat(messages))
         trace.append({"generated_code": code})
+        if not self.execute:
+            return {"answer": code, "trace": trace}
+
+        # 2) Execute in sandbox & feed errors back until it runs or attempts run out
+        sandbox = self.sandbox or get_sandbox_pool()
+        for attempt in range(1, self.max_attempts + 1):
+            result = sandbox.run(code)
+            trace.append({"attempt": attempt, "execution": result})
+            if result["ok"] or attempt == self.max_attempts:
+                break
+
+            messages.append({"role": "assistant", "content": code})
+            messages.append({"role": "user", "content": (
+                f"Running that code failed:\n{result['error']}\n"
+                "Return only the corrected, complete Python code."
+            )})
+            code = self._extract_code(self.llm.chat(messages))
+            trace.append({"generated_code": code})
 
-        # 2) (Optional) execute in sandbox & capture errors/results
-        #    For now we return code only
-        return {"answer": code, "trace": trace}
+        return {"answer": code, "trace": trace, "output": result["stdout"], "ok": result["ok"]}
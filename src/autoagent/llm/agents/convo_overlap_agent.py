@@ -10,22 +10,39 @@ class ConvoOverlapAgent(BaseAgent):
 
     def __init__(self, config: dict, tool_registry: dict):
         super().__init__(config, tool_registry)
-        self.llm = LLMClient(
-            api_key=config["api_key"],
-            model=config["model"],
-            base_url=config.get("base_url")
-        )
+        self.llm = LLMClient.from_config(config)
+
+    def _build_messages(self, input_text: str, context: list = None) -> list:
+        messages = context.copy() if context else []
+        messages.append({"role": "user", "content": input_text})
+        return messages
 
     def run(self, input_text: str, context: list = None) -> dict:
         """
         context: list of messages with roles ['user','assistant','supervisor']
         """
         trace = []
-        messages = context.copy() if context else []
-        messages.append({"role": "user", "content": input_text})
+        messages = self._build_messages(input_text, context)
         trace.append({"input": input_text, "context_length": len(messages)})
 
         answer = self.llm.chat(messages)
         trace.append({"assistant": answer})
 
         return {"answer": answer, "trace": trace}
+
+    def stream(self, input_text: str, context: list = None):
+        """
+        Same as `run`, but yields reply deltas as the model produces them.
+        """
+        trace = []
+        messages = self._build_messages(input_text, context)
+        trace.append({"input": input_text, "context_length": len(messages)})
+
+        parts = []
+        for delta in self.llm.stream_chat(messages):
+            parts.append(delta)
+            yield delta
+        answer = "".join(parts).strip()
+        trace.append({"assistant": answer})
+
+        return {"answer": answer, "trace": trace}
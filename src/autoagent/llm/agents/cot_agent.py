@@ -10,11 +10,7 @@ class CoTAgent(BaseAgent):
 
     def __init__(self, config: dict, tool_registry: dict):
         super().__init__(config, tool_registry)
-        self.llm = LLMClient(
-            api_key=config["api_key"],
-            model=config["model"],
-            base_url=config.get("base_url")
-        )
+        self.llm = LLMClient.from_config(config)
 
     def run(self, input_text: str, context: str = "") -> dict:
         trace = []
@@ -27,3 +23,20 @@ class CoTAgent(BaseAgent):
         trace.append({"llm_answer": answer})
 
         return {"answer": answer, "trace": trace}
+
+    def stream(self, input_text: str, context: str = ""):
+        """
+        Same as `run`, but yields reply deltas as the model produces them.
+        """
+        trace = []
+        prompt = f"Please solve step-by-step:\n{input_text}"
+        trace.append({"prompt": prompt})
+
+        parts = []
+        for delta in self.llm.stream_chat([{"role": "user", "content": prompt}]):
+            parts.append(delta)
+            yield delta
+        answer = "".join(parts).strip()
+        trace.append({"llm_answer": answer})
+
+        return {"answer": answer, "trace": trace}
@@ -1,37 +1,128 @@
 # autoagent/llm/agents/rag_agent.py
 
+import time
+
 from autoagent.llm.client import LLMClient
+from autoagent.rag.context_packer import ContextPacker
+from autoagent.rag.prefetch import RetrievalPrefetcher
+from autoagent.rag.retrievers.contextual_rag import ContextualRAG
 from .base_agent import BaseAgent
 
 class RAGAgent(BaseAgent):
     """
     Retrieval-Augmented Generation: fetches docs, injects into prompt, then calls LLM.
+    Retrieved chunks are deduplicated and packed into `context_token_budget` tokens.
+
+    With `prefetch=True` the agent speculatively retrieves for the likely next
+    query (this question plus the answer so far) while the answer is being
+    generated; the next turn reuses those docs when its bare question is
+    similar enough to this one (`prefetch_similarity`, Jaccard over content
+    words) instead of waiting on retrieval.
     """
 
-    def __init__(self, config: dict, tool_registry: dict, retriever=None):
+    def __init__(self, config: dict, tool_registry: dict, retriever=None,
+                 context_token_budget: int = 2000, prefetch: bool = False,
+                 prefetch_similarity: float = 0.4, prefetch_after_chars: int = 200):
         super().__init__(config, tool_registry)
-        self.llm = LLMClient(
-            api_key=config["api_key"],
-            model=config["model"],
-            base_url=config.get("base_url")
-        )
+        self.llm = LLMClient.from_config(config)
         self.retriever = retriever  # e.g. an instance of your Retriever
+        self.packer = ContextPacker(context_token_budget, model=config.get("model"))
+        self.prefetch = prefetch and retriever is not None
+        self.prefetch_similarity = prefetch_similarity
+        self.prefetch_after_chars = prefetch_after_chars
 
-    def run(self, input_text: str, context: str = "") -> dict:
-        trace = []
-        # 1) Retrieve relevant context
-        docs = self.retriever.retrieve(input_text) if self.retriever else []
-        trace.append({"retrieved_docs": docs})
+    def _prefetcher(self) -> RetrievalPrefetcher:
+        # One per session and retriever, so speculation survives across turns
+        key = ("rag_prefetcher", id(self.retriever))
+        pf = self.session_state.get(key)
+        if pf is None or pf.retriever is not self.retriever:
+            pf = RetrievalPrefetcher(self.retriever, self.prefetch_similarity)
+            self.session_state[key] = pf
+        return pf
 
-        # 2) Build prompt with docs
-        prompt = f"""Use the following context to answer.
+    def _retrieve(self, input_text: str, context, trace: list) -> list:
+        start = time.perf_counter()
+        docs = None
+        if self.prefetch:
+            # the bare question: ContextualRAG's query repeats the last turn,
+            # which is also what the prefetch was keyed on
+            docs = self._prefetcher().take(input_text)
+            trace.append({"prefetch": "hit" if docs is not None else "miss"})
+        if docs is None:
+            if isinstance(self.retriever, ContextualRAG):
+                docs = self.retriever.retrieve(input_text, context=context or None)
+            else:
+                docs = self.retriever.retrieve(input_text) if self.retriever else []
+        trace.append({
+            "retrieved_docs": docs,
+            "retrieval_ms": round((time.perf_counter() - start) * 1000, 1)
+        })
+        return docs
+
+    def _schedule_prefetch(self, input_text: str, answer: str):
+        """Follow-ups usually stay on the topic of the last question and answer."""
+        if self.prefetch:
+            self._prefetcher().schedule(f"{input_text} {answer}", match_text=input_text)
+
+    def _build_prompt(self, input_text: str, docs: list, trace: list) -> str:
+        context, packed = self.packer.pack(docs)
+        trace.append({
+            "packed_sources": [p["source"] for p in packed],
+            "context_tokens": sum(p["tokens"] for p in packed)
+        })
+        return f"""Use the following context to answer.
         Context:
-        {chr(10).join(docs)}
+        {context}
 
         Question: {input_text}
         """
+
+    def run(self, input_text: str, context: str = "") -> dict:
+        trace = []
+        # 1) Retrieve relevant context
+        docs = self._retrieve(input_text, context, trace)
+
+        # 2) Build prompt with docs
+        prompt = self._build_prompt(input_text, docs, trace)
         # 3) Call LLM
+        start = time.perf_counter()
         answer = self.llm.chat([{"role": "user", "content": prompt}])
-        trace.append({"llm_answer": answer})
+        trace.append({
+            "llm_answer": answer,
+            "generation_ms": round((time.perf_counter() - start) * 1000, 1)
+        })
+        self._schedule_prefetch(input_text, answer)
+
+        return {"answer": answer, "trace": trace}
+
+    def stream(self, input_text: str, context: str = ""):
+        """
+        Same as `run`, but yields reply deltas as the model produces them.
+        Retrieval still completes before the first delta; the next-turn
+        prefetch starts once `prefetch_after_chars` of the answer exist.
+        """
+        trace = []
+        docs = self._retrieve(input_text, context, trace)
+
+        prompt = self._build_prompt(input_text, docs, trace)
+        start = time.perf_counter()
+        parts = []
+        streamed, prefetched = 0, False
+        for delta in self.llm.stream_chat([{"role": "user", "content": prompt}]):
+            if not parts:
+                trace.append({"first_token_ms": round((time.perf_counter() - start) * 1000, 1)})
+            parts.append(delta)
+            streamed += len(delta)
+            if not prefetched and streamed >= self.prefetch_after_chars:
+                self._schedule_prefetch(input_text, "".join(parts))
+                prefetched = True
+            yield delta
+        answer = "".join(parts).strip()
+        if not prefetched:
+            self._schedule_prefetch(input_text, answer)
+        trace.append({
+            "llm_answer": answer,
+            "generation_ms": round((time.perf_counter() - start) * 1000, 1)
+        })
 
         return {"answer": answer, "trace": trace}
@@ -1,31 +1,151 @@
 # autoagent/llm/agents/react_agent.py
 
+import asyncio
 import json
+import threading
+import time
+from collections import OrderedDict
 from autoagent.llm.client import LLMClient
+from autoagent.telemetry.tracing import propagate
+from autoagent.tools.executor import get_executor
+from autoagent.tools.tool_runner import run_tool_async
 # from autoagent.llm.prompts import REACT_PROMPT_TEMPLATE
 from .base_agent import BaseAgent
 
-REACT_PROMPT_TEMPLATE = ''
+REACT_PROMPT_TEMPLATE = """You answer questions by reasoning and calling tools.
+Available tools: {tool_names}
+
+Reply with JSON only, in one of these forms:
+  {{"action": "<tool>", "input": {{...}}}}
+  {{"actions": [{{"action": "<tool>", "input": {{...}}}}, ...]}}   (independent calls, run in parallel)
+  {{"action": "final_answer", "output": "<answer>"}}
+
+Question: {query}
+"""
+
+class _ToolResultCache:
+    """Per-session memo of tool results: LRU-bounded, entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (expires_at, result)
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        """Returns (hit, result)."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] < time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, entry[1]
+
+    def put(self, key: tuple, result):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, result)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
 
 class ReActAgent(BaseAgent):
     """
     Implements the ReAct pattern: interleaved reasoning and tool calls.
+
+    A step may request several independent actions; they run concurrently
+    through `run_tool_async`. Identical (tool, input) calls to tools marked
+    `cacheable` are answered from a per-session memo (at most
+    `tool_cache_size` results, each kept `tool_cache_ttl` seconds) instead
+    of re-running the tool.
     """
 
-    def __init__(self, config: dict, tool_registry: dict, max_steps: int = 5):
+    def __init__(self, config: dict, tool_registry: dict, max_steps: int = 5,
+                 tool_timeout: float = 10.0, tool_cache_size: int = 128,
+                 tool_cache_ttl: float = 300.0):
         super().__init__(config, tool_registry)
-        self.llm = LLMClient(
-            api_key=config["api_key"],
-            model=config["model"],
-            base_url=config.get("base_url")
-        )
+        self.llm = LLMClient.from_config(config)
         self.max_steps = max_steps
+        self.tool_timeout = tool_timeout
+        self.tool_cache_size = tool_cache_size
+        self.tool_cache_ttl = tool_cache_ttl
 
-    def call_tool(self, name: str, arg: str) -> str:
+    @property
+    def _tool_cache(self) -> _ToolResultCache:
+        cache = self.session_state.get("react_tool_cache")
+        if not isinstance(cache, _ToolResultCache):
+            cache = self.session_state["react_tool_cache"] = _ToolResultCache(
+                self.tool_cache_size, self.tool_cache_ttl)
+        return cache
+
+    async def _call_tool(self, name: str, arg) -> tuple:
+        """
+        Run one action. Returns (result, cached, elapsed_ms).
+        Failures come back as an error string for the model to observe.
+        """
         tool_cls = self.tools.get(name)
         if not tool_cls:
-            return f"[ERROR: unknown tool '{name}']"
-        return tool_cls().run(arg)
+            return f"[ERROR: unknown tool '{name}']", False, 0.0
+        if isinstance(arg, str):
+            try:
+                arg = json.loads(arg)
+            except ValueError:
+                pass
+        if not isinstance(arg, dict):
+            return f"[ERROR: input for '{name}' must be a JSON object]", False, 0.0
+
+        cacheable = getattr(tool_cls, "cacheable", False)
+        key = (name, json.dumps(arg, sort_keys=True, default=str))
+        if cacheable:
+            hit, result = self._tool_cache.get(key)
+            if hit:
+                return result, True, 0.0
+
+        start = time.perf_counter()
+        try:
+            # the flow's own class, not whatever the global registry has under that name
+            result = await run_tool_async(tool_cls, arg, timeout=self.tool_timeout)
+        except Exception as exc:
+            return f"[ERROR: {type(exc).__name__}: {exc}]", False, (time.perf_counter() - start) * 1000
+        if cacheable:
+            self._tool_cache.put(key, result)
+        return result, False, (time.perf_counter() - start) * 1000
+
+    async def _call_tools(self, actions: list) -> list:
+        return await asyncio.gather(
+            *(self._call_tool(a.get("action"), a.get("input", {})) for a in actions)
+        )
+
+    def call_tools(self, actions: list) -> list:
+        """Run a step's actions concurrently from sync code."""
+        coro = self._call_tools(actions)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        # Already inside an event loop (e.g. called from async code): run the
+        # step's loop on a thread of the shared tool executor
+        return get_executor().submit(propagate(asyncio.run), coro).result()
+
+    @staticmethod
+    def _parse_actions(resp: str):
+        """
+        Returns ("final", output) or ("tools", [ {action, input}, ... ]).
+        Raises ValueError on malformed replies.
+        """
+        parsed = json.loads(resp)
+        if isinstance(parsed, dict) and "actions" in parsed:
+            parsed = parsed["actions"]
+        actions = parsed if isinstance(parsed, list) else [parsed]
+        if not actions or not all(isinstance(a, dict) for a in actions):
+            raise ValueError("expected an action object or a list of them")
+        for a in actions:
+            if a.get("action") == "final_answer":
+                return "final", a.get("output", "")
+        return "tools", actions
 
     def run(self, input_text: str, context: str = "") -> dict:
         trace = []
@@ -37,25 +157,39 @@ class ReActAgent(BaseAgent):
 
         for step in range(self.max_steps):
             # 1) Ask the LLM
+            start = time.perf_counter()
             resp = self.llm.chat(messages)
-            trace.append({"step": step + 1, "llm": resp})
+            llm_ms = (time.perf_counter() - start) * 1000
+            trace.append({"step": step + 1, "llm": resp, "llm_ms": round(llm_ms, 1)})
 
             # 2) Parse JSON
             try:
-                action = json.loads(resp)
-                name = action.get("action")
-                if name == "final_answer":
-                    return {"answer": action.get("output", ""), "trace": trace}
-                arg = action.get("input", "")
+                kind, payload = self._parse_actions(resp)
             except Exception:
                 return {"answer": "[ERROR: invalid JSON from LLM]", "trace": trace}
+            if kind == "final":
+                return {"answer": payload, "trace": trace}
 
-            # 3) Run tool
-            result = self.call_tool(name, arg)
-            trace.append({"tool": name, "input": arg, "result": result})
+            # 3) Run this step's tools concurrently
+            start = time.perf_counter()
+            results = self.call_tools(payload)
+            tools_ms = (time.perf_counter() - start) * 1000
+            calls = []
+            for action, (result, cached, elapsed_ms) in zip(payload, results):
+                calls.append({
+                    "tool": action.get("action"), "input": action.get("input", {}),
+                    "result": result, "cached": cached, "elapsed_ms": round(elapsed_ms, 1)
+                })
+            trace.append({"step": step + 1, "tools": calls, "tools_ms": round(tools_ms, 1)})
 
-            # 4) Feed observation back
+            # 4) Feed observations back
             messages.append({"role": "assistant", "content": resp})
-            messages.append({"role": "user", "content": f"Observation: {result}"})
+            if len(calls) == 1:
+                observation = f"Observation: {json.dumps(calls[0]['result'], default=str)}"
+            else:
+                observation = "\n".join(
+                    f"Observation [{c['tool']}]: {json.dumps(c['result'], default=str)}" for c in calls
+                )
+            messages.append({"role": "user", "content": observation})
 
         return {"answer": "[Stopped: max steps reached]", "trace": trace}
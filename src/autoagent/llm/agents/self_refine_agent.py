@@ -1,36 +1,119 @@
 # autoagent/llm/agents/self_refine_agent.py
 
+import re
+import time
+from difflib import SequenceMatcher
+from typing import Optional
+
 from autoagent.llm.client import LLMClient
 from .base_agent import BaseAgent
 
+_VERDICT = re.compile(r"^\s*VERDICT\s*:\s*(OK|REVISE)\b[^\n]*\n?", re.IGNORECASE)
+
 class SelfRefineAgent(BaseAgent):
     """
     Draft → Critique → Refine loop for improved outputs.
+
+    The loop exits early when the critique's verdict is OK, when a refined
+    draft is nearly identical to the previous one (`similarity_threshold`),
+    or when another iteration would exceed `max_latency` seconds (judged by
+    the slowest iteration so far; before the first one, by the draft call's
+    time per LLM call an iteration makes).
+    With `merge_steps=True` critique and refinement share one LLM call.
     """
 
-    def __init__(self, config: dict, tool_registry: dict, iterations: int = 3):
+    def __init__(self, config: dict, tool_registry: dict, iterations: int = 3,
+                 similarity_threshold: float = 0.95, max_latency: Optional[float] = None,
+                 merge_steps: bool = False):
         super().__init__(config, tool_registry)
-        self.llm = LLMClient(
-            api_key=config["api_key"],
-            model=config["model"],
-            base_url=config.get("base_url")
-        )
+        self.llm = LLMClient.from_config(config)
         self.iterations = iterations
+        self.similarity_threshold = similarity_threshold
+        self.max_latency = max_latency
+        self.merge_steps = merge_steps
+
+    @staticmethod
+    def _parse_verdict(text: str) -> tuple:
+        """
+        Split a leading `VERDICT: OK|REVISE` line from the rest of the reply.
+        Returns (verdict or None, remaining text).
+        """
+        m = _VERDICT.match(text)
+        if not m:
+            return None, text
+        return m.group(1).upper(), text[m.end():].strip()
+
+    def _critique_and_refine(self, input_text: str, draft: str, trace: list, i: int):
+        """Two calls: critique, then refine. Returns (verdict, new draft, LLM calls made)."""
+        critique_prompt = (
+            f"Question:\n{input_text}\n\nCritique the following answer:\n{draft}\n\n"
+            "Start your reply with `VERDICT: OK` if it needs no changes, "
+            "otherwise `VERDICT: REVISE`, then explain."
+        )
+        critique = self.llm.chat([{"role": "user", "content": critique_prompt}], task="critique")
+        trace.append({"critique": critique})
+        verdict, _ = self._parse_verdict(critique)
+        if verdict == "OK":
+            return verdict, draft, 1
+
+        refine_prompt = f"Refine your previous answer based on this critique:\nCritique: {critique}\nAnswer:\n{draft}"
+        refined = self.llm.chat([{"role": "user", "content": refine_prompt}])
+        trace.append({f"refined_{i+1}": refined})
+        return verdict, refined, 2
+
+    def _merged_step(self, input_text: str, draft: str, trace: list, i: int):
+        """One call that either approves the draft or returns a revision."""
+        prompt = (
+            f"Question:\n{input_text}\n\nReview the following answer:\n{draft}\n\n"
+            "If it needs no changes, reply with exactly `VERDICT: OK`. "
+            "Otherwise reply with `VERDICT: REVISE` on the first line, "
+            "followed only by the improved answer."
+        )
+        resp = self.llm.chat([{"role": "user", "content": prompt}])
+        verdict, body = self._parse_verdict(resp)
+        if verdict == "OK" or not body:
+            trace.append({"critique": resp})
+            return "OK", draft, 1
+        trace.append({f"refined_{i+1}": body})
+        return verdict, body, 1
 
     def run(self, input_text: str, context: str = "") -> dict:
         trace = []
+        start = time.perf_counter()
         # 1) Initial draft
         draft = self.llm.chat([{"role": "user", "content": input_text}])
         trace.append({"draft": draft})
+        llm_calls = 1
 
-        # 2) Iterative critique & refine
+        # 2) Iterative critique & refine, until converged or out of budget
+        step = self._merged_step if self.merge_steps else self._critique_and_refine
+        # until an iteration has been timed, assume each of its calls takes as long as the draft
+        draft_time = time.perf_counter() - start
+        expected = draft_time * (1 if self.merge_steps else 2)
+        slowest = None
+        stopped = "max_iterations"
         for i in range(self.iterations):
-            critique_prompt = f"Critique the following answer:\n{draft}"
-            critique = self.llm.chat([{"role": "user", "content": critique_prompt}])
-            trace.append({"critique": critique})
+            iter_start = time.perf_counter()
+            per_iter = expected if slowest is None else slowest
+            if self.max_latency is not None and iter_start - start + per_iter > self.max_latency:
+                stopped = "latency_budget"
+                break
+
+            verdict, refined, calls = step(input_text, draft, trace, i)
+            llm_calls += calls
+            slowest = max(slowest or 0.0, time.perf_counter() - iter_start)
 
-            refine_prompt = f"Refine your previous answer based on this critique:\nCritique: {critique}\nAnswer:\n{draft}"
-            draft = self.llm.chat([{"role": "user", "content": refine_prompt}])
-            trace.append({f"refined_{i+1}": draft})
+            if verdict == "OK":
+                stopped = "verdict_ok"
+                break
+            similarity = SequenceMatcher(None, draft, refined).ratio()
+            draft = refined
+            if similarity >= self.similarity_threshold:
+                stopped = "converged"
+                break
 
+        trace.append({
+            "stopped": stopped, "llm_calls": llm_calls,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+        })
         return {"answer": draft, "trace": trace}
@@ -1,33 +1,110 @@
 # autoagent/llm/agents/tot_agent.py
 
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
 from autoagent.llm.client import LLMClient
+from autoagent.telemetry.tracing import propagate
 from .base_agent import BaseAgent
 
+_SCORE_LINE = re.compile(r"^\s*\[?(\d+)\]?\s*[:=\-]\s*([01](?:\.\d+)?)")
+
 class TOTAgent(BaseAgent):
     """
     Tree-of-Thoughts: explores multiple reasoning branches and picks the best.
+
+    Each level generates `branches` thoughts per surviving node concurrently,
+    scores them in a single LLM call, and keeps the `beam_width` best.
+    The search stops after `depth` levels, or as soon as a branch scores at
+    least `score_threshold`.
     """
 
-    def __init__(self, config: dict, tool_registry: dict, branches: int = 3):
+    def __init__(self, config: dict, tool_registry: dict, branches: int = 3,
+                 beam_width: int = 2, depth: int = 1, score_threshold: float = 0.9):
         super().__init__(config, tool_registry)
-        self.llm = LLMClient(
-            api_key=config["api_key"],
-            model=config["model"],
-            base_url=config.get("base_url")
-        )
+        self.llm = LLMClient.from_config(config)
         self.branches = branches
+        self.beam_width = beam_width
+        self.depth = depth
+        self.score_threshold = score_threshold
+
+    def _expand(self, input_text: str, parent: str, index: int) -> tuple:
+        if parent:
+            prompt = (
+                f"[Path {index}] Question:\n{input_text}\n\n"
+                f"Reasoning so far:\n{parent}\n\n"
+                "Continue this reasoning step-by-step, fixing any mistakes, "
+                "and finish with a complete answer."
+            )
+        else:
+            prompt = f"[Path {index}] Think step-by-step:\n{input_text}"
+        start = time.perf_counter()
+        out = self.llm.chat([{"role": "user", "content": prompt}])
+        return out, (time.perf_counter() - start) * 1000
+
+    def _score(self, input_text: str, candidates: List[str]) -> List[float]:
+        """
+        Rate all candidates in one call; unparseable entries score 0.0.
+        """
+        listing = "\n\n".join(f"[{i}]\n{c}" for i, c in enumerate(candidates))
+        prompt = (
+            f"Question:\n{input_text}\n\nCandidate answers:\n{listing}\n\n"
+            "On a scale of 0–1, how correct and complete is each candidate? "
+            "Reply with one line per candidate in the form `<index>: <score>`."
+        )
+        resp = self.llm.chat([{"role": "user", "content": prompt}], temperature=0.0, task="critique")
+        scores = [0.0] * len(candidates)
+        for line in resp.splitlines():
+            m = _SCORE_LINE.match(line)
+            if m and int(m.group(1)) < len(candidates):
+                scores[int(m.group(1))] = min(float(m.group(2)), 1.0)
+        return scores
 
     def run(self, input_text: str, context: str = "") -> dict:
         trace = []
-        candidates = []
+        beam = [""]  # surviving partial reasoning paths; "" is the root
+        best, best_score = "", -1.0
+
+        with ThreadPoolExecutor(max_workers=max(1, self.branches * self.beam_width)) as ex:
+            for level in range(1, self.depth + 1):
+                # 1) Expand every surviving node concurrently
+                jobs = []
+                for parent_idx, parent in enumerate(beam):
+                    for b in range(self.branches):
+                        index = len(jobs) + 1
+                        fut = ex.submit(propagate(self._expand), input_text, parent, index)
+                        jobs.append((parent_idx, fut))
+
+                candidates = []
+                for i, (parent_idx, fut) in enumerate(jobs):
+                    out, elapsed_ms = fut.result()
+                    candidates.append(out)
+                    trace.append({
+                        "depth": level, "path": i + 1, "parent": parent_idx,
+                        "elapsed_ms": round(elapsed_ms, 1), "output": out
+                    })
+                if not candidates:
+                    break
+
+                # 2) Score and prune to the beam width
+                start = time.perf_counter()
+                scores = self._score(input_text, candidates)
+                ranked = sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True)
+                kept = ranked[:self.beam_width]
+                trace.append({
+                    "depth": level, "scores": scores, "kept": [i + 1 for i in kept],
+                    "scoring_ms": round((time.perf_counter() - start) * 1000, 1)
+                })
+
+                if scores[ranked[0]] > best_score:
+                    best, best_score = candidates[ranked[0]], scores[ranked[0]]
+                beam = [candidates[i] for i in kept]
 
-        # 1) Generate several reasoning paths
-        for i in range(self.branches):
-            prompt = f"[Path {i+1}] Think step-by-step:\n{input_text}"
-            out = self.llm.chat([{"role": "user", "content": prompt}])
-            candidates.append(out)
-            trace.append({f"path_{i+1}": out})
+                # 3) Early exit once a branch is good enough
+                if best_score >= self.score_threshold:
+                    trace.append({"early_stop": level, "score": best_score})
+                    break
 
-        # 2) Naïvely pick the first (real logic would score/prune)
-        best = candidates[0] if candidates else ""
         return {"answer": best, "trace": trace}
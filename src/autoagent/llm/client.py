@@ -1,13 +1,64 @@
 # autoagent/llm/client.py
 
-import openai
-from typing import List, Dict, Any, Iterator, Optional
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import List, Dict, Any, Iterator, Optional, Union
+
+from autoagent.llm.rate_limit import RateLimiter, get_rate_limiter
+from autoagent.llm.retry import RetryPolicy, is_retryable
+from autoagent.llm.router import INTERNAL_TASKS, Endpoint, EndpointRouter, endpoint_router
+from autoagent.llm.tokens import estimate_tokens
+from autoagent.llm.usage import CallRecord, TurnUsage, usage_registry
+from autoagent.telemetry.tracing import span
+
+# Keyless SDK clients per base_url, so connection pools survive across the
+# short-lived LLMClients that agents build every turn. Callers get a copy bound
+# to their key that shares the pool, so no plaintext key stays in this cache.
+_sdk_clients: "OrderedDict[Optional[str], Any]" = OrderedDict()
+_sdk_lock = threading.Lock()
+_SDK_CLIENTS_MAX = 256
+
+def _sdk_client(api_key: str, base_url: Optional[str]):
+    with _sdk_lock:
+        client = _sdk_clients.get(base_url)
+        if client is not None:
+            _sdk_clients.move_to_end(base_url)
+    if client is None:
+        import openai
+        # Retries are handled by RetryPolicy, not the SDK
+        client = openai.OpenAI(api_key="unset", base_url=base_url, max_retries=0)
+        with _sdk_lock:
+            client = _sdk_clients.setdefault(base_url, client)
+            while len(_sdk_clients) > _SDK_CLIENTS_MAX:
+                _sdk_clients.popitem(last=False)
+    return client.with_options(api_key=api_key)
 
 
 class LLMClient:
     """
     Wrapper around OpenAI’s Python SDK for chat, completion, embeddings,
     with optional streaming support.
+
+    When `rate_limits` (this tenant) or `key_rate_limits` (the API key) are
+    given as {"rpm", "tpm", "max_in_flight"}, every call first waits for
+    admission from the shared RateLimiter.
+
+    Every call uses `retry` (a RetryPolicy or its kwargs): per-attempt
+    timeout, jittered exponential backoff honouring Retry-After, and
+    optional hedged requests for non-streaming calls.
+
+    `endpoints` adds further OpenAI-compatible backends (Endpoint objects or
+    {"base_url", "api_key", "model", "internal_model"} dicts; missing keys
+    fall back to this client's) next to the primary one. Chat and completion
+    calls are balanced across them by observed latency and fail over on
+    retryable errors. Calls made with `task` in INTERNAL_TASKS ("rerank",
+    "rewrite", "critique") use `internal_model` when set.
+
+    Each call's token usage, latency and model are recorded in
+    `usage.usage_registry`, and in `usage` (a TurnUsage) when given.
     """
 
     def __init__(
@@ -16,12 +67,167 @@ class LLMClient:
         model: str = "gpt-4",
         base_url: Optional[str] = None,
         embedding_model: str = "text-embedding-ada-002",
+        tenant_id: Optional[str] = None,
+        rate_limits: Optional[Dict[str, int]] = None,
+        key_rate_limits: Optional[Dict[str, int]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        queue_timeout: Optional[float] = None,
+        retry: Union[None, dict, RetryPolicy] = None,
+        endpoints: Optional[List[Union[dict, Endpoint]]] = None,
+        internal_model: Optional[str] = None,
+        router: Optional[EndpointRouter] = None,
+        usage: Optional[TurnUsage] = None,
     ):
-        openai.api_key = api_key
-        if base_url:
-            openai.api_base = base_url
+        self.api_key = api_key
+        self.base_url = base_url
+        self.client = _sdk_client(api_key, base_url)
+        self._endpoint_clients: Dict[int, Any] = {}  # id(endpoint) -> SDK client
         self.model = model
         self.embedding_model = embedding_model
+        self.tenant_id = tenant_id
+        self.rate_limits = rate_limits
+        self.key_rate_limits = key_rate_limits
+        self.queue_timeout = queue_timeout
+        limited = bool(rate_limits or key_rate_limits)
+        self.rate_limiter = (rate_limiter or get_rate_limiter()) if limited else None
+        self.retry = RetryPolicy.coerce(retry)
+        self.internal_model = internal_model
+        self.router = router or endpoint_router
+        self.usage = usage
+        self.endpoints = [Endpoint(base_url, api_key)] + [
+            ep if isinstance(ep, Endpoint) else Endpoint.from_dict(ep, api_key)
+            for ep in endpoints or ()
+        ]
+
+    @classmethod
+    def from_config(cls, config: dict, **kwargs: Any) -> "LLMClient":
+        """Build a client from a resolved LLM config (see config.llm_resolver)."""
+        return cls(
+            api_key=config["api_key"],
+            model=config["model"],
+            base_url=config.get("base_url"),
+            tenant_id=config.get("tenant_id"),
+            rate_limits=config.get("rate_limits"),
+            key_rate_limits=config.get("key_rate_limits"),
+            rate_limiter=config.get("rate_limiter"),
+            retry=config.get("retry"),
+            endpoints=config.get("endpoints"),
+            internal_model=config.get("internal_model"),
+            usage=config.get("usage"),
+            **kwargs
+        )
+
+    def _admit(self, tokens: int):
+        """Permit for one call (a no-op context when no limits apply)."""
+        if self.rate_limiter is None:
+            return nullcontext()
+        return self.rate_limiter.acquire(
+            self.tenant_id, self.api_key, tokens,
+            self.rate_limits, self.key_rate_limits, timeout=self.queue_timeout
+        )
+
+    def _hedge_permit(self, tokens: int):
+        """Release callback if limits leave room for a hedged duplicate, else None."""
+        if self.rate_limiter is None:
+            return lambda: None
+        try:
+            permit = self.rate_limiter.acquire(
+                self.tenant_id, self.api_key, tokens,
+                self.rate_limits, self.key_rate_limits, timeout=0
+            )
+        except TimeoutError:
+            return None
+        return permit.release
+
+    def _chat_tokens(self, messages: List[Dict[str, str]], max_tokens: int) -> int:
+        if self.rate_limiter is None:
+            return 0
+        return sum(estimate_tokens(m.get("content") or "", self.model) + 4 for m in messages) + max_tokens
+
+    def _record(self, rec: CallRecord):
+        if self.usage is not None:
+            self.usage.add(rec)
+        else:
+            usage_registry.record({"tenant": self.tenant_id}, rec)
+
+    @staticmethod
+    def _settle(permit, resp):
+        usage = getattr(resp, "usage", None)
+        if permit is not None and usage is not None:
+            permit.settle(usage.total_tokens)
+
+    def _candidates(self, task: Optional[str]) -> List[tuple]:
+        """(endpoint, model) pairs for a chat/completion call."""
+        internal = task in INTERNAL_TASKS
+        pairs = []
+        for ep in self.endpoints:
+            model = ep.model or self.model
+            if internal:
+                model = ep.internal_model or self.internal_model or model
+            pairs.append((ep, model))
+        return pairs
+
+    def _send(self, method: str, ep: Endpoint, model: str, **params: Any):
+        """One attempt of `method` (e.g. "chat.completions.create") on one endpoint."""
+        if ep.base_url == self.base_url and ep.api_key == self.api_key:
+            sdk = self.client
+        else:
+            sdk = self._endpoint_clients.get(id(ep))
+            if sdk is None:
+                sdk = self._endpoint_clients[id(ep)] = _sdk_client(ep.api_key, ep.base_url)
+        create = sdk
+        for attr in method.split("."):
+            create = getattr(create, attr)
+        started = self.router.begin(ep.base_url, model)
+        try:
+            resp = create(model=model, **params)
+        except Exception as exc:
+            self.router.failure(ep.base_url, model, counted=is_retryable(exc))
+            raise
+        self.router.success(ep.base_url, model, started)
+        return resp
+
+    def _routed(self, method: str, candidates: List[tuple], **params: Any):
+        """
+        (attempt, endpoints) for RetryPolicy.run(..., failover=endpoints).
+        Each call of `attempt` sends `method` to the next endpoint in
+        routing order, wrapping around, so failover and retries share one
+        budget of max_retries + 1 attempts. It returns (response, model
+        that served it).
+        """
+        order = self.router.order(candidates)
+        turns = itertools.count()
+
+        def attempt():
+            ep, model = order[next(turns) % len(order)]
+            return self._send(method, ep, model, **params), model
+
+        return attempt, len(order)
+
+    def _call(self, op: str, method: str, candidates: List[tuple], tokens: int, **params: Any):
+        """One logical request: admission, then retries/hedging around the routed call."""
+        if self.retry.timeout is not None:
+            params.setdefault("timeout", self.retry.timeout)
+        with span("llm.call", op=op, model=candidates[0][1]) as sp, self._admit(tokens) as permit:
+            start = time.perf_counter()
+            try:
+                attempt, endpoints = self._routed(method, candidates, **params)
+                resp, model = self.retry.run(
+                    attempt,
+                    key=(self.base_url, candidates[0][1], op),
+                    allow_hedge=lambda: self._hedge_permit(tokens),
+                    failover=endpoints,
+                )
+            except Exception:
+                self._record(CallRecord(candidates[0][1], op, latency=time.perf_counter() - start, ok=False))
+                raise
+            rec = CallRecord.from_usage(model, op, getattr(resp, "usage", None), time.perf_counter() - start)
+            self._record(rec)
+            sp.set_attribute("served_model", model)
+            sp.set_attribute("prompt_tokens", rec.prompt_tokens)
+            sp.set_attribute("completion_tokens", rec.completion_tokens)
+            self._settle(permit, resp)
+        return resp
 
     def chat(
         self,
@@ -29,63 +235,100 @@ class LLMClient:
         temperature: float = 0.7,
         max_tokens: int = 512,
         stream: bool = False,
+        task: Optional[str] = None,
         **kwargs: Any
     ) -> Any:
         """
         messages: [{"role":"system"|"user"|"assistant","content":...}]
         If stream=False (default), returns the full assistant reply as a string.
         If stream=True, returns an iterator of text chunks.
+        task: e.g. "rerank" / "rewrite" / "critique" to route to the internal model.
         """
         if stream:
-            return self.stream_chat(messages, temperature, max_tokens, **kwargs)
+            return self.stream_chat(messages, temperature, max_tokens, task=task, **kwargs)
         # non-streaming
-        resp = openai.ChatCompletion.create(
-            model=self.model,
+        resp = self._call(
+            "chat", "chat.completions.create", self._candidates(task),
+            self._chat_tokens(messages, max_tokens),
             messages=messages,
             temperature=temperature,
             max_tokens=max_tokens,
-            stream=False,
             **kwargs
         )
-        return resp.choices[0].message.content.strip()
+        return (resp.choices[0].message.content or "").strip()
 
     def stream_chat(
         self,
         messages: List[Dict[str, str]],
         temperature: float = 0.7,
         max_tokens: int = 512,
+        task: Optional[str] = None,
         **kwargs: Any
     ) -> Iterator[str]:
         """
         Stream the assistant’s reply token-by-token (or chunk-by-chunk).
         Yields each new content delta as it arrives.
+
+        Opening the stream is retried like any call but never hedged; once
+        deltas have been yielded, errors propagate (the caller already has
+        partial output).
         """
-        resp = openai.ChatCompletion.create(
-            model=self.model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            stream=True,
-            **kwargs
-        )
-        # Each chunk is a dict with choices: [ { delta: {"role"/"content":...} } ]
-        for chunk in resp:
-            delta = chunk.choices[0].delta.get("content")
-            if delta:
-                yield delta
+        if self.retry.timeout is not None:
+            kwargs.setdefault("timeout", self.retry.timeout)
+        # The permit is held (counted in flight) until the stream is drained or
+        # closed, then settled from the reported usage or the estimate below
+        with self._admit(self._chat_tokens(messages, max_tokens)) as permit:
+            candidates = self._candidates(task)
+            model, usage, parts, ok = candidates[0][1], None, [], False
+            start = time.perf_counter()
+            try:
+                # the span covers opening the stream (time to first byte) only: a
+                # generator may be resumed in other contexts, where it could not end
+                with span("llm.call", op="stream", model=model) as sp:
+                    attempt, endpoints = self._routed(
+                        "chat.completions.create", candidates,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        stream=True,
+                        **kwargs
+                    )
+                    resp, model = self.retry.run(attempt, key=(self.base_url, model, "stream"),
+                                                 hedge=False, failover=endpoints)
+                    sp.set_attribute("served_model", model)
+                for chunk in resp:
+                    usage = getattr(chunk, "usage", None) or usage  # sent with stream_options.include_usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+                ok = True
+            finally:
+                rec = CallRecord.from_usage(model, "stream", usage, time.perf_counter() - start)
+                rec.ok = ok or bool(parts)  # closed early by the caller still counts as served
+                if usage is None:
+                    rec.prompt_tokens = sum(estimate_tokens(m.get("content") or "", model) + 4 for m in messages)
+                    rec.completion_tokens = estimate_tokens("".join(parts), model)
+                self._record(rec)
+                if permit is not None:
+                    permit.settle(rec.prompt_tokens + rec.completion_tokens)
 
     def complete(
         self,
         prompt: str,
         temperature: float = 0.7,
         max_tokens: int = 512,
+        task: Optional[str] = None,
         **kwargs: Any
     ) -> str:
         """
         Simple text completion (for non-chat use cases).
         """
-        resp = openai.Completion.create(
-            model=self.model,
+        tokens = estimate_tokens(prompt, self.model) + max_tokens if self.rate_limiter else 0
+        resp = self._call(
+            "complete", "completions.create", self._candidates(task), tokens,
             prompt=prompt,
             temperature=temperature,
             max_tokens=max_tokens,
@@ -96,12 +339,14 @@ class LLMClient:
     def embed(self, inputs: List[str]) -> List[List[float]]:
         """
         Returns a list of embedding vectors for the given inputs.
+        Always uses the primary endpoint, so vectors stay in one embedding space.
         """
-        resp = openai.Embedding.create(
-            model=self.embedding_model,
+        tokens = sum(estimate_tokens(t) for t in inputs) if self.rate_limiter else 0
+        resp = self._call(
+            "embed", "embeddings.create", [(self.endpoints[0], self.embedding_model)], tokens,
             input=inputs
         )
-        return [item["embedding"] for item in resp["data"]]
+        return [item.embedding for item in resp.data]
 
 
 '''
@@ -0,0 +1,287 @@
+# autoagent/llm/rate_limit.py
+"""
+Admission control for LLM calls: token buckets for requests and tokens per
+minute, plus a max-in-flight cap, per tenant and per API key.
+
+Requests over a limit queue instead of failing. Waiting requests that
+share an API key are granted round-robin across tenants, so one noisy
+tenant cannot starve the others on a shared key. Lanes of tenants and keys
+that have gone idle (nothing in flight or waiting, buckets refilled) are
+dropped periodically, since recreating them yields the same state.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional
+
+_INF = float("inf")
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute, holding at most `capacity` (default: one minute's worth)."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.level = self.capacity
+        self.stamp = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (0 if now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # oversized requests wait for a full bucket
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self.level -= amount  # may go negative after a settle; refills pay it back
+
+    def refund(self, amount: float):
+        self.level = min(self.capacity, self.level + amount)
+
+
+class _Lane:
+    """Limits for one tenant or one API key."""
+
+    def __init__(self, limits: Dict[str, int]):
+        self.in_flight = 0
+        self.configure(limits)
+
+    def configure(self, limits: Dict[str, int]):
+        """Apply new limits in place, keeping the in-flight count."""
+        self.limits = dict(limits)
+        rpm, tpm = limits.get("rpm"), limits.get("tpm")
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_in_flight = limits.get("max_in_flight")
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return _INF  # until a call finishes
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return wait
+
+    def idle(self, now: float) -> bool:
+        """Nothing in flight and buckets full: indistinguishable from a new lane."""
+        if self.in_flight:
+            return False
+        for bucket in (self.requests, self.tokens):
+            if bucket is not None:
+                bucket._refill(now)
+                if bucket.level < bucket.capacity:
+                    return False
+        return True
+
+    def admit(self, tokens: int):
+        if self is _UNLIMITED:
+            return
+        self.in_flight += 1
+        if self.requests:
+            self.requests.take(1)
+        if self.tokens:
+            self.tokens.take(tokens)
+
+
+_UNLIMITED = _Lane({})
+
+
+class _Ticket:
+    __slots__ = ("tenant", "tokens", "granted", "lanes")
+
+    def __init__(self, tenant: str, tokens: int):
+        self.tenant = tenant
+        self.tokens = tokens
+        self.granted = False
+        self.lanes = ()
+
+
+class Permit:
+    """Held for the duration of one LLM call; release it (or use `with`) when done."""
+
+    def __init__(self, limiter: "RateLimiter", lanes, tokens: int):
+        self._limiter = limiter
+        self._lanes = lanes
+        self.tokens = tokens
+        self._released = False
+
+    def settle(self, actual_tokens: int):
+        """Correct the token charge once the real usage is known."""
+        self._limiter._settle(self._lanes, actual_tokens - self.tokens)
+        self.tokens = actual_tokens
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._limiter._release(self._lanes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class RateLimiter:
+    """
+    Process-wide limiter shared by every LLMClient.
+
+    `acquire(tenant_id, api_key, tokens, tenant_limits, key_limits)` blocks
+    until the call fits both the tenant's and the key's limits
+    ({"rpm", "tpm", "max_in_flight"}, any may be omitted), then returns a
+    Permit. Limits are (re)applied from the arguments, so config changes
+    take effect on the next call. Every `prune_interval` seconds, idle
+    lanes are dropped so per-tenant state doesn't accumulate.
+    """
+
+    def __init__(self, prune_interval: float = 60.0):
+        self._cond = threading.Condition()
+        self._lanes: Dict[str, _Lane] = {}
+        # key lane → tenant → FIFO of waiting tickets (tenants in round-robin order)
+        self._queues: Dict[str, "OrderedDict[str, deque]"] = {}
+        self.waits = 0
+        self.prune_interval = prune_interval
+        self._pruned_at = time.monotonic()
+
+    @staticmethod
+    def key_id(api_key: Optional[str]) -> str:
+        return "key:" + hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+
+    def _lane(self, lane_id: str, limits: Optional[Dict[str, int]]) -> _Lane:
+        lane = self._lanes.get(lane_id)
+        if not limits:
+            if lane is not None and lane.limits:
+                lane.configure({})  # limits were removed
+            return lane or _UNLIMITED
+        if lane is None:
+            lane = self._lanes[lane_id] = _Lane(limits)
+        elif lane.limits != limits:
+            lane.configure(limits)
+        return lane
+
+    def _dispatch(self, key_id: str, now: float) -> float:
+        """Grant what the limits allow, round-robin over tenants; returns seconds to the next chance."""
+        queues = self._queues.get(key_id)
+        key_lane = self._lanes.get(key_id, _UNLIMITED)
+        next_wait = _INF
+        granted = False
+        while queues:
+            progressed = False
+            for tenant, queue in queues.items():
+                ticket = queue[0]
+                key_wait = key_lane.wait_time(ticket.tokens, now)
+                if key_wait > 0:
+                    next_wait = min(next_wait, key_wait)
+                    break  # the shared key is exhausted for everyone
+                tenant_lane = self._lanes.get("tenant:" + tenant, _UNLIMITED)
+                tenant_wait = tenant_lane.wait_time(ticket.tokens, now)
+                if tenant_wait > 0:
+                    next_wait = min(next_wait, tenant_wait)
+                    continue  # only this tenant is over its limit
+                key_lane.admit(ticket.tokens)
+                tenant_lane.admit(ticket.tokens)
+                ticket.lanes = (key_lane, tenant_lane)
+                ticket.granted = granted = progressed = True
+                queue.popleft()
+                if queue:
+                    queues.move_to_end(tenant)
+                else:
+                    del queues[tenant]
+                break
+            if not progressed:
+                break
+        if queues is not None and not queues:
+            del self._queues[key_id]
+        if granted:
+            self._cond.notify_all()
+        return next_wait
+
+    def acquire(self, tenant_id: Optional[str], api_key: Optional[str], tokens: int,
+                tenant_limits: Optional[Dict[str, int]] = None,
+                key_limits: Optional[Dict[str, int]] = None,
+                timeout: Optional[float] = None) -> Permit:
+        """Wait for admission. Raises TimeoutError after `timeout` seconds."""
+        tenant = tenant_id or ""
+        key_id = self.key_id(api_key)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            now = time.monotonic()
+            if now - self._pruned_at >= self.prune_interval:
+                self._prune(now)
+            self._lane(key_id, key_limits)
+            self._lane("tenant:" + tenant, tenant_limits)
+            ticket = _Ticket(tenant, tokens)
+            self._queues.setdefault(key_id, OrderedDict()).setdefault(tenant, deque()).append(ticket)
+            waited = False
+            while True:
+                wait = self._dispatch(key_id, time.monotonic())
+                if ticket.granted:
+                    break
+                waited = True
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._drop(key_id, ticket)
+                        raise TimeoutError(f"LLM rate limit wait exceeded {timeout}s")
+                    wait = min(wait, remaining)
+                self._cond.wait(None if wait == _INF else wait)
+            if waited:
+                self.waits += 1
+        return Permit(self, ticket.lanes, tokens)
+
+    def _prune(self, now: float):
+        """Drop idle lanes (call with the condition held)."""
+        self._pruned_at = now
+        waiting = set(self._queues)
+        for queues in self._queues.values():
+            waiting.update("tenant:" + tenant for tenant in queues)
+        for lane_id in [i for i, lane in self._lanes.items() if i not in waiting and lane.idle(now)]:
+            del self._lanes[lane_id]
+
+    def _drop(self, key_id: str, ticket: _Ticket):
+        queues = self._queues.get(key_id, {})
+        queue = queues.get(ticket.tenant)
+        if queue is not None:
+            queue.remove(ticket)
+            if not queue:
+                del queues[ticket.tenant]
+
+    def _settle(self, lanes, delta: int):
+        with self._cond:
+            for lane in lanes:
+                if lane.tokens:
+                    if delta > 0:
+                        lane.tokens.take(delta)
+                    else:
+                        lane.tokens.refund(-delta)
+            self._cond.notify_all()
+
+    def _release(self, lanes):
+        with self._cond:
+            for lane in lanes:
+                if lane is not _UNLIMITED:
+                    lane.in_flight -= 1
+            for key_id in list(self._queues):
+                self._dispatch(key_id, time.monotonic())
+            self._cond.notify_all()
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Shared process-wide limiter."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
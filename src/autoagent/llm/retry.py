@@ -0,0 +1,210 @@
+# autoagent/llm/retry.py
+"""
+Retries, backoff and hedged requests for LLM provider calls.
+
+RetryPolicy retries retryable failures (timeouts, connection errors, 408 /
+409 / 429 / 5xx) with full-jitter exponential backoff. A server-provided
+Retry-After (or retry-after-ms) header takes precedence over the computed
+delay. With hedging enabled, a duplicate request is sent once the primary
+has been outstanding longer than the observed p95 latency (or a fixed
+delay), and whichever finishes first wins.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Hashable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# Hedged calls run here (primary and duplicate) while the caller waits; they
+# are I/O-bound, so the pool is sized well above the CPU count
+_hedge_executor = ThreadPoolExecutor(max_workers=128, thread_name_prefix="autoagent-llm-hedge")
+
+
+def status_of(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    return status
+
+def is_retryable(exc: BaseException) -> bool:
+    """Timeouts, connection failures and retryable HTTP statuses."""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    try:
+        import openai
+        if isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+    except ImportError:
+        pass
+    return status_of(exc) in RETRYABLE_STATUS
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Delay requested by the server via retry-after-ms / Retry-After, if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return float(ms) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies per key (e.g. endpoint + model + op)."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[Hashable, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: Hashable, seconds: float):
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, key: Hashable, pct: float, min_samples: int = 20) -> Optional[float]:
+        """pct in [0, 100]; None until `min_samples` latencies were seen."""
+        with self._lock:
+            samples = self._samples.get(key)
+            if not samples or len(samples) < min_samples:
+                return None
+            ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100.0))]
+
+
+latency_tracker = LatencyTracker()
+
+
+class RetryPolicy:
+    """
+    :param timeout: per-attempt timeout in seconds (None: SDK default)
+    :param max_retries: retries after the first attempt
+    :param base_delay / max_delay: backoff is uniform(0, min(max_delay, base_delay * 2**attempt))
+    :param max_retry_after: cap on honoured Retry-After delays
+    :param hedge_after: None (off), "p95" (observed p95 latency) or a fixed
+        number of seconds after which a duplicate request is sent
+    :param hedge_min_samples: latencies needed before "p95" hedging starts
+    """
+
+    def __init__(self, timeout: Optional[float] = 60.0, max_retries: int = 3,
+                 base_delay: float = 0.5, max_delay: float = 20.0, max_retry_after: float = 60.0,
+                 hedge_after: Union[None, str, float] = None, hedge_min_samples: int = 20):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.hedge_after = hedge_after
+        self.hedge_min_samples = hedge_min_samples
+
+    @classmethod
+    def coerce(cls, value: Union[None, dict, "RetryPolicy"]) -> "RetryPolicy":
+        """Accept a RetryPolicy, a dict of its kwargs (e.g. from config) or None."""
+        if isinstance(value, RetryPolicy):
+            return value
+        return cls(**(value or {}))
+
+    def backoff(self, attempt: int, exc: BaseException) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        server = retry_after_seconds(exc)
+        if server is not None:
+            delay = max(delay, min(server, self.max_retry_after))
+        return delay
+
+    def hedge_delay(self, key: Hashable) -> Optional[float]:
+        if self.hedge_after is None:
+            return None
+        if self.hedge_after == "p95":
+            return latency_tracker.percentile(key, 95, self.hedge_min_samples)
+        return float(self.hedge_after)
+
+    def run(self, fn: Callable[[], Any], key: Hashable = None,
+            allow_hedge: Optional[Callable[[], Optional[Callable[[], None]]]] = None,
+            hedge: bool = True, failover: int = 1) -> Any:
+        """
+        Call `fn` with retries (and hedging when configured). `allow_hedge`,
+        if given, is asked before each duplicate request: it returns a
+        release callback when a hedge may be sent, or None to skip it.
+        hedge=False never sends a duplicate, e.g. for streams, where the
+        loser would hold an open connection nobody reads.
+
+        `failover` > 1 says `fn` moves on to the next of that many
+        endpoints with every call: a retry then goes out immediately, and
+        the backoff is only slept once every endpoint has failed in a row.
+        Either way one budget covers the whole call: at most `max_retries`
+        retries in total, but never fewer than one try per endpoint.
+        """
+        failover = max(1, failover)
+        limit = max(self.max_retries, failover - 1)
+        attempt = 0
+        backoffs = 0
+        while True:
+            try:
+                return self._attempt(fn, key, allow_hedge, hedge)
+            except Exception as exc:
+                if attempt >= limit or not is_retryable(exc):
+                    raise
+                attempt += 1
+                if attempt % failover:
+                    logger.warning("LLM call failed (%s: %s); failing over, retry %d/%d",
+                                   type(exc).__name__, exc, attempt, limit)
+                    continue
+                delay = self.backoff(backoffs, exc)
+                backoffs += 1
+                logger.warning("LLM call failed (%s: %s); retry %d/%d in %.2fs",
+                               type(exc).__name__, exc, attempt, limit, delay)
+                time.sleep(delay)
+
+    def _timed(self, fn: Callable[[], Any], key: Hashable) -> Any:
+        start = time.perf_counter()
+        result = fn()
+        latency_tracker.record(key, time.perf_counter() - start)
+        return result
+
+    def _attempt(self, fn, key, allow_hedge, hedge: bool = True) -> Any:
+        delay = self.hedge_delay(key) if hedge else None
+        if delay is None:
+            return self._timed(fn, key)
+
+        primary = _hedge_executor.submit(self._timed, fn, key)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        release = allow_hedge() if allow_hedge else (lambda: None)
+        if release is None:
+            return primary.result()  # limits leave no room for a duplicate
+        hedge = _hedge_executor.submit(self._timed, fn, key)
+        hedge.add_done_callback(lambda _: release())
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()  # the loser finishes in the background
+                error = future.exception()
+        raise error
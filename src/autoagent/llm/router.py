@@ -0,0 +1,134 @@
+# autoagent/llm/router.py
+"""
+Routing of LLM calls over several OpenAI-compatible endpoints.
+
+Each endpoint keeps an EWMA of its observed latency and its in-flight
+count. A call goes to the better of two randomly sampled healthy endpoints
+(latency × load), and fails over down the remaining endpoints on retryable
+errors. An endpoint that fails `max_failures` times in a row is skipped for
+`cooldown` seconds.
+
+Internal calls (reranking, query rewriting, critique) can be sent to a
+cheaper model: pass `task=` to LLMClient calls and set `internal_model`.
+"""
+
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+INTERNAL_TASKS = frozenset({"rerank", "rewrite", "critique"})
+
+
+class Endpoint:
+    """One OpenAI-compatible backend. model/internal_model default to the client's."""
+
+    def __init__(self, base_url: Optional[str], api_key: str, model: Optional[str] = None,
+                 internal_model: Optional[str] = None):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.model = model
+        self.internal_model = internal_model
+
+    @classmethod
+    def from_dict(cls, spec: dict, default_key: Optional[str] = None) -> "Endpoint":
+        return cls(spec.get("base_url"), spec.get("api_key") or default_key,
+                   spec.get("model"), spec.get("internal_model"))
+
+    def __repr__(self):
+        return f"Endpoint({self.base_url!r}, model={self.model!r})"
+
+
+class EndpointStats:
+    """Latency EWMA, load and health of one (base_url, model)."""
+
+    def __init__(self):
+        self.ewma: Optional[float] = None
+        self.in_flight = 0
+        self.failures = 0
+        self.down_until = 0.0
+
+    def score(self) -> float:
+        # endpoints without samples score 0 so they get tried
+        return (self.ewma or 0.0) * (self.in_flight + 1)
+
+
+class EndpointRouter:
+    """
+    Process-wide endpoint stats and ordering, shared by every LLMClient.
+
+    :param alpha: EWMA weight of the newest latency sample
+    :param max_failures: consecutive failures before an endpoint cools down
+    :param cooldown: seconds a failing endpoint is skipped (unless all are down)
+    """
+
+    def __init__(self, alpha: float = 0.2, max_failures: int = 3, cooldown: float = 30.0):
+        self.alpha = alpha
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self._stats: Dict[tuple, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: tuple) -> EndpointStats:
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = EndpointStats()
+        return stats
+
+    def stats(self, base_url: Optional[str], model: str) -> EndpointStats:
+        with self._lock:
+            return self._get((base_url, model))
+
+    def order(self, candidates: List[tuple]) -> List[tuple]:
+        """
+        `candidates` are (endpoint, model) pairs. Returns them in attempt
+        order: power-of-two-choices pick first, then the rest by score;
+        cooling-down endpoints go last.
+        """
+        if len(candidates) < 2:
+            return list(candidates)
+        now = time.monotonic()
+        with self._lock:
+            scored = [(self._get((ep.base_url, model)), ep, model) for ep, model in candidates]
+        healthy = [c for c in scored if c[0].down_until <= now]
+        down = [c for c in scored if c[0].down_until > now]
+        healthy.sort(key=lambda c: c[0].score())
+        if len(healthy) >= 2:
+            a, b = random.sample(range(len(healthy)), 2)
+            first = healthy.pop(min(a, b))  # sorted, so the lower index scores better
+            healthy.insert(0, first)
+        down.sort(key=lambda c: c[0].down_until)
+        return [(ep, model) for _, ep, model in healthy + down]
+
+    def begin(self, base_url: Optional[str], model: str) -> float:
+        with self._lock:
+            self._get((base_url, model)).in_flight += 1
+        return time.perf_counter()
+
+    def success(self, base_url: Optional[str], model: str, started: float):
+        latency = time.perf_counter() - started
+        with self._lock:
+            stats = self._get((base_url, model))
+            stats.in_flight -= 1
+            stats.failures = 0
+            stats.down_until = 0.0
+            stats.ewma = latency if stats.ewma is None else \
+                self.alpha * latency + (1 - self.alpha) * stats.ewma
+
+    def failure(self, base_url: Optional[str], model: str, counted: bool = True):
+        """`counted=False` for errors that are not the endpoint's fault (e.g. a 400)."""
+        with self._lock:
+            stats = self._get((base_url, model))
+            stats.in_flight -= 1
+            if not counted:
+                return
+            stats.failures += 1
+            if stats.failures >= self.max_failures:
+                stats.down_until = time.monotonic() + self.cooldown
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+endpoint_router = EndpointRouter()
@@ -0,0 +1,34 @@
+# autoagent/llm/tokens.py
+"""
+Cheap token accounting for prompt budgeting and traces.
+Uses tiktoken when it is installed and its encoding loads, otherwise a
+~4 chars/token estimate.
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+@lru_cache(maxsize=8)
+def _encoder(model: Optional[str]):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+        except KeyError:  # model unknown to this tiktoken version
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # e.g. the BPE file can't be downloaded (offline) or its cache is corrupt
+        return None
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """Approximate number of tokens `text` occupies in a prompt."""
+    if not text:
+        return 0
+    enc = _encoder(model)
+    if enc is not None:
+        # user text may contain "<|endoftext|>" etc.; count it as plain text
+        return len(enc.encode(text, disallowed_special=()))
+    return max(1, (len(text) + 3) // 4)
@@ -0,0 +1,216 @@
+# autoagent/llm/usage.py
+"""
+Token usage, latency and cost accounting for LLM calls.
+
+Every LLMClient call is recorded as a CallRecord into `usage_registry`, a
+process-wide set of counters keyed by (tenant, flow, agent, model, op).
+AgentRunner also hands each turn a TurnUsage, whose summary ends up in
+the turn's trace. `usage_registry.to_prometheus()` renders the counters
+in the Prometheus text exposition format.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+LABELS = ("tenant", "flow", "agent", "model", "op")
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class CallRecord:
+    """One LLM call. `cached_tokens` are prompt tokens served from the provider's prompt cache."""
+    __slots__ = ("model", "op", "prompt_tokens", "completion_tokens", "cached_tokens",
+                 "latency", "ok", "estimated")
+
+    def __init__(self, model: str, op: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+                 cached_tokens: int = 0, latency: float = 0.0, ok: bool = True, estimated: bool = False):
+        self.model = model
+        self.op = op
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.cached_tokens = cached_tokens
+        self.latency = latency
+        self.ok = ok
+        self.estimated = estimated
+
+    @classmethod
+    def from_usage(cls, model: str, op: str, usage, latency: float) -> "CallRecord":
+        """Build from an SDK `usage` object (None when the provider sent none)."""
+        if usage is None:
+            return cls(model, op, latency=latency, estimated=True)
+        details = getattr(usage, "prompt_tokens_details", None)
+        return cls(model, op,
+                   prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+                   completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+                   cached_tokens=getattr(details, "cached_tokens", 0) or 0,
+                   latency=latency)
+
+
+class _Series:
+    __slots__ = ("calls", "errors", "prompt_tokens", "completion_tokens", "cached_tokens",
+                 "cache_hits", "cost", "latency_sum", "buckets")
+
+    def __init__(self):
+        self.calls = self.errors = 0
+        self.prompt_tokens = self.completion_tokens = self.cached_tokens = self.cache_hits = 0
+        self.cost = self.latency_sum = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # last one is +Inf
+
+
+class UsageRegistry:
+    """
+    In-process counters per (tenant, flow, agent, model, op).
+
+    Prices are optional, per million tokens:
+    `set_price("gpt-4o", input=2.5, output=10.0, cached_input=1.25)`.
+    """
+
+    def __init__(self):
+        self._series: Dict[Tuple[str, ...], _Series] = {}
+        self._prices: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def set_price(self, model: str, input: float, output: float, cached_input: Optional[float] = None):
+        self._prices[model] = (input, output, input if cached_input is None else cached_input)
+
+    def cost(self, rec: CallRecord) -> float:
+        price = self._prices.get(rec.model)
+        if price is None:
+            return 0.0
+        fresh = rec.prompt_tokens - rec.cached_tokens
+        return (fresh * price[0] + rec.cached_tokens * price[2] + rec.completion_tokens * price[1]) / 1e6
+
+    def record(self, labels: Optional[dict], rec: CallRecord) -> float:
+        """Add one call; returns its cost."""
+        labels = labels or {}
+        key = (labels.get("tenant") or "", labels.get("flow") or "", labels.get("agent") or "",
+               rec.model or "", rec.op)
+        cost = self.cost(rec)
+        bucket = bisect_left(LATENCY_BUCKETS, rec.latency)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+            series.calls += 1
+            if not rec.ok:
+                series.errors += 1
+            series.prompt_tokens += rec.prompt_tokens
+            series.completion_tokens += rec.completion_tokens
+            series.cached_tokens += rec.cached_tokens
+            if rec.cached_tokens:
+                series.cache_hits += 1
+            series.cost += cost
+            series.latency_sum += rec.latency
+            series.buckets[bucket] += 1
+        return cost
+
+    def snapshot(self, group_by: Tuple[str, ...] = LABELS) -> List[dict]:
+        """Totals aggregated over the given labels, e.g. group_by=("tenant",)."""
+        idx = [LABELS.index(name) for name in group_by]
+        totals: Dict[tuple, dict] = {}
+        with self._lock:
+            items = [(k, _values(s)) for k, s in self._series.items()]
+        for key, values in items:
+            group = tuple(key[i] for i in idx)
+            row = totals.get(group)
+            if row is None:
+                row = totals[group] = dict(zip(group_by, group), calls=0, errors=0, prompt_tokens=0,
+                                           completion_tokens=0, cached_tokens=0, cache_hits=0,
+                                           cost_usd=0.0, latency_s=0.0)
+            for field in ("calls", "errors", "prompt_tokens", "completion_tokens", "cached_tokens", "cache_hits"):
+                row[field] += values[field]
+            row["cost_usd"] += values["cost"]
+            row["latency_s"] += values["latency_sum"]
+        return list(totals.values())
+
+    def to_prometheus(self, prefix: str = "autoagent_llm") -> str:
+        with self._lock:
+            items = sorted((k, _values(s)) for k, s in self._series.items())
+        counters = (
+            ("calls_total", "calls", "LLM calls"),
+            ("errors_total", "errors", "Failed LLM calls"),
+            ("prompt_tokens_total", "prompt_tokens", "Prompt tokens"),
+            ("completion_tokens_total", "completion_tokens", "Completion tokens"),
+            ("cached_tokens_total", "cached_tokens", "Prompt tokens served from the provider cache"),
+            ("cache_hits_total", "cache_hits", "Calls with a prompt cache hit"),
+            ("cost_usd_total", "cost", "Estimated cost in USD"),
+        )
+        lines = []
+        for suffix, field, help_text in counters:
+            name = f"{prefix}_{suffix}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines += [f"{name}{{{_labels(key)}}} {_num(values[field])}" for key, values in items]
+        name = f"{prefix}_latency_seconds"
+        lines += [f"# HELP {name} LLM call latency", f"# TYPE {name} histogram"]
+        for key, values in items:
+            labels = _labels(key)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), values["buckets"]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _num(bound)
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {_num(values['latency_sum'])}")
+            lines.append(f"{name}_count{{{labels}}} {values['calls']}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _values(series: _Series) -> dict:
+    values = {name: getattr(series, name) for name in _Series.__slots__}
+    values["buckets"] = list(series.buckets)
+    return values
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(key: Tuple[str, ...]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(LABELS, key))
+
+def _num(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+usage_registry = UsageRegistry()
+
+
+class TurnUsage:
+    """
+    Calls made during one agent turn. Records are forwarded to `registry`
+    under `labels` ({"tenant", "flow", "agent"}) as they arrive.
+    """
+
+    def __init__(self, labels: Optional[dict] = None, registry: Optional[UsageRegistry] = None):
+        self.labels = dict(labels or {})
+        self.registry = registry or usage_registry
+        self.records: List[CallRecord] = []
+        self.cost = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, rec: CallRecord):
+        cost = self.registry.record(self.labels, rec)
+        with self._lock:
+            self.records.append(rec)
+            self.cost += cost
+
+    def summary(self) -> dict:
+        """Totals for the trace: tokens, latency, cache hits and cost, plus per-model calls."""
+        with self._lock:
+            records = list(self.records)
+            cost = self.cost
+        by_model: Dict[str, int] = {}
+        for rec in records:
+            by_model[rec.model] = by_model.get(rec.model, 0) + 1
+        return {
+            "llm_calls": len(records),
+            "errors": sum(not r.ok for r in records),
+            "prompt_tokens": sum(r.prompt_tokens for r in records),
+            "completion_tokens": sum(r.completion_tokens for r in records),
+            "cached_tokens": sum(r.cached_tokens for r in records),
+            "cache_hits": sum(1 for r in records if r.cached_tokens),
+            "llm_latency_ms": round(sum(r.latency for r in records) * 1000, 1),
+            "cost_usd": round(cost, 6),
+            "models": by_model,
+        }
@@ -0,0 +1,113 @@
+# autoagent/rag/context_packer.py
+
+from typing import List, Dict, Any, Tuple, Optional
+from autoagent.llm.tokens import estimate_tokens
+
+class ContextPacker:
+    """
+    Turns retriever output into a prompt-ready context block:
+    normalises the result shapes, merges overlapping sliding-window chunks,
+    orders passages by relevance and packs them into a token budget.
+    """
+
+    def __init__(self, token_budget: int = 2000, min_overlap: int = 20,
+                 separator: str = "\n\n", model: Optional[str] = None):
+        """
+        :param token_budget: max tokens the packed context may use
+        :param min_overlap: shortest shared prefix/suffix (chars) treated as chunk overlap
+        :param separator: placed between passages
+        :param model: model name for token counting
+        """
+        self.token_budget = token_budget
+        self.min_overlap = min_overlap
+        self.separator = separator
+        self.model = model
+
+    @staticmethod
+    def normalize(docs: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Accepts retriever passages ({'source','text','score'}), raw vector-store
+        hits ({..., 'metadata': {...}, 'score': distance, 'distance': distance})
+        or plain strings. Returns passages whose 'score' is higher-is-better.
+        """
+        out = []
+        for d in docs:
+            if isinstance(d, str):
+                out.append({"source": None, "text": d, "score": 0.0})
+            elif "distance" in d or ("metadata" in d and "text" not in d):
+                meta = d.get("metadata") or {}
+                # vector stores report distances: smaller means closer
+                distance = d.get("distance", d.get("score", 0.0))
+                out.append({
+                    "source": d.get("source", meta.get("source")),
+                    "chunk": d.get("chunk", meta.get("chunk")),
+                    "text": d.get("text", meta.get("text", "")), "score": -float(distance),
+                })
+            else:
+                out.append({**d, "score": float(d.get("score", 0.0))})
+        return [d for d in out if d["text"]]
+
+    def _overlap(self, left: str, right: str) -> int:
+        """Length of the longest suffix of `left` that is a prefix of `right`."""
+        if len(left) < self.min_overlap or len(right) < self.min_overlap:
+            return 0
+        probe = right[:self.min_overlap]
+        pos = left.find(probe, max(0, len(left) - len(right)))
+        while pos != -1:
+            if right.startswith(left[pos:]):
+                return len(left) - pos
+            pos = left.find(probe, pos + 1)
+        return 0
+
+    def _merge(self, kept: Dict[str, Any], cand: Dict[str, Any]) -> bool:
+        """Fold `cand` into `kept` if they are the same or overlapping windows."""
+        a, b = kept["text"], cand["text"]
+        if b in a:
+            return True
+        if a in b:
+            kept["text"] = b
+            return True
+        n = self._overlap(a, b)
+        if n:
+            kept["text"] = a + b[n:]
+            return True
+        n = self._overlap(b, a)
+        if n:
+            kept["text"] = b + a[n:]
+            return True
+        return False
+
+    def dedupe(self, passages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drop duplicates and merge overlapping chunks from the same source.
+        Expects passages sorted by descending score; merged passages keep the
+        best score of their parts.
+        """
+        kept: List[Dict[str, Any]] = []
+        for cand in passages:
+            for k in kept:
+                if k["source"] == cand["source"] and self._merge(k, cand):
+                    break
+            else:
+                kept.append(dict(cand))
+        return kept
+
+    def pack(self, docs: List[Any]) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Returns (context_text, packed_passages). Passages that would overflow
+        the budget are skipped in favour of smaller, lower-ranked ones.
+        """
+        passages = sorted(self.normalize(docs), key=lambda d: d["score"], reverse=True)
+        passages = self.dedupe(passages)
+
+        sep_tokens = estimate_tokens(self.separator, self.model)
+        used, packed = 0, []
+        for p in passages:
+            block = f"[{p['source']}] {p['text']}" if p["source"] is not None else p["text"]
+            cost = estimate_tokens(block, self.model) + (sep_tokens if packed else 0)
+            if used + cost > self.token_budget:
+                continue
+            used += cost
+            packed.append({**p, "block": block, "tokens": cost})
+        text = self.separator.join(p.pop("block") for p in packed)
+        return text, packed
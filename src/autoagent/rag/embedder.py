@@ -1,34 +1,38 @@
 # autoagent/rag/embedder.py
 
 from typing import List
-import openai
-from sentence_transformers import SentenceTransformer
+
+from autoagent.telemetry.tracing import trace_method
 
 class BaseEmbedder:
     """
     Interface for embedding text into vectors.
     """
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        trace_method(cls, "embed", "embedder.embed", embedder=cls.__name__)
+
     def embed(self, texts: List[str]) -> List[List[float]]:
         raise NotImplementedError("embed() must be implemented by subclasses")
 
 class OpenAIEmbedder(BaseEmbedder):
     """
-    Uses OpenAI's Embedding API.
+    Uses OpenAI's Embedding API (through LLMClient, for its timeouts/retries).
     """
-    def __init__(self, api_key: str, model: str = 'text-embedding-ada-002'):
-        openai.api_key = api_key
+    def __init__(self, api_key: str, model: str = 'text-embedding-ada-002', base_url: str = None, retry=None):
+        from autoagent.llm.client import LLMClient
         self.model = model
+        self.client = LLMClient(api_key, base_url=base_url, embedding_model=model, retry=retry)
 
     def embed(self, texts: List[str]) -> List[List[float]]:
-        resp = openai.Embedding.create(model=self.model, input=texts)
-        # resp.data is list of { embedding: [...], index: i }
-        return [d['embedding'] for d in resp['data']]
+        return self.client.embed(texts)
 
 class HFEmbedder(BaseEmbedder):
     """
     Uses a HuggingFace SentenceTransformer model.
     """
     def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+        from sentence_transformers import SentenceTransformer
         self.model = SentenceTransformer(model_name)
 
     def embed(self, texts: List[str]) -> List[List[float]]:
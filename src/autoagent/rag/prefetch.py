@@ -0,0 +1,79 @@
+# autoagent/rag/prefetch.py
+
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+from autoagent.rag.retrievers.base_retriever import BaseRetriever
+
+# Shared by all prefetchers; retrieval is I/O-bound (embedding API, vector DB)
+_prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="autoagent-prefetch")
+_WORD = re.compile(r"\w{3,}")  # also skips most short function words
+_STOPWORDS = frozenset(
+    "the and are but for from has have had how did does was were what when where which who why "
+    "will would can could should with you your this that these those there their about any "
+    "some tell more please also into than then them they our not".split()
+)
+
+def _terms(text: str) -> set:
+    return {w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS}
+
+def query_similarity(a: str, b: str) -> float:
+    """
+    Jaccard similarity of the two queries' content-word sets (0–1).
+    Compare bare user questions: any shared prefix (e.g. the history that
+    ContextualRAG prepends) would make unrelated questions look alike.
+    """
+    ta, tb = _terms(a), _terms(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+class RetrievalPrefetcher:
+    """
+    Speculatively retrieves for a predicted query in the background, so the
+    next turn can reuse the result instead of waiting on retrieval.
+
+    `schedule()` starts a retrieval, keyed by `match_text` (default: the
+    predicted query); `take()` returns the docs of the pending prefetch whose
+    key is most similar to the real query (waiting for it if it is still in
+    flight) or None when none reaches `min_similarity`.
+
+    The default threshold of 0.4 was set on question pairs: same-topic
+    follow-ups ("what's in the chicken curry?" → "is the chicken curry
+    spicy?", 0.67) hit; a different item ("price of the latte?" → "price of
+    the croissant?", 0.33) or topic (0.0) misses and retrieves normally.
+    """
+
+    def __init__(self, retriever: BaseRetriever, min_similarity: float = 0.4, max_pending: int = 2):
+        self.retriever = retriever
+        self.min_similarity = min_similarity
+        self.max_pending = max_pending
+        self._pending: List[Tuple[str, Future]] = []
+        self._lock = threading.Lock()
+
+    def schedule(self, predicted_query: str, match_text: Optional[str] = None, **kwargs) -> None:
+        if not predicted_query.strip():
+            return
+        fut = _prefetch_executor.submit(self.retriever.retrieve, predicted_query, **kwargs)
+        with self._lock:
+            self._pending.append((match_text or predicted_query, fut))
+            # Oldest predictions are the least likely to match; drop them
+            while len(self._pending) > self.max_pending:
+                _, old = self._pending.pop(0)
+                old.cancel()
+
+    def take(self, query: str, timeout: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            if not self._pending:
+                return None
+            best = max(self._pending, key=lambda p: query_similarity(p[0], query))
+            if query_similarity(best[0], query) < self.min_similarity:
+                return None
+            self._pending.remove(best)
+        try:
+            return best[1].result(timeout=timeout)
+        except Exception:
+            # A failed speculation just means retrieving normally
+            return None
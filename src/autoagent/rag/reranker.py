@@ -27,9 +27,10 @@ class Reranker:
                 f"to the query: '{query}'?\n\nPassage:\n{cand['text']}"
             )
             # Expect the LLM to return a numeric score as plain text
-            resp = self.llm.chat([{"role": "user", "content": prompt}], temperature=0.0)
+            resp = self.llm.chat([{"role": "user", "content": prompt}], temperature=0.0, task="rerank")
             try:
                 score = float(resp.strip())
+                cand.pop('distance', None)  # the score is now a relevance, not a store distance
             except ValueError:
                 score = cand.get('score', 0.0)
             cand['score'] = score
@@ -2,7 +2,13 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any
 
+from autoagent.telemetry.tracing import trace_method
+
 class BaseRetriever(ABC):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        trace_method(cls, "retrieve", "retriever.retrieve", retriever=cls.__name__)
+
     @abstractmethod
     def retrieve(self, query: str, **kwargs) -> List[Dict[str, Any]]:
         """
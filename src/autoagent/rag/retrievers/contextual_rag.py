@@ -11,11 +11,14 @@ class ContextualRAG(BaseRetriever):
         self.retriever = retriever
         self.context_window = context_window
 
-    def retrieve(self, query: str, context: List[Dict[str,str]] = None, top_k: int = 5) -> List[Dict[str,Any]]:
+    def build_query(self, query: str, context: List[Dict[str,str]] = None) -> str:
         # flatten last N turns
         ctx = ""
         if context:
             last = context[-self.context_window*2:]  # user+assistant
             ctx = " ".join(m['content'] for m in last)
-        final_q = f"{ctx} {query}" if ctx else query
+        return f"{ctx} {query}" if ctx else query
+
+    def retrieve(self, query: str, context: List[Dict[str,str]] = None, top_k: int = 5) -> List[Dict[str,Any]]:
+        final_q = self.build_query(query, context)
         return self.retriever.retrieve(final_q, top_k)
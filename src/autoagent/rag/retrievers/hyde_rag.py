@@ -1,22 +1,54 @@
 # autoagent/rag/retrievers/hyde_rag.py
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from autoagent.rag.retrievers.base_retriever import BaseRetriever
 from autoagent.llm.client import LLMClient
 from autoagent.rag.embedder import OpenAIEmbedder
+from autoagent.telemetry.tracing import propagate
 
 class HyDERAG(BaseRetriever):
     """
     HyDE: generate a 'hypothetical answer' via LLM, embed it, then retrieve.
+
+    With `race_direct=True` (default) the plain query is embedded and searched
+    while the hypothetical answer is being generated, and whichever result
+    set has the closer top hit wins.
     """
-    def __init__(self, api_key: str, llm_model: str, embed_model: str, store):
+    def __init__(self, api_key: str, llm_model: str, embed_model: str, store, race_direct: bool = True):
         self.llm = LLMClient(api_key, llm_model)
         self.embedder = OpenAIEmbedder(api_key, embed_model)
         self.store = store
+        self.race_direct = race_direct
 
-    def retrieve(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def _hyde(self, query: str, top_k: int) -> List[Dict[str, Any]]:
         # 1) generate hypothetical answer
-        hypo = self.llm.chat([{"role":"user","content":f"Provide a concise answer for: {query}"}])
+        hypo = self.llm.chat([{"role":"user","content":f"Provide a concise answer for: {query}"}], task="rewrite")
         # 2) embed hypo
         emb = self.embedder.embed([hypo])[0]
         # 3) retrieve by vector
         return self.store.query(emb, top_k)
+
+    def _direct(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        emb = self.embedder.embed([query])[0]
+        return self.store.query(emb, top_k)
+
+    @staticmethod
+    def _best_distance(docs: List[Dict[str, Any]]) -> float:
+        # vector stores return distances: lower is closer
+        return min((d['score'] for d in docs), default=float('inf'))
+
+    def retrieve(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        if not self.race_direct:
+            return self._hyde(query, top_k)
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            hyde = ex.submit(propagate(self._hyde), query, top_k)
+            direct = ex.submit(propagate(self._direct), query, top_k)
+            try:
+                hyde_docs = hyde.result()
+            except Exception:
+                # HyDE is an enhancement; fall back to the direct search
+                return direct.result()
+            direct_docs = direct.result()
+        if self._best_distance(direct_docs) < self._best_distance(hyde_docs):
+            return direct_docs
+        return hyde_docs
@@ -15,7 +15,7 @@ class QueryBasedRAG(BaseRetriever):
     def retrieve(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         # 1) ask LLM for sub-queries
         prompt = f"Break this into 3 specific search queries: {query}"
-        subqs = self.llm.chat([{"role":"user","content":prompt}]).split('\n')
+        subqs = self.llm.chat([{"role":"user","content":prompt}], task="rewrite").split('\n')
         results = []
         for sq in subqs:
             docs = self.retriever.retrieve(sq, top_k)
@@ -3,6 +3,7 @@ from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from autoagent.rag.retrievers.base_retriever import BaseRetriever
 from autoagent.llm.client import LLMClient
+from autoagent.telemetry.tracing import propagate
 
 class SpeculativeRAG(BaseRetriever):
     """
@@ -17,14 +18,14 @@ class SpeculativeRAG(BaseRetriever):
         self.n_queries = n_queries
 
     def _gen_and_retrieve(self, q: str):
-        hypo_q = self.llm.chat([{"role":"user","content":f"Rephrase this query: {q}"}])
+        hypo_q = self.llm.chat([{"role":"user","content":f"Rephrase this query: {q}"}], task="rewrite")
         emb = self.embedder.embed([hypo_q])[0]
         docs = self.store.query(emb)
         return docs
 
     def retrieve(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         with ThreadPoolExecutor() as ex:
-            futures = [ex.submit(self._gen_and_retrieve, query) for _ in range(self.n_queries)]
+            futures = [ex.submit(propagate(self._gen_and_retrieve), query) for _ in range(self.n_queries)]
             all_docs = []
             for f in futures:
                 all_docs.extend(f.result())
@@ -4,23 +4,101 @@ Vector store abstraction: interface to store and query embeddings.
 Includes FAISS and Chroma implementations.
 """
 
+import json
+import mmap
+import os
+import uuid
 from typing import List, Dict, Any, Optional
 
+from autoagent.telemetry.tracing import trace_method
+
 class BaseVectorStore:
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        trace_method(cls, "query", "vector_store.query", store=cls.__name__)
+
     def add(self, embeddings: List[List[float]], metadatas: List[Dict[str, Any]]):
         raise NotImplementedError
 
     def query(self, query_embedding: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
         raise NotImplementedError
 
+class MappedMetadata:
+    """
+    Read-only metadata list backed by a memory-mapped JSONL file plus an
+    offsets array, so worker processes share the pages instead of each
+    holding a parsed copy. Entries are decoded on access.
+    """
+
+    def __init__(self, jsonl_path: str, offsets_path: str):
+        import numpy as np
+        self._offsets = np.load(offsets_path, mmap_mode="r")
+        with open(jsonl_path, "rb") as f:
+            # mmap refuses empty files
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        if i < 0:
+            i += len(self)
+        return json.loads(self._data[int(self._offsets[i]):int(self._offsets[i + 1])])
+
+    def extend(self, metadatas):
+        raise TypeError("memory-mapped FAISSStore is read-only")
+
+
 class FAISSStore(BaseVectorStore):
+    """
+    `save(directory)` writes the index and metadata; `load(directory)`
+    memory-maps both read-only, so processes loading the same directory
+    (e.g. RunnerPool workers) share one copy through the page cache.
+    """
+    INDEX_FILE = "index.faiss"
+    METADATA_FILE = "metadata.jsonl"
+    OFFSETS_FILE = "metadata.offsets.npy"
+
     def __init__(self, index=None):
         import faiss
         self.index = index or faiss.IndexFlatL2(768)
         self.metadatas = []
 
+    def save(self, directory: str):
+        import faiss
+        import numpy as np
+        os.makedirs(directory, exist_ok=True)
+        faiss.write_index(self.index, os.path.join(directory, self.INDEX_FILE))
+        offsets = [0]
+        with open(os.path.join(directory, self.METADATA_FILE), "wb") as f:
+            for i in range(len(self.metadatas)):
+                line = json.dumps(self.metadatas[i], ensure_ascii=False).encode() + b"\n"
+                f.write(line)
+                offsets.append(offsets[-1] + len(line))
+        np.save(os.path.join(directory, self.OFFSETS_FILE), np.array(offsets, dtype=np.int64))
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "FAISSStore":
+        """With mmap=False the index and metadata are read into process memory (and can be added to)."""
+        import faiss
+        path = os.path.join(directory, cls.INDEX_FILE)
+        if not mmap:
+            store = cls(faiss.read_index(path))
+            with open(os.path.join(directory, cls.METADATA_FILE), encoding="utf-8") as f:
+                store.metadatas = [json.loads(line) for line in f]
+            return store
+        # IO_FLAG_MMAP_IFC maps flat codes and inverted lists alike; older
+        # faiss only has IO_FLAG_MMAP, which maps inverted lists
+        flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+        store = cls(faiss.read_index(path, flag))
+        store.metadatas = MappedMetadata(os.path.join(directory, cls.METADATA_FILE),
+                                         os.path.join(directory, cls.OFFSETS_FILE))
+        return store
+
     def add(self, embeddings: List[List[float]], metadatas: List[Dict[str, Any]]):
         import numpy as np
+        if isinstance(self.metadatas, MappedMetadata):
+            raise TypeError("memory-mapped FAISSStore is read-only")
         arr = np.array(embeddings).astype('float32')
         self.index.add(arr)
         self.metadatas.extend(metadatas)
@@ -31,8 +109,12 @@ class FAISSStore(BaseVectorStore):
         distances, idxs = self.index.search(q, top_k)
         results = []
         for dist, idx in zip(distances[0], idxs[0]):
+            if idx < 0:
+                continue  # padding: fewer than top_k vectors matched
             meta = self.metadatas[idx]
-            results.append({'metadata': meta, 'score': float(dist)})
+            # metadata keys (source, text, ...) at top level, as retrievers expect;
+            # 'distance' marks the score as lower-is-better (see ContextPacker)
+            results.append({**meta, 'metadata': meta, 'score': float(dist), 'distance': float(dist)})
         return results
 
 class ChromaStore(BaseVectorStore):
@@ -42,9 +124,15 @@ class ChromaStore(BaseVectorStore):
         self.collection = self.client.get_or_create_collection(collection_name or 'default')
 
     def add(self, embeddings: List[List[float]], metadatas: List[Dict[str, Any]]):
-        ids = [str(i) for i in range(len(embeddings))]
-        self.collection.add(ids=ids, embeddings=embeddings, metadatas=metadatas)
+        # fresh ids per vector, so repeated adds append rather than overwrite
+        # (counting what is stored would collide once anything is deleted)
+        ids = [uuid.uuid4().hex for _ in embeddings]
+        batch = self.client.get_max_batch_size()
+        for i in range(0, len(embeddings), batch):
+            self.collection.add(ids=ids[i:i + batch], embeddings=embeddings[i:i + batch],
+                                metadatas=metadatas[i:i + batch])
 
     def query(self, query_embedding: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
         results = self.collection.query(query_embeddings=[query_embedding], n_results=top_k)
-        return [{'metadata': m, 'score': s} for m, s in zip(results['metadatas'][0], results['distances'][0])]
+        return [{**(m or {}), 'metadata': m, 'score': s, 'distance': s}
+                for m, s in zip(results['metadatas'][0], results['distances'][0])]
@@ -0,0 +1,277 @@
+# autoagent/telemetry/profiling.py
+"""
+Per-request stage timings and slow-request capture for AgentRunner.
+
+    from autoagent.telemetry.profiling import RequestProfiler
+
+    profiler = RequestProfiler(threshold_ms=2000, mode="sample", keep=50)
+    runner = AgentRunner(base_cfg, tools, profiler=profiler)
+    ...
+    profiler.reports()        # the last `keep` slow requests, newest last
+    profiler.dump("slow.json")
+
+Every profiled request gets a StageTimes collector fed by the tracing spans
+(agent.run, llm.call, retriever.retrieve, tool.run, ...), so stage wall
+times cost nothing beyond the spans themselves. A profile is taken during
+every request and kept only when the request ends over `threshold_ms`:
+
+  - "sample": a background thread snapshots the request thread's stack
+    every `interval_ms` (sys._current_frames); cheap enough to leave on
+  - "cprofile": cProfile on the request thread; exact call counts, but
+    slows Python-heavy code noticeably, and only one request at a time
+    can be profiled (concurrent ones get stage timings only)
+  - None: stage timings only
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from autoagent.telemetry import tracing
+
+MODES = ("sample", "cprofile", None)
+_MAX_DEPTH = 64
+
+
+class StageTimes:
+    """
+    Wall time per span name within one request: count, inclusive total and
+    self time (total minus spans nested in it). Spans opened on pool
+    threads (via tracing.propagate) are counted too, but their parent's
+    self time still includes the wait for them.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = {}  # name -> [count, total, self]
+        self._lock = threading.Lock()
+
+    def add(self, name: str, elapsed: float, own: float):
+        with self._lock:
+            row = self.stages.get(name)
+            if row is None:
+                row = self.stages[name] = [0, 0.0, 0.0]
+            row[0] += 1
+            row[1] += elapsed
+            row[2] += own
+
+    def summary(self) -> Dict[str, dict]:
+        with self._lock:
+            rows = sorted(self.stages.items(), key=lambda kv: kv[1][1], reverse=True)
+        return {name: {"count": int(count), "total_ms": round(total * 1000, 2), "self_ms": round(own * 1000, 2)}
+                for name, (count, total, own) in rows}
+
+
+class RequestProfile:
+    """One request: labels, stage timings and (while running) its profile."""
+
+    def __init__(self, labels: dict, stacks: bool = True):
+        self.labels = labels
+        self.stacks = stacks
+        self.stages = StageTimes()
+        self.thread_id = threading.get_ident()
+        self.started_at = time.time()
+        self.total_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self.samples: Optional[Counter] = None
+        self.cprofile: Optional[cProfile.Profile] = None
+
+    def summary(self) -> dict:
+        """Total and per-stage wall time; `other_ms` is time outside any span."""
+        stages = self.stages.summary()
+        inside = sum(row["self_ms"] for row in stages.values())
+        total = self.total_ms or 0.0
+        return {"total_ms": round(total, 2), "other_ms": round(max(0.0, total - inside), 2), "stages": stages}
+
+
+class _Sampler(threading.Thread):
+    """Counts the stacks of registered request threads every `interval` seconds."""
+
+    def __init__(self, interval: float):
+        super().__init__(name="autoagent-profiler", daemon=True)
+        self.interval = interval
+        self.targets: Dict[int, Counter] = {}
+        self.lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            with self.lock:
+                if not self.targets:
+                    continue
+                frames = sys._current_frames()
+                for tid, counts in self.targets.items():
+                    frame = frames.get(tid)
+                    if frame is not None:
+                        counts[_stack_key(frame)] += 1
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def _stack_key(frame) -> tuple:
+    # code objects and line numbers only; formatting waits until a report is kept
+    stack = []
+    while frame is not None and len(stack) < _MAX_DEPTH:
+        stack.append((frame.f_code, frame.f_lineno))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+def _frame_label(code, lineno: int) -> str:
+    return f"{code.co_name} ({code.co_filename}:{lineno})"
+
+
+class RequestProfiler:
+    """
+    Opt-in profiling for AgentRunner.handle_message.
+
+    threshold_ms: requests at least this slow keep their profile in the
+        ring buffer (0 keeps every request)
+    mode: "sample", "cprofile" or None, see module docstring
+    interval_ms: sampling period for mode="sample"
+    keep: size of the slow-request ring buffer
+    top: stacks / functions listed per report
+    """
+
+    def __init__(self, threshold_ms: float = 1000.0, mode: Optional[str] = "sample",
+                 interval_ms: float = 5.0, keep: int = 50, top: int = 25):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}'")
+        self.threshold_ms = threshold_ms
+        self.mode = mode
+        self.interval = interval_ms / 1000
+        self.top = top
+        self.requests = 0
+        self.slow = 0
+        self._reports: deque = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._sampler: Optional[_Sampler] = None
+        self._cprofile_busy = threading.Lock()
+        self._closed = False
+        tracing.use_stages(True)
+
+    @contextmanager
+    def request(self, stacks: bool = True, **labels):
+        """
+        Profile the block as one request; yields its RequestProfile.
+        stacks=False records stage timings only, for requests whose work
+        moves between threads (streams), where per-thread stack sampling
+        or cProfile would capture the wrong code.
+        """
+        prof = RequestProfile(labels, stacks)
+        token = tracing.collect_stages(prof.stages)
+        if stacks:
+            self._start(prof)
+        start = time.perf_counter()
+        try:
+            yield prof
+        except BaseException as exc:
+            prof.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            prof.total_ms = (time.perf_counter() - start) * 1000
+            self._stop(prof)
+            tracing.reset_stages(token)
+            self._finish(prof)
+
+    def _start(self, prof: RequestProfile):
+        if self.mode == "sample":
+            sampler = self._ensure_sampler()
+            prof.samples = Counter()
+            with sampler.lock:
+                sampler.targets[prof.thread_id] = prof.samples
+        elif self.mode == "cprofile" and self._cprofile_busy.acquire(blocking=False):
+            prof.cprofile = cProfile.Profile()
+            try:
+                prof.cprofile.enable()
+            except ValueError:  # another profiler (e.g. a debugger) is active
+                prof.cprofile = None
+                self._cprofile_busy.release()
+
+    def _stop(self, prof: RequestProfile):
+        if prof.samples is not None:
+            with self._sampler.lock:
+                self._sampler.targets.pop(prof.thread_id, None)
+        elif prof.cprofile is not None:
+            prof.cprofile.disable()
+            self._cprofile_busy.release()
+
+    def _ensure_sampler(self) -> _Sampler:
+        with self._lock:
+            if self._sampler is None:
+                self._sampler = _Sampler(self.interval)
+                self._sampler.start()
+            return self._sampler
+
+    def _finish(self, prof: RequestProfile):
+        slow = prof.total_ms >= self.threshold_ms
+        report = self._report(prof) if slow else None
+        with self._lock:
+            self.requests += 1
+            if slow:
+                self.slow += 1
+                self._reports.append(report)
+
+    def _report(self, prof: RequestProfile) -> dict:
+        report = dict(prof.summary(), labels=prof.labels, error=prof.error,
+                      started_at=prof.started_at, threshold_ms=self.threshold_ms,
+                      mode=self.mode if prof.stacks else None)
+        if prof.samples:
+            report["profile"] = self._sample_report(prof.samples)
+        elif prof.cprofile is not None:
+            out = io.StringIO()
+            stats = pstats.Stats(prof.cprofile, stream=out)
+            stats.sort_stats("cumulative").print_stats(self.top)
+            report["profile"] = {"cprofile": out.getvalue()}
+        return report
+
+    def _sample_report(self, samples: Counter) -> dict:
+        total = sum(samples.values())
+        leaves: Counter = Counter()
+        for stack, n in samples.items():
+            leaves[_frame_label(*stack[-1])] += n
+        return {
+            "samples": total,
+            "interval_ms": self.interval * 1000,
+            # collapsed stacks, root first: the input format of flamegraph.pl / speedscope
+            "stacks": [f"{';'.join(_frame_label(c, l) for c, l in stack)} {n}"
+                       for stack, n in samples.most_common(self.top)],
+            "top_functions": [{"function": name, "samples": n, "pct": round(100 * n / total, 1)}
+                              for name, n in leaves.most_common(self.top)],
+        }
+
+    def reports(self) -> List[dict]:
+        """The retained slow-request reports, oldest first."""
+        with self._lock:
+            return list(self._reports)
+
+    def dump(self, path: Optional[str] = None) -> str:
+        """Slow-request reports as JSON; also written to `path` when given."""
+        data = json.dumps({"requests": self.requests, "slow": self.slow,
+                           "threshold_ms": self.threshold_ms, "reports": self.reports()},
+                          indent=2, default=str)
+        if path:
+            with open(path, "w") as f:
+                f.write(data)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._reports.clear()
+            self.requests = self.slow = 0
+
+    def close(self):
+        """Stop the sampler thread and release span timing."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._sampler is not None:
+                self._sampler.stop()
+        tracing.use_stages(False)
@@ -0,0 +1,280 @@
+# autoagent/telemetry/tracing.py
+"""
+Lightweight span tracing, off by default.
+
+    from autoagent.telemetry import tracing
+
+    tracing.enable("memory")          # or "otel", or set AUTOAGENT_TRACING
+    ...
+    tracing.recorder.summary()        # time per span name, slowest first
+
+`span(name, **attributes)` is a context manager and `traced(name)` a
+decorator. While tracing is disabled both cost a flag check: `span`
+returns a shared no-op object and `traced` calls straight through.
+
+Backends:
+  - "otel": spans go to OpenTelemetry through `opentelemetry-api` (exporters
+    and the TracerProvider are the application's to configure)
+  - "memory": finished spans are kept in `recorder`, a bounded in-process
+    buffer, with parent/child links tracked per context
+
+Independently of the backend, spans also feed the per-request stage
+collector installed with `collect_stages()` (see profiling.py).
+"""
+
+import contextvars
+import functools
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+_enabled = False
+_backend = None  # an _OTelBackend or a SpanRecorder
+_stage_users = 0  # profilers that need span timings
+
+def _refresh():
+    global _enabled
+    _enabled = _backend is not None or _stage_users > 0
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def record_exception(self, exc: BaseException):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """A finished or running span of the "memory" backend."""
+    __slots__ = ("name", "span_id", "parent_id", "trace_id", "start", "end",
+                 "attributes", "error", "_recorder", "_token")
+
+    def __init__(self, recorder: "SpanRecorder", name: str, attributes: Dict[str, Any]):
+        self._recorder = recorder
+        self.name = name
+        self.attributes = attributes
+        self.error = None
+        self.end = None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end is None else (self.end - self.start) * 1000
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException):
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def __enter__(self):
+        parent = _current.get()
+        self.span_id = next(self._recorder._ids)
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else self.span_id
+        self._token = _current.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        _current.reset(self._token)
+        if exc is not None:
+            self.record_exception(exc)
+        self._recorder._finish(self)
+        return False
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "trace_id": self.trace_id, "span_id": self.span_id,
+                "parent_id": self.parent_id, "duration_ms": round(self.duration_ms or 0.0, 3),
+                "attributes": dict(self.attributes), "error": self.error}
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("autoagent_span", default=None)
+_stages: contextvars.ContextVar = contextvars.ContextVar("autoagent_stages", default=None)
+# innermost _Timed in this context; per context rather than per thread, so a
+# span may open and close on different threads (e.g. around a stream's steps)
+_timed_parent: contextvars.ContextVar = contextvars.ContextVar("autoagent_timed_parent", default=None)
+
+
+class _Timed:
+    """Wraps a backend span (or the no-op) and reports its wall time to a stage collector."""
+    __slots__ = ("stages", "name", "inner", "start", "nested", "parent", "token")
+
+    def __init__(self, stages, name: str, inner):
+        self.stages = stages
+        self.name = name
+        self.inner = inner
+
+    def __enter__(self):
+        span = self.inner.__enter__()
+        self.nested = 0.0
+        self.parent = _timed_parent.get()
+        self.token = _timed_parent.set(self)
+        self.start = time.perf_counter()
+        return span
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        _timed_parent.reset(self.token)
+        if self.parent is not None:
+            self.parent.nested += elapsed
+        self.stages.add(self.name, elapsed, elapsed - self.nested)
+        return self.inner.__exit__(*exc)
+
+
+class SpanRecorder:
+    """In-process backend: keeps the last `maxlen` finished spans."""
+
+    def __init__(self, maxlen: int = 10000):
+        self._spans: deque = deque(maxlen=maxlen)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self, name: str, attributes: Dict[str, Any]) -> Span:
+        return Span(self, name, attributes)
+
+    def _finish(self, span: Span):
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self, trace_id: Optional[int] = None) -> List[dict]:
+        with self._lock:
+            spans = list(self._spans)
+        return [s.to_dict() for s in spans if trace_id is None or s.trace_id == trace_id]
+
+    def summary(self) -> List[dict]:
+        """Count, total and max duration per span name, by total time."""
+        with self._lock:
+            spans = list(self._spans)
+        stats: Dict[str, dict] = {}
+        for s in spans:
+            row = stats.setdefault(s.name, {"name": s.name, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "errors": 0})
+            ms = s.duration_ms or 0.0
+            row["count"] += 1
+            row["total_ms"] += ms
+            row["max_ms"] = max(row["max_ms"], ms)
+            row["errors"] += s.error is not None
+        return sorted(stats.values(), key=lambda r: r["total_ms"], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+
+class _OTelBackend:
+    def __init__(self):
+        from opentelemetry import trace
+        self._tracer = trace.get_tracer("autoagent")
+
+    def start(self, name: str, attributes: Dict[str, Any]):
+        return self._tracer.start_as_current_span(name, attributes=attributes)
+
+
+recorder = SpanRecorder()
+
+
+def enable(backend: str = "memory"):
+    """Turn tracing on with the "memory" or "otel" backend."""
+    global _backend
+    if backend == "otel":
+        _backend = _OTelBackend()  # ImportError without opentelemetry-api
+    elif backend == "memory":
+        _backend = recorder
+    else:
+        raise ValueError(f"Unknown tracing backend '{backend}'")
+    _refresh()
+
+def disable():
+    global _backend
+    _backend = None
+    _refresh()
+
+def is_enabled() -> bool:
+    return _backend is not None
+
+def use_stages(on: bool):
+    """Reference-counted switch for span timing on behalf of a profiler."""
+    global _stage_users
+    _stage_users = max(0, _stage_users + (1 if on else -1))
+    _refresh()
+
+def collect_stages(collector):
+    """
+    Make `collector` (add(name, total_seconds, self_seconds)) receive the
+    timings of spans opened in the current context; returns a token for
+    `reset_stages`.
+    """
+    return _stages.set(collector)
+
+def reset_stages(token):
+    _stages.reset(token)
+
+def propagate(fn: Callable) -> Callable:
+    """
+    `fn` bound to a copy of the current context, for work handed to thread
+    pools. Its spans run concurrently with the caller's, so they are not
+    subtracted from the enclosing span's self time.
+    """
+    ctx = contextvars.copy_context()
+    ctx.run(_timed_parent.set, None)
+    return functools.partial(ctx.run, fn)
+
+def _start(name: str, attributes: Dict[str, Any]):
+    inner = _backend.start(name, attributes) if _backend is not None else _NOOP
+    stages = _stages.get()
+    return inner if stages is None else _Timed(stages, name, inner)
+
+def span(name: str, **attributes: Any):
+    """Context manager for one span; a shared no-op while tracing is off."""
+    if not _enabled:
+        return _NOOP
+    return _start(name, attributes)
+
+def traced(name: Optional[str] = None, attributes: Optional[Callable[..., Dict[str, Any]]] = None,
+           **static: Any):
+    """
+    Decorator running the function inside a span (default name: its
+    qualname). `static` attributes are fixed; `attributes(*args, **kwargs)`
+    may derive more from the call.
+    """
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            attrs = dict(static)
+            if attributes is not None:
+                attrs.update(attributes(*args, **kwargs))
+            with _start(label, attrs):
+                return fn(*args, **kwargs)
+
+        wrapper.__traced__ = True
+        return wrapper
+    return decorate
+
+def trace_method(cls, method: str, name: str, **static: Any):
+    """Wrap `cls.<method>` in a span if the class defines it itself (used by base classes' __init_subclass__)."""
+    fn = cls.__dict__.get(method)
+    if fn is not None and callable(fn) and not getattr(fn, "__traced__", False):
+        setattr(cls, method, traced(name, **static)(fn))
+
+
+if os.getenv("AUTOAGENT_TRACING"):
+    enable(os.environ["AUTOAGENT_TRACING"])
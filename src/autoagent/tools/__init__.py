@@ -1,16 +1,23 @@
 # autoagent/tools/__init__.py
 
-# Expose key modules
-from .base import BaseTool, ToolInput, ToolOutput
+# The registry is cheap to import; built-in tools are registered by name and
+# imported on first use (see builtin_tools/__init__.py).
 from .registry import register_tool, tool_registry
-from .tool_runner import run_tool
+from . import builtin_tools  # noqa: F401  registers the built-in manifest
 
-# Auto-import all builtin tools so they register themselves on import
-import pkgutil, importlib, os
+_LAZY_EXPORTS = {
+    "BaseTool": ".base",
+    "ToolInput": ".base",
+    "ToolOutput": ".base",
+    "run_tool": ".tool_runner",
+    "ToolQueueFull": ".executor",
+}
 
-def _import_builtin_tools():
-    tools_pkg = os.path.join(os.path.dirname(__file__), "builtin_tools")
-    for _, module_name, _ in pkgutil.iter_modules([tools_pkg]):
-        importlib.import_module(f"{__name__}.builtin_tools.{module_name}")
-
-_import_builtin_tools()
+def __getattr__(name):
+    # Defer pydantic & friends until a tool is actually built or run
+    if name in _LAZY_EXPORTS:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
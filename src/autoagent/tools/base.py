@@ -1,11 +1,17 @@
 # autoagent/tools/base.py
 
 import asyncio
+import inspect
 import logging
-from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import threading
+from abc import ABC
+from concurrent.futures import CancelledError
 from pydantic import BaseModel
-from typing import Type, Any, List
+from typing import Type, Any, List, Optional, Union
+
+from .executor import ToolQueueFull, get_executor
+from autoagent.telemetry.tracing import propagate
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +23,31 @@ class ToolOutput(BaseModel):
     """Base class for tool output definitions."""
     pass
 
+class CancellationToken:
+    """
+    Cooperative cancellation flag handed to tools that declare
+    `supports_cancellation`. Long-running tools should check it between
+    units of work and stop early once it is set (e.g. after a timeout).
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise CancelledError()
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to `timeout` seconds; returns True early if cancelled."""
+        return self._event.wait(timeout)
+
 class BaseTool(ABC):
     """
     Abstract base class for all tools.
@@ -29,7 +60,15 @@ class BaseTool(ABC):
       - categories: List[str]
       - input_model: ToolInput
       - output_model: ToolOutput
-      - execute(self, input) -> output
+      - cacheable: bool (identical inputs may reuse a previous result;
+        opt-in, for side-effect-free tools only)
+      - stateless: bool (one shared instance may serve every call)
+      - cpu_bound: bool (run on the process pool when one is configured)
+      - supports_cancellation: bool (execute also takes a CancellationToken)
+      - isolation: "thread" | "process" (process: killed outright on timeout)
+      - trusted: bool (skip re-validating output in run_tool)
+      - execute(self, input) -> output, and/or
+        async def async_execute(self, input) -> output  (native async tools)
     """
     name: str
     description: str
@@ -38,41 +77,154 @@ class BaseTool(ABC):
     categories: List[str] = []
     input_model: Type[ToolInput] = ToolInput
     output_model: Type[ToolOutput] = ToolOutput
+    cacheable: bool = False
+    stateless: bool = False
+    cpu_bound: bool = False
+    supports_cancellation: bool = False
+    isolation: str = "thread"
+    trusted: bool = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # execute is not abstract (async-only tools may skip it), so check here
+        # that a concrete tool implements at least one of the two
+        if inspect.isabstract(cls):
+            return
+        if cls.execute is BaseTool.execute and cls.async_execute is BaseTool.async_execute:
+            raise TypeError(f"{cls.__name__} must implement execute or async_execute")
+
+    def execute(self, input: ToolInput, cancel_token: Optional[CancellationToken] = None) -> ToolOutput:
+        """
+        Run the tool logic and return a validated output model.
+
+        Subclasses implement this, or `async_execute` for natively async
+        (I/O-bound) tools; sync callers of an async-only tool get it run on
+        a private event loop (on the shared tool executor when the caller is
+        itself inside a running loop).
+        """
+        def run():
+            if self.supports_cancellation:
+                return asyncio.run(self.async_execute(input, cancel_token))
+            return asyncio.run(self.async_execute(input))
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return run()
+        return get_executor().submit(run).result()
 
-    @abstractmethod
-    def execute(self, input: ToolInput) -> ToolOutput:
-        """Run the tool logic and return a validated output model."""
-        ...
+    @property
+    def is_native_async(self) -> bool:
+        """True when the subclass provides its own coroutine `async_execute`."""
+        return type(self).async_execute is not BaseTool.async_execute
 
-    async def async_execute(self, input: ToolInput) -> ToolOutput:
-        """Default async wrapper around sync execute."""
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, self.execute, input)
+    def execute_with_token(self, input: ToolInput, cancel_token: Optional[CancellationToken] = None) -> ToolOutput:
+        """Call execute, passing the token only to tools that accept one."""
+        if self.supports_cancellation:
+            return self.execute(input, cancel_token or CancellationToken())
+        return self.execute(input)
+
+    async def async_execute(self, input: ToolInput, cancel_token: Optional[CancellationToken] = None) -> ToolOutput:
+        """
+        Default async wrapper around sync execute, on the shared tool executor.
+        I/O-bound tools should override this with a real coroutine so they
+        don't hold a worker thread while waiting.
+        """
+        executor = get_executor()
+        if executor.runs_in_process(self.cpu_bound):
+            fn, cancel_token = self.execute_with_token, None  # tokens do not cross process boundaries
+        else:
+            fn = propagate(self.execute_with_token)  # spans inside execute keep their parent
+        args = (fn, input, cancel_token)
+        try:
+            future = executor.submit(*args, cpu_bound=self.cpu_bound, block=False)
+        except ToolQueueFull:
+            # Queue is full: wait for a slot without blocking the event loop
+            loop = asyncio.get_running_loop()
+            future = await loop.run_in_executor(
+                None, partial(executor.submit, *args, cpu_bound=self.cpu_bound)
+            )
+        return await asyncio.wrap_future(future)
 
     def batch_execute(
         self,
         inputs: List[ToolInput],
         parallel: bool = False,
-        timeout: float = None
-    ) -> List[ToolOutput]:
+        timeout: float = None,
+        return_exceptions: bool = True
+    ) -> List[Union[ToolOutput, Exception]]:
         """
         Run multiple inputs through the tool.
 
-        :param parallel: use thread pool
-        :param timeout: per-item timeout in seconds
+        :param parallel: use the shared tool executor
+        :param timeout: per-item timeout in seconds (parallel only); a
+            timed-out item's cancellation token is set
+        :param return_exceptions: put a failed item's exception in its result
+            slot instead of aborting the whole batch
         """
-        results: List[ToolOutput] = []
-        if parallel:
-            with ThreadPoolExecutor() as executor:
-                futures = [executor.submit(self.execute, inp) for inp in inputs]
-                for fut in futures:
-                    try:
-                        out = fut.result(timeout=timeout)
-                    except Exception as e:
-                        logger.error("Tool %s batch error: %s", self.name, e)
-                        raise
-                    results.append(out)
+        if not parallel:
+            items = [(inp, None, None) for inp in inputs]
         else:
+            executor = get_executor()
+            in_process = executor.runs_in_process(self.cpu_bound)
+            items = []
             for inp in inputs:
-                results.append(self.execute(inp))
+                token = None if in_process else CancellationToken()
+                items.append((inp, executor.submit(self.execute_with_token, inp, token, cpu_bound=self.cpu_bound),
+                              token))
+        results: List[Union[ToolOutput, Exception]] = []
+        for i, (inp, future, token) in enumerate(items):
+            try:
+                out = future.result(timeout=timeout) if future else self.execute_with_token(inp)
+            except Exception as e:
+                if future:
+                    future.cancel()
+                    if token and isinstance(e, TimeoutError):
+                        token.cancel()
+                logger.error("Tool %s batch error: %s", self.name, e)
+                if not return_exceptions:
+                    for _, rest, rest_token in items[i + 1:]:
+                        if rest:
+                            rest.cancel()
+                        if rest_token:
+                            rest_token.cancel()
+                    raise
+                out = e
+            results.append(out)
         return results
+
+    async def abatch_execute(
+        self,
+        inputs: List[ToolInput],
+        concurrency: int = 10,
+        timeout: float = None,
+        return_exceptions: bool = True
+    ) -> List[Union[ToolOutput, Exception]]:
+        """
+        Async batch: runs items through `async_execute` with `asyncio.gather`,
+        at most `concurrency` at a time.
+
+        :param timeout: per-item timeout in seconds
+        :param return_exceptions: put a failed item's exception in its result
+            slot instead of aborting the whole batch
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(inp: ToolInput) -> ToolOutput:
+            async with sem:
+                token = CancellationToken() if self.supports_cancellation else None
+                coro = self.async_execute(inp, token) if token else self.async_execute(inp)
+                try:
+                    if timeout:
+                        return await asyncio.wait_for(coro, timeout)
+                    return await coro
+                except asyncio.TimeoutError:
+                    if token:
+                        token.cancel()
+                    logger.error("Tool %s batch item timed out after %ss", self.name, timeout)
+                    raise
+                except Exception as e:
+                    logger.error("Tool %s batch error: %s", self.name, e)
+                    raise
+
+        return await asyncio.gather(*(one(inp) for inp in inputs), return_exceptions=return_exceptions)
@@ -0,0 +1,22 @@
+# autoagent/tools/builtin_tools/__init__.py
+
+from ..registry import tool_registry
+
+# Manifest of built-in tools: registered by name up front, imported on first use.
+# Modules dropped in here without a manifest entry are still picked up, the
+# first time an unknown tool name is looked up. Descriptions and categories
+# copy the classes' own (kept without importing them); tests/test_builtin_tools.py
+# fails when the two drift apart.
+BUILTIN_TOOLS = {
+    "menu_lookup": ("menu_lookup:MenuLookupTool", "Lookup a menu item’s price and availability.",
+                    ["food_ordering", "builtin"]),
+    "menu_bulk_lookup": ("menu_lookup:MenuBulkLookupTool", "Lookup price and availability for many menu items (e.g. a whole order) in one call.",
+                         ["food_ordering", "builtin"]),
+    "reservation": ("reservation:ReservationTool", "Create a reservation for a given date, time, and party size.",
+                    []),
+}
+
+for _name, (_target, _description, _categories) in BUILTIN_TOOLS.items():
+    tool_registry.register_lazy(_name, f"{__name__}.{_target}",
+                                description=_description, categories=_categories)
+del _name, _target, _description, _categories
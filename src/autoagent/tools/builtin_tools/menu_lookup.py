@@ -1,40 +1,180 @@
 # autoagent/tools/builtin_tools/menu_lookup.py
 
+import re
+import threading
+import time
+from collections import OrderedDict
+from difflib import get_close_matches
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
 from ..base import BaseTool, ToolInput, ToolOutput
 from ..registry import register_tool
 from pydantic import Field
 
+_PUNCT = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+def normalize_item_name(name: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive key for menu items."""
+    return _SPACES.sub(" ", _PUNCT.sub("", name.lower())).strip()
+
+
+class MenuCatalog:
+    """
+    Local indexed menu catalog.
+
+    Items are kept in a hash index keyed by (restaurant_id, normalised name),
+    with difflib fuzzy matching as a fallback for misspellings. A restaurant's
+    menu is fetched through `loader` on first use and refreshed after `ttl`
+    seconds; menus pushed with `load()` are kept for the same TTL, or
+    indefinitely when there is no loader. Looking up a restaurant with no
+    menu and no loader raises RuntimeError rather than reporting every item
+    as missing.
+    """
+
+    def __init__(self, loader: Optional[Callable[[str], Iterable[dict]]] = None,
+                 ttl: float = 300.0, fuzzy_cutoff: float = 0.8, fuzzy_cache_size: int = 4096):
+        """
+        :param loader: restaurant_id -> iterable of {"item_name", "price", "available"}
+        :param ttl: seconds before a restaurant's menu is reloaded
+        :param fuzzy_cutoff: minimum difflib ratio for a fuzzy match
+        :param fuzzy_cache_size: fuzzy match results remembered (LRU)
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.fuzzy_cache_size = fuzzy_cache_size
+        self._items: Dict[Tuple[str, str], dict] = {}
+        self._names: Dict[str, List[str]] = {}       # restaurant → normalised names
+        self._fuzzy: "OrderedDict[Tuple[str, str], Optional[str]]" = OrderedDict()
+        self._loaded_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def load(self, restaurant_id: str, items: Iterable[dict]):
+        """Replace a restaurant's menu in the index."""
+        entries = {normalize_item_name(i["item_name"]): dict(i) for i in items}
+        with self._lock:
+            for name in self._names.pop(restaurant_id, []):
+                self._items.pop((restaurant_id, name), None)
+            for name, item in entries.items():
+                self._items[(restaurant_id, name)] = item
+            self._names[restaurant_id] = list(entries)
+            for key in [k for k in self._fuzzy if k[0] == restaurant_id]:
+                del self._fuzzy[key]
+            self._loaded_at[restaurant_id] = time.monotonic()
+
+    def invalidate(self, restaurant_id: Optional[str] = None):
+        """Force a reload on next lookup (all restaurants when None)."""
+        with self._lock:
+            if restaurant_id is None:
+                self._loaded_at.clear()
+            else:
+                self._loaded_at.pop(restaurant_id, None)
+
+    def _ensure_fresh(self, restaurant_id: str):
+        if self.loader is None:
+            if restaurant_id not in self._names:
+                raise RuntimeError(f"No menu loaded for restaurant '{restaurant_id}' and no loader configured")
+            return
+        loaded = self._loaded_at.get(restaurant_id)
+        if loaded is None or time.monotonic() - loaded > self.ttl:
+            self.load(restaurant_id, self.loader(restaurant_id))
+
+    def _match(self, restaurant_id: str, item_name: str) -> Optional[dict]:
+        key = normalize_item_name(item_name)
+        item = self._items.get((restaurant_id, key))
+        if item is not None:
+            return item
+        fuzzy_key = (restaurant_id, key)
+        with self._lock:
+            hit = fuzzy_key in self._fuzzy
+            if hit:
+                self._fuzzy.move_to_end(fuzzy_key)
+                name = self._fuzzy[fuzzy_key]
+        if not hit:
+            close = get_close_matches(key, self._names.get(restaurant_id, []), n=1,
+                                      cutoff=self.fuzzy_cutoff)
+            name = close[0] if close else None
+            with self._lock:
+                self._fuzzy[fuzzy_key] = name
+                while len(self._fuzzy) > self.fuzzy_cache_size:
+                    self._fuzzy.popitem(last=False)
+        return self._items.get((restaurant_id, name)) if name else None
+
+    def lookup(self, restaurant_id: str, item_name: str) -> Optional[dict]:
+        """Exact (normalised) match first, then the closest fuzzy match."""
+        self._ensure_fresh(restaurant_id)
+        return self._match(restaurant_id, item_name)
+
+    def lookup_many(self, restaurant_id: str, item_names: List[str]) -> List[Optional[dict]]:
+        """Resolve a whole order against one menu snapshot."""
+        self._ensure_fresh(restaurant_id)
+        return [self._match(restaurant_id, n) for n in item_names]
+
+
+# Process-wide catalog used by the menu tools; set `loader` or call `load()` at startup
+menu_catalog = MenuCatalog()
+
+
 class MenuLookupInput(ToolInput):
     restaurant_id: str = Field(..., description="Restaurant unique ID")
     item_name:     str = Field(..., description="Menu item to look up")
 
 class MenuLookupOutput(ToolOutput):
     item_name: str   = Field(..., description="Name of the item")
-    price:     float = Field(..., description="Item price")
+    price:     Optional[float] = Field(..., description="Item price (null when not on the menu)")
     available: bool  = Field(..., description="Is the item available?")
+    found:     bool  = Field(True, description="Was the item on the menu?")
+
+def _to_output(requested: str, item: Optional[dict]) -> MenuLookupOutput:
+    if item is None:
+        return MenuLookupOutput(item_name=requested, price=None, available=False, found=False)
+    return MenuLookupOutput(item_name=item["item_name"], price=item["price"],
+                            available=item.get("available", True))
 
 @register_tool
 class MenuLookupTool(BaseTool):
     name = "menu_lookup"
     description = "Lookup a menu item’s price and availability."
-    version = "1.1.0"
+    version = "1.2.0"
     tags = ["menu", "price", "inventory"]
     categories = ["food_ordering", "builtin"]
 
     input_model = MenuLookupInput
     output_model = MenuLookupOutput
+    cacheable = True
+    stateless = True
+    trusted = True
 
     def execute(self, input: MenuLookupInput) -> MenuLookupOutput:
-        # TODO: replace stub with real DB/API call
-        # Example of batch support:
-        if isinstance(input.item_name, list):
-            # handle batch of item names
-            outputs = []
-            for item in input.item_name:
-                stub = {"item_name": item, "price": 12.99, "available": True}
-                outputs.append(MenuLookupOutput(**stub))
-            # return first for single-run, or list in batch context
-            return outputs  # note: agents must handle list outputs in batch mode
-
-        stub = {"item_name": input.item_name, "price": 12.99, "available": True}
-        return MenuLookupOutput(**stub)
+        item = menu_catalog.lookup(input.restaurant_id, input.item_name)
+        return _to_output(input.item_name, item)
+
+
+class MenuBulkLookupInput(ToolInput):
+    restaurant_id: str       = Field(..., description="Restaurant unique ID")
+    item_names:    List[str] = Field(..., min_length=1, description="Menu items to look up")
+
+class MenuBulkLookupOutput(ToolOutput):
+    items:     List[MenuLookupOutput] = Field(..., description="One result per requested item, in order")
+    unmatched: List[str]              = Field(default_factory=list, description="Requested names not on the menu")
+
+@register_tool
+class MenuBulkLookupTool(BaseTool):
+    name = "menu_bulk_lookup"
+    description = "Lookup price and availability for many menu items (e.g. a whole order) in one call."
+    version = "1.0.0"
+    tags = ["menu", "price", "inventory", "batch"]
+    categories = ["food_ordering", "builtin"]
+
+    input_model = MenuBulkLookupInput
+    output_model = MenuBulkLookupOutput
+    cacheable = True
+    stateless = True
+    trusted = True
+
+    def execute(self, input: MenuBulkLookupInput) -> MenuBulkLookupOutput:
+        found = menu_catalog.lookup_many(input.restaurant_id, input.item_names)
+        items = [_to_output(name, item) for name, item in zip(input.item_names, found)]
+        unmatched = [name for name, item in zip(input.item_names, found) if item is None]
+        return MenuBulkLookupOutput(items=items, unmatched=unmatched)
@@ -1,25 +1,341 @@
 # autoagent/tools/builtin_tools/reservation.py
 
+import bisect
+import os
+import sqlite3
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
 from ..base import BaseTool, ToolInput, ToolOutput
 from ..registry import register_tool
 from pydantic import Field
 
+_EPOCH = datetime(1970, 1, 1)
+_MINUTE = timedelta(minutes=1)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS restaurants (
+    restaurant_id TEXT PRIMARY KEY,
+    seats         INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS slots (
+    restaurant_id TEXT    NOT NULL,
+    slot          INTEGER NOT NULL,   -- minutes since epoch
+    booked        INTEGER NOT NULL,
+    version       INTEGER NOT NULL,
+    PRIMARY KEY (restaurant_id, slot)
+);
+CREATE TABLE IF NOT EXISTS reservations (
+    confirmation_id TEXT PRIMARY KEY,
+    restaurant_id   TEXT    NOT NULL,
+    start           INTEGER NOT NULL,
+    party_size      INTEGER NOT NULL,
+    created_at      TEXT    NOT NULL
+);
+"""
+
+def default_db_path() -> str:
+    """$AUTOAGENT_RESERVATIONS_DB, else reservations.db in $AUTOAGENT_DATA_DIR (default ~/.autoagent)."""
+    explicit = os.getenv("AUTOAGENT_RESERVATIONS_DB")
+    if explicit:
+        return explicit
+    data_dir = os.getenv("AUTOAGENT_DATA_DIR") or os.path.join(os.path.expanduser("~"), ".autoagent")
+    return os.path.join(data_dir, "reservations.db")
+
+def parse_start(date: str, time: str) -> datetime:
+    """'YYYY-MM-DD', 'HH:MM' -> datetime (raises ValueError on bad input)."""
+    return datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
+
+
+class _StaleIndex(Exception):
+    """A slot changed since it was read from the index."""
+
+
+class _SlotIndex:
+    """Booked seats per slot for one restaurant, with slot keys kept sorted."""
+
+    def __init__(self, seats: int):
+        self.seats = seats
+        self.keys: List[int] = []
+        self.rows: Dict[int, Tuple[int, int]] = {}   # slot -> (booked, version)
+        self.days = set()                            # days loaded from the store
+
+    def put(self, slot: int, booked: int, version: int):
+        if slot not in self.rows:
+            bisect.insort(self.keys, slot)
+        self.rows[slot] = (booked, version)
+
+    def booked_in(self, start: int, end: int) -> Dict[int, Tuple[int, int]]:
+        """Rows for slots in [start, end): O(log n) to locate, then the range."""
+        i = bisect.bisect_left(self.keys, start)
+        out = {}
+        while i < len(self.keys) and self.keys[i] < end:
+            out[self.keys[i]] = self.rows[self.keys[i]]
+            i += 1
+        return out
+
+
+class ReservationEngine:
+    """
+    Local reservation engine backed by SQLite.
+
+    Each restaurant has a seat capacity; a booking holds `party_size` seats in
+    every `slot_minutes` slot it overlaps for `duration_minutes`. Availability
+    is answered from an in-memory sorted slot index, which is dropped whenever
+    SQLite's `data_version` shows another connection (another worker process,
+    or another thread's connection) has committed since the last look. Bookings are written with
+    optimistic concurrency: every slot row carries a version, and an update
+    only applies if the version read from the index is still current and the
+    capacity holds, so concurrent writers (threads or processes sharing the
+    database) never overbook; a writer that loses the race refreshes its
+    index and retries.
+    """
+
+    def __init__(self, path: Optional[str] = None, default_seats: int = 40,
+                 slot_minutes: int = 15, duration_minutes: int = 90, max_retries: int = 10):
+        """
+        :param path: SQLite file (default: `default_db_path()`); it and its
+            directory are created on first use
+        :param default_seats: capacity of restaurants not set via set_capacity
+        :param max_retries: attempts per booking when writers conflict
+        """
+        self.path = path or default_db_path()
+        self.default_seats = default_seats
+        self.slot_minutes = slot_minutes
+        self.duration_slots = -(-duration_minutes // slot_minutes)
+        self.max_retries = max_retries
+        self.conflicts = 0
+        self._local = threading.local()
+        self._indexes: Dict[str, _SlotIndex] = {}
+        self._lock = threading.RLock()
+        self._schema_ready = False
+
+    # -- storage -----------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._lock:
+                if not self._schema_ready:
+                    conn.executescript(_SCHEMA)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def set_capacity(self, restaurant_id: str, seats: int):
+        self._conn().execute(
+            "INSERT INTO restaurants (restaurant_id, seats) VALUES (?, ?) "
+            "ON CONFLICT(restaurant_id) DO UPDATE SET seats = excluded.seats",
+            (restaurant_id, seats),
+        )
+        with self._lock:
+            if restaurant_id in self._indexes:
+                self._indexes[restaurant_id].seats = seats
+
+    def _index(self, restaurant_id: str) -> _SlotIndex:
+        index = self._indexes.get(restaurant_id)
+        if index is None:
+            row = self._conn().execute(
+                "SELECT seats FROM restaurants WHERE restaurant_id = ?", (restaurant_id,)
+            ).fetchone()
+            index = self._indexes.setdefault(restaurant_id, _SlotIndex(row[0] if row else self.default_seats))
+        return index
+
+    def _load(self, restaurant_id: str, index: _SlotIndex, start: int, end: int):
+        """Pull slot rows in [start, end) from the store into the index."""
+        rows = self._conn().execute(
+            "SELECT slot, booked, version FROM slots WHERE restaurant_id = ? AND slot >= ? AND slot < ?",
+            (restaurant_id, start, end),
+        ).fetchall()
+        for slot, booked, version in rows:
+            index.put(slot, booked, version)
+
+    def _span(self, start: datetime) -> Tuple[int, int]:
+        minutes = (start - _EPOCH) // _MINUTE
+        first = minutes - minutes % self.slot_minutes
+        return first, first + self.duration_slots * self.slot_minutes
+
+    def _sync(self):
+        """Drop the indexes if the database changed under this thread's connection (call with the lock held)."""
+        version = self._conn().execute("PRAGMA data_version").fetchone()[0]
+        # a thread's first look has nothing to compare against, so it reloads too
+        if getattr(self._local, "data_version", None) != version:
+            self._indexes.clear()
+            self._local.data_version = version
+
+    def _rows(self, restaurant_id: str, start: datetime) -> Tuple[_SlotIndex, List[int], Dict[int, Tuple[int, int]]]:
+        self._sync()
+        index = self._index(restaurant_id)
+        first, end = self._span(start)
+        for day in {first // 1440, (end - 1) // 1440}:
+            if day not in index.days:
+                self._load(restaurant_id, index, day * 1440, (day + 1) * 1440)
+                index.days.add(day)
+        slots = list(range(first, end, self.slot_minutes))
+        return index, slots, index.booked_in(first, end)
+
+    # -- queries -----------------------------------------------------------
+
+    def is_available(self, restaurant_id: str, start: datetime, party_size: int) -> bool:
+        with self._lock:
+            index, slots, rows = self._rows(restaurant_id, start)
+            return all(rows.get(s, (0, 0))[0] + party_size <= index.seats for s in slots)
+
+    def next_available(self, restaurant_id: str, start: datetime, party_size: int,
+                       within_minutes: int = 120) -> Optional[datetime]:
+        """Earliest start at or after `start` (same slot grid) with room for the party."""
+        step = timedelta(minutes=self.slot_minutes)
+        t = start
+        while t <= start + timedelta(minutes=within_minutes):
+            if self.is_available(restaurant_id, t, party_size):
+                return t
+            t += step
+        return None
+
+    # -- bookings ----------------------------------------------------------
+
+    def book(self, restaurant_id: str, start: datetime, party_size: int) -> str:
+        """Book one table; returns the confirmation id."""
+        return self.book_many([(restaurant_id, start, party_size)])[0]
+
+    def book_many(self, requests: List[Tuple[str, datetime, int]]) -> List[str]:
+        """
+        Book several tables atomically: either every request is confirmed or
+        none is. Raises ValueError if any request does not fit.
+        """
+        for attempt in range(self.max_retries):
+            plan = self._plan(requests)
+            try:
+                return self._commit(requests, plan)
+            except _StaleIndex:
+                with self._lock:
+                    self.conflicts += 1
+                    for (rid, slot), _ in plan.items():
+                        self._load(rid, self._index(rid), slot, slot + 1)
+        raise TimeoutError(f"Booking gave up after {self.max_retries} concurrent conflicts")
+
+    def _plan(self, requests: List[Tuple[str, datetime, int]]) -> Dict[Tuple[str, int], Tuple[int, int, int, int]]:
+        """(restaurant, slot) -> (seats to add, expected booked, expected version, capacity)."""
+        if any(party_size <= 0 for _, _, party_size in requests):
+            raise ValueError("party_size must be positive")
+        adds: Dict[Tuple[str, int], int] = defaultdict(int)
+        expected: Dict[Tuple[str, int], Tuple[int, int]] = {}
+        seats: Dict[str, int] = {}
+        with self._lock:
+            for rid, start, party_size in requests:
+                index, slots, rows = self._rows(rid, start)
+                seats[rid] = index.seats
+                for s in slots:
+                    adds[(rid, s)] += party_size
+                    expected[(rid, s)] = rows.get(s, (0, 0))
+        for (rid, s), add in adds.items():
+            if expected[(rid, s)][0] + add > seats[rid]:
+                when = _EPOCH + s * _MINUTE
+                raise ValueError(f"No table for this party at {rid} around {when:%Y-%m-%d %H:%M}")
+        return {k: (add, *expected[k], seats[k[0]]) for k, add in adds.items()}
+
+    def _commit(self, requests, plan) -> List[str]:
+        conn = self._conn()
+        ids = [f"RES-{uuid.uuid4().hex[:8].upper()}" for _ in requests]
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for (rid, slot), (add, booked, version, capacity) in plan.items():
+                if version == 0:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO slots (restaurant_id, slot, booked, version) VALUES (?, ?, 0, 0)",
+                        (rid, slot),
+                    )
+                cur = conn.execute(
+                    "UPDATE slots SET booked = booked + ?, version = version + 1 "
+                    "WHERE restaurant_id = ? AND slot = ? AND version = ? AND booked + ? <= ?",
+                    (add, rid, slot, version, add, capacity),
+                )
+                if cur.rowcount != 1:
+                    raise _StaleIndex()
+            conn.executemany(
+                "INSERT INTO reservations (confirmation_id, restaurant_id, start, party_size, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(cid, rid, (start - _EPOCH) // _MINUTE, size, now)
+                 for cid, (rid, start, size) in zip(ids, requests)],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        with self._lock:
+            for (rid, slot), (add, booked, version, _) in plan.items():
+                index = self._index(rid)
+                if index.rows.get(slot, (0, 0))[1] <= version:
+                    index.put(slot, booked + add, version + 1)
+        return ids
+
+
+_engine: Optional[ReservationEngine] = None
+_engine_lock = threading.Lock()
+
+def get_reservation_engine() -> ReservationEngine:
+    """
+    Process-wide engine used by ReservationTool, built on first use (so
+    importing the tool opens no database) on `default_db_path()`.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = ReservationEngine()
+    return _engine
+
+def set_reservation_engine(engine: ReservationEngine):
+    """Point ReservationTool at another engine / database (call at startup)."""
+    global _engine
+    with _engine_lock:
+        _engine = engine
+
+def __getattr__(name):
+    # Backwards-compatible `reservation.reservation_engine`
+    if name == "reservation_engine":
+        return get_reservation_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 class ReservationInput(ToolInput):
-    date:       str = Field(..., description="YYYY-MM-DD")
-    time:       str = Field(..., description="HH:MM")
-    party_size: int = Field(..., description="Number of guests")
+    date:          str = Field(..., description="YYYY-MM-DD")
+    time:          str = Field(..., description="HH:MM")
+    party_size:    int = Field(..., gt=0, description="Number of guests")
+    restaurant_id: str = Field("default", description="Restaurant unique ID")
 
 class ReservationOutput(ToolOutput):
     confirmation_id: str = Field(..., description="Reservation confirmation code")
-    status:          str = Field(..., description="e.g. confirmed, pending")
+    status:          str = Field(..., description="e.g. confirmed, unavailable")
+    suggested_time:  Optional[str] = Field(None, description="Next free HH:MM when unavailable")
 
 @register_tool
 class ReservationTool(BaseTool):
     name = "reservation"
     description = "Create a reservation for a given date, time, and party size."
+    version = "1.1.0"
     input_model = ReservationInput
     output_model = ReservationOutput
+    cacheable = False  # every call books a table
+    stateless = True
+    trusted = True
 
     def execute(self, input: ReservationInput) -> ReservationOutput:
-        # TODO: hook into your real reservation backend
-        return ReservationOutput(confirmation_id="RES-123456", status="confirmed")
+        start = parse_start(input.date, input.time)
+        engine = get_reservation_engine()
+        try:
+            cid = engine.book(input.restaurant_id, start, input.party_size)
+        except ValueError:
+            alt = engine.next_available(input.restaurant_id, start, input.party_size)
+            return ReservationOutput(confirmation_id="", status="unavailable",
+                                     suggested_time=alt.strftime("%H:%M") if alt else None)
+        return ReservationOutput(confirmation_id=cid, status="confirmed")
@@ -0,0 +1,136 @@
+# autoagent/tools/executor.py
+
+import atexit
+import logging
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class ToolQueueFull(RuntimeError):
+    """The tool executor has no free slot: the call was never started."""
+
+class ToolExecutor:
+    """
+    Process-wide worker pool for tool execution.
+
+    Threads serve ordinary (I/O-bound) tools; an optional process pool serves
+    tools marked `cpu_bound`. At most `max_queue` calls may be queued or
+    running at once: further submissions block (backpressure) and raise
+    ToolQueueFull if no slot frees up within `block_timeout` seconds.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: int = 256,
+                 process_workers: int = 0, block_timeout: Optional[float] = 30.0):
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.max_queue = max_queue
+        self.process_workers = process_workers
+        self.block_timeout = block_timeout
+        self._threads = ThreadPoolExecutor(self.max_workers, thread_name_prefix="autoagent-tool")
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(max_queue)
+        self._lock = threading.Lock()
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(self.process_workers or os.cpu_count())
+            return self._processes
+
+    def runs_in_process(self, cpu_bound: bool) -> bool:
+        """Whether a call with this `cpu_bound` flag lands on the process pool."""
+        return bool(cpu_bound and self.process_workers)
+
+    def submit(self, fn: Callable, *args: Any, cpu_bound: bool = False, block: bool = True) -> Future:
+        """
+        Queue `fn(*args)`. CPU-bound work goes to the process pool when one is
+        configured (`process_workers > 0`); `fn` and args must then be picklable.
+        With `block=False` a full queue raises ToolQueueFull immediately.
+        """
+        acquired = self._slots.acquire(timeout=self.block_timeout) if block else self._slots.acquire(False)
+        if not acquired:
+            raise ToolQueueFull(f"Tool queue full ({self.max_queue} pending calls)")
+        try:
+            pool = self._process_pool() if self.runs_in_process(cpu_bound) else self._threads
+            future = pool.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        self._threads.shutdown(wait=wait, cancel_futures=cancel_futures)
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+_executor: Optional[ToolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ToolExecutor:
+    """Shared executor used by run_tool, async_execute and batch_execute."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ToolExecutor()
+                atexit.register(_executor.shutdown, False)
+    return _executor
+
+def configure_executor(**kwargs: Any) -> ToolExecutor:
+    """
+    Replace the shared executor, e.g. at app startup:
+    configure_executor(max_workers=64, max_queue=1024, process_workers=4)
+    Calls already queued on the previous executor are allowed to finish.
+    """
+    global _executor
+    with _executor_lock:
+        old, _executor = _executor, ToolExecutor(**kwargs)
+        atexit.register(_executor.shutdown, False)
+    if old is not None:
+        old.shutdown(wait=False)
+    return _executor
+
+
+def _isolated_entry(conn, fn: Callable, args: tuple):
+    try:
+        result = (True, fn(*args))
+    except BaseException as exc:
+        result = (False, exc)
+    try:
+        conn.send(result)
+    except Exception as exc:  # unpicklable result or exception
+        conn.send((False, RuntimeError(f"{type(exc).__name__}: {exc}")))
+    finally:
+        conn.close()
+
+def run_isolated(fn: Callable, *args: Any, timeout: Optional[float] = None) -> Any:
+    """
+    Run `fn(*args)` in a dedicated child process that is killed if it
+    overruns `timeout`, so the deadline really bounds latency and no worker
+    stays busy afterwards. `fn`, args and the result must be picklable.
+    """
+    method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+    ctx = mp.get_context(method)
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_isolated_entry, args=(child_conn, fn, args), daemon=True)
+    proc.start()
+    child_conn.close()
+    try:
+        if not parent_conn.poll(timeout):
+            raise TimeoutError(f"isolated call exceeded {timeout}s")
+        ok, value = parent_conn.recv()
+    except EOFError:
+        raise RuntimeError(f"isolated process exited with code {proc.exitcode}") from None
+    finally:
+        if proc.is_alive():
+            proc.kill()
+        proc.join()
+        parent_conn.close()
+    if not ok:
+        raise value
+    return value
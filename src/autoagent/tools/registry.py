@@ -1,13 +1,129 @@
 # autoagent/tools/registry.py
 
-import pkg_resources
-from typing import Dict, Type
-from .base import BaseTool
+import importlib
+import threading
+from collections.abc import MutableMapping
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Type
+
+if TYPE_CHECKING:
+    from .base import BaseTool
+
+BUILTIN_PACKAGE = __name__.rsplit(".", 1)[0] + ".builtin_tools"
+
+
+class ToolRegistry(MutableMapping):
+    """
+    Mapping of tool name → tool class that imports tools on first use.
+
+    `register_lazy(name, "pkg.module:Class", **metadata)` records a tool's
+    name and metadata without importing it; the module is imported the first
+    time the tool is looked up. Tools registered with `@register_tool` are
+    stored directly. Entry-point plugins (group 'autoagent_tools', entry-point
+    name = tool name) and modules dropped into builtin_tools/ outside the
+    manifest are discovered the first time a name is missing or the registry
+    is listed.
+    """
+
+    def __init__(self):
+        self._classes: Dict[str, Type["BaseTool"]] = {}
+        self._lazy: Dict[str, str] = {}
+        self.metadata: Dict[str, Dict[str, Any]] = {}
+        self._discovered = False
+        self._lock = threading.RLock()
+
+    def register_lazy(self, name: str, target: str, **metadata: Any):
+        """Declare a tool by import path; an existing registration wins."""
+        with self._lock:
+            if name not in self._classes and name not in self._lazy:
+                self._lazy[name] = target
+                self.metadata[name] = metadata
+
+    def __setitem__(self, name: str, tool_cls: Type["BaseTool"]):
+        with self._lock:
+            self._classes[name] = tool_cls
+            self._lazy.pop(name, None)
+            self.metadata[name] = {
+                "description": getattr(tool_cls, "description", ""),
+                "version": getattr(tool_cls, "version", None),
+                "tags": list(getattr(tool_cls, "tags", [])),
+                "categories": list(getattr(tool_cls, "categories", [])),
+            }
+
+    def __delitem__(self, name: str):
+        with self._lock:
+            if self._classes.pop(name, None) is None and self._lazy.pop(name, None) is None:
+                raise KeyError(name)
+            self.metadata.pop(name, None)
+
+    def __getitem__(self, name: str) -> Type["BaseTool"]:
+        tool_cls = self._classes.get(name)
+        if tool_cls is not None:
+            return tool_cls
+        if name not in self._lazy:
+            self.discover()
+        target = self._lazy.get(name)
+        if target is None:
+            if name in self._classes:
+                return self._classes[name]
+            raise KeyError(name)
+        # Import outside the lock: the module's @register_tool calls back in
+        self._import(name, target)
+        return self._classes[name]
+
+    def _import(self, name: str, target: str):
+        module_name, _, attr = target.partition(":")
+        module = importlib.import_module(module_name)
+        if name in self._classes:
+            return  # registered itself via @register_tool
+        from .base import BaseTool
+        plugin = getattr(module, attr, None) if attr else None
+        if not (isinstance(plugin, type) and issubclass(plugin, BaseTool)):
+            raise ImportError(f"'{target}' does not provide tool '{name}'")
+        self[name] = plugin
+
+    def __contains__(self, name: object) -> bool:
+        if name in self._classes or name in self._lazy:
+            return True
+        self.discover()
+        return name in self._classes or name in self._lazy
+
+    def __iter__(self) -> Iterator[str]:
+        self.discover()
+        return iter(list(self._classes) + [n for n in self._lazy if n not in self._classes])
+
+    def __len__(self) -> int:
+        self.discover()
+        return len(set(self._classes) | set(self._lazy))
+
+    def load(self, names: Iterable[str]) -> Dict[str, Type["BaseTool"]]:
+        """Import and return only the named tools (e.g. the tools of one flow)."""
+        return {name: self[name] for name in names}
+
+    def discover(self):
+        """Lazily register entry-point plugins and unlisted builtin modules (once)."""
+        # importlib.metadata and pkgutil are slow to import; only pay on discovery
+        import pkgutil
+        from importlib.metadata import entry_points
+
+        with self._lock:
+            if self._discovered:
+                return
+            self._discovered = True
+            for ep in entry_points(group="autoagent_tools"):
+                self.register_lazy(ep.name, ep.value)
+            listed = {t.partition(":")[0] for t in self._lazy.values()}
+            listed.update(getattr(c, "__module__", "") for c in self._classes.values())
+        builtin = importlib.import_module(BUILTIN_PACKAGE)
+        for _, module_name, _ in pkgutil.iter_modules(builtin.__path__):
+            qualified = f"{BUILTIN_PACKAGE}.{module_name}"
+            if qualified not in listed:
+                importlib.import_module(qualified)
+
 
 # Global registry mapping tool names → tool classes
-tool_registry: Dict[str, Type[BaseTool]] = {}
+tool_registry = ToolRegistry()
 
-def register_tool(tool_cls: Type[BaseTool]) -> Type[BaseTool]:
+def register_tool(tool_cls: Type["BaseTool"]) -> Type["BaseTool"]:
     """
     Decorator to register a tool class in the global registry.
     Reads name, version, tags, categories from class attributes.
@@ -17,9 +133,3 @@ def register_tool(tool_cls: Type[BaseTool]) -> Type[BaseTool]:
         raise ValueError("Tool class must have a `name` attribute.")
     tool_registry[name] = tool_cls
     return tool_cls
-
-# Plugin discovery via setuptools entry‐point 'autoagent_tools'
-for ep in pkg_resources.iter_entry_points('autoagent_tools'):
-    plugin = ep.load()
-    if isinstance(plugin, type) and issubclass(plugin, BaseTool):
-        register_tool(plugin)
@@ -2,75 +2,159 @@
 
 import time
 import asyncio
+import functools
 import logging
-from typing import Any, Dict
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
-from pydantic import ValidationError
+from typing import Any, Dict, Tuple, Type, Union
+from concurrent.futures import TimeoutError
+from pydantic import BaseModel, ValidationError
 
 from .registry import tool_registry
-from .base import ToolInput, ToolOutput, BaseTool
+from .base import ToolInput, ToolOutput, BaseTool, CancellationToken
+from .executor import ToolQueueFull, get_executor, run_isolated
+from autoagent.telemetry.tracing import propagate, span, traced
 
 logger = logging.getLogger(__name__)
 
+# Shared instances of tools declared `stateless`
+_instances: Dict[Type[BaseTool], BaseTool] = {}
+
+def get_tool_instance(tool_cls: Type[BaseTool]) -> BaseTool:
+    """Reuse one instance of stateless tools; build a fresh one otherwise."""
+    if not getattr(tool_cls, "stateless", False):
+        return tool_cls()
+    tool = _instances.get(tool_cls)
+    if tool is None:
+        # A race here just builds a spare instance; setdefault keeps one
+        tool = _instances.setdefault(tool_cls, tool_cls())
+    return tool
+
+def validate_input(tool: BaseTool, input_data: Any) -> ToolInput:
+    """Validate raw input against the tool's input model (pydantic v2 path)."""
+    if isinstance(input_data, tool.input_model):
+        return input_data
+    return tool.input_model.model_validate(input_data)
+
+def dump_output(tool: BaseTool, raw_output: Any) -> Dict[str, Any]:
+    """
+    Serialise a tool result to a dict. Output of tools marked `trusted` is
+    dumped as-is; anything else is re-validated against `output_model` first,
+    catching tools that return dicts or loosely built models.
+    """
+    if tool.trusted and isinstance(raw_output, BaseModel):
+        return raw_output.model_dump()
+    # one validation and one dump; a model's fields are validated from its
+    # __dict__, since model_validate passes instances through unchecked
+    data = raw_output.__dict__ if isinstance(raw_output, BaseModel) else raw_output
+    return tool.output_model.model_validate(data).model_dump()
+
+def _approx_units(input_data: Any) -> int:
+    """
+    Rough payload size for logs, without serialising the whole input. Not
+    bytes: one unit per character of keys and str/bytes values, per element
+    of list/dict values, and 8 per other value.
+    """
+    if isinstance(input_data, BaseModel):
+        input_data = input_data.__dict__
+    if not isinstance(input_data, dict):
+        return len(str(input_data))
+    size = 0
+    for key, value in input_data.items():
+        size += len(key) + (len(value) if isinstance(value, (str, bytes, list, dict)) else 8)
+    return size
+
+def resolve_tool(tool: Union[str, Type[BaseTool]]) -> Tuple[str, Type[BaseTool]]:
+    """
+    A registered tool name, or a tool class the caller already resolved
+    (e.g. from a flow's sub-registry, which may differ from the global one).
+    """
+    if isinstance(tool, str):
+        tool_cls = tool_registry.get(tool)
+        if not tool_cls:
+            raise ValueError(f"Tool '{tool}' not found.")
+        return tool, tool_cls
+    return tool.name, tool
+
 # Simple ACL hook (override in your app)
 def acl_check(tool: BaseTool, tenant_id: str = None) -> bool:
     # Example: deny if tenant_id not allowed
     return True
 
 
+def _span_attributes(tool_name: Union[str, Type[BaseTool]], *args, **kwargs) -> Dict[str, Any]:
+    return {"tool": tool_name if isinstance(tool_name, str) else tool_name.name}
+
+
+@traced("tool.run", attributes=_span_attributes)
 def run_tool(
-    tool_name: str,
+    tool_name: Union[str, Type[BaseTool]],
     input_data: Dict[str, Any],
     timeout: float = None,
     tenant_id: str = None
 ) -> Dict[str, Any]:
     """
     Lookup and execute a registered tool with schema validation,
-    timeout, ACL check, and logging/metrics.
+    timeout, ACL check, and logging/metrics. `tool_name` may also be
+    the tool class itself.
     """
-    tool_cls = tool_registry.get(tool_name)
-    if not tool_cls:
-        raise ValueError(f"Tool '{tool_name}' not found.")
+    tool_name, tool_cls = resolve_tool(tool_name)
 
-    tool: BaseTool = tool_cls()
+    tool: BaseTool = get_tool_instance(tool_cls)
     if not acl_check(tool, tenant_id):
         raise PermissionError(f"Tenant '{tenant_id}' not allowed to use {tool_name}.")
 
-    start_ts = time.time()
+    start_ts = time.perf_counter()
     # Validate input
     try:
-        parsed_input: ToolInput = tool.input_model.parse_obj(input_data)
+        parsed_input: ToolInput = validate_input(tool, input_data)
     except ValidationError as ve:
         logger.error("Input validation failed for %s: %s", tool_name, ve)
         raise
 
-    # Execute with optional timeout
+    # Execute with optional timeout. Process-isolated tools are killed when it
+    # fires; thread-based tools get their cancellation token set.
+    token = CancellationToken()
     try:
-        if timeout:
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(tool.execute, parsed_input)
-                raw_output: ToolOutput = future.result(timeout=timeout)
+        if tool.isolation == "process":
+            raw_output: ToolOutput = run_isolated(tool.execute_with_token, parsed_input, None, timeout=timeout)
+        elif timeout or tool.cpu_bound:
+            executor = get_executor()
+            if executor.runs_in_process(tool.cpu_bound):
+                fn, call_token = tool.execute_with_token, None
+            else:
+                fn, call_token = propagate(tool.execute_with_token), token  # keep span parents
+            future = executor.submit(fn, parsed_input, call_token, cpu_bound=tool.cpu_bound)
+            try:
+                raw_output = future.result(timeout=timeout)
+            except TimeoutError:
+                future.cancel()
+                raise
         else:
-            raw_output = tool.execute(parsed_input)
+            raw_output = tool.execute_with_token(parsed_input, token)
+    except ToolQueueFull:
+        # backpressure: the tool never started, so nothing to cancel
+        logger.warning("Tool %s rejected: executor queue full", tool_name)
+        raise
     except TimeoutError:
+        token.cancel()
         logger.error("Tool %s timed out after %ss", tool_name, timeout)
         raise TimeoutError(f"Tool '{tool_name}' execution timed out.")
     except Exception as exc:
         logger.exception("Tool %s execution failed: %s", tool_name, exc)
         raise
 
-    duration = time.time() - start_ts
-    logger.info(
-        "Tool %s v%s executed in %.3fs (input_size=%d bytes)",
-        tool.name, getattr(tool, "version", "?"), duration,
-        len(str(input_data).encode('utf-8'))
-    )
+    result = dump_output(tool, raw_output)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Tool %s v%s executed in %.3fs (input~%d units)",
+            tool.name, getattr(tool, "version", "?"), time.perf_counter() - start_ts,
+            _approx_units(input_data)
+        )
 
-    return raw_output.dict()
+    return result
 
 
 async def run_tool_async(
-    tool_name: str,
+    tool_name: Union[str, Type[BaseTool]],
     input_data: Dict[str, Any],
     timeout: float = None,
     tenant_id: str = None
@@ -78,36 +162,60 @@ async def run_tool_async(
     """
     Async version of run_tool using tool.async_execute.
     """
-    tool_cls = tool_registry.get(tool_name)
-    if not tool_cls:
-        raise ValueError(f"Tool '{tool_name}' not found.")
+    with span("tool.run", **_span_attributes(tool_name)):
+        return await _run_tool_async(tool_name, input_data, timeout, tenant_id)
+
+
+async def _run_tool_async(
+    tool_name: Union[str, Type[BaseTool]],
+    input_data: Dict[str, Any],
+    timeout: float,
+    tenant_id: str
+) -> Dict[str, Any]:
+    tool_name, tool_cls = resolve_tool(tool_name)
 
-    tool: BaseTool = tool_cls()
+    tool: BaseTool = get_tool_instance(tool_cls)
     if not acl_check(tool, tenant_id):
         raise PermissionError(f"Tenant '{tenant_id}' not allowed to use {tool_name}.")
 
-    start_ts = time.time()
-    parsed_input = tool.input_model.parse_obj(input_data)
+    start_ts = time.perf_counter()
+    try:
+        parsed_input = validate_input(tool, input_data)
+    except ValidationError as ve:
+        logger.error("Input validation failed for %s: %s", tool_name, ve)
+        raise
 
     # Async execute with timeout
+    token = CancellationToken()
     try:
-        coro = tool.async_execute(parsed_input)
-        if timeout:
-            raw_output: ToolOutput = await asyncio.wait_for(coro, timeout)
+        if tool.isolation == "process":
+            loop = asyncio.get_running_loop()
+            raw_output: ToolOutput = await loop.run_in_executor(None, propagate(functools.partial(
+                run_isolated, tool.execute_with_token, parsed_input, None, timeout=timeout
+            )))
         else:
-            raw_output: ToolOutput = await coro
+            if tool.supports_cancellation:
+                coro = tool.async_execute(parsed_input, token)
+            else:
+                coro = tool.async_execute(parsed_input)
+            if timeout:
+                raw_output = await asyncio.wait_for(coro, timeout)
+            else:
+                raw_output = await coro
     except asyncio.TimeoutError:
+        token.cancel()
         logger.error("Tool %s async timed out after %ss", tool_name, timeout)
         raise TimeoutError(f"Tool '{tool_name}' async execution timed out.")
     except Exception as exc:
         logger.exception("Tool %s async execution failed: %s", tool_name, exc)
         raise
 
-    duration = time.time() - start_ts
-    logger.info(
-        "Tool %s v%s async executed in %.3fs (input_size=%d bytes)",
-        tool.name, getattr(tool, "version", "?"), duration,
-        len(str(input_data).encode('utf-8'))
-    )
+    result = dump_output(tool, raw_output)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Tool %s v%s async executed in %.3fs (input~%d units)",
+            tool.name, getattr(tool, "version", "?"), time.perf_counter() - start_ts,
+            _approx_units(input_data)
+        )
 
-    return raw_output.dict()
+    return result
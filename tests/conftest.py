@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("FERNET_SECRET", Fernet.generate_key().decode())
+
+# the fake OpenAI server lives with the benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks"))
+
+
+@pytest.fixture
+def fake_server():
+    """A local fake OpenAI server with no injected latency; yields (server, base_url)."""
+    from fake_openai_server import start_fake_server
+    server, url = start_fake_server(latency_ms=0, jitter_ms=0)
+    yield server, url
+    server.shutdown()
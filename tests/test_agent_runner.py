@@ -0,0 +1,66 @@
+import asyncio
+import os
+
+import pytest
+from cryptography.fernet import Fernet
+
+from autoagent.config.llm_config import BaseConfig, TenantConfig, UserConfig
+from autoagent.executor.agent_runner import AgentRunner
+from autoagent.llm.client import LLMClient
+
+DELTAS = ["The kitchen ", "closes ", "at ten."]
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    monkeypatch.setattr(LLMClient, "chat", lambda self, messages, **kwargs: "".join(DELTAS))
+    monkeypatch.setattr(LLMClient, "stream_chat", lambda self, messages, **kwargs: iter(DELTAS))
+    fernet = Fernet(os.environ["FERNET_SECRET"].encode())
+    runner = AgentRunner(BaseConfig(fernet.encrypt(b"sk-fake").decode(), model="fake-model"), {})
+    runner.start_session("s", TenantConfig(False), UserConfig(False), {"qa": {"agent_type": "cot"}})
+    return runner
+
+
+def drain(stream):
+    parts = []
+    while True:
+        try:
+            parts.append(next(stream))
+        except StopIteration as stop:
+            return parts, stop.value
+
+
+def test_stream_message_yields_deltas_and_records_the_turn(runner):
+    parts, result = drain(runner.stream_message("s", "When do you close?", "qa"))
+    assert parts == DELTAS
+    assert result["status"] == "complete"
+    assert result["answer"] == "The kitchen closes at ten."
+    assert runner.convo_mgr.get_llm_history("s") == [
+        {"role": "user", "content": "When do you close?"},
+        {"role": "assistant", "content": "The kitchen closes at ten."},
+    ]
+
+
+def test_pause_stops_the_stream_mid_answer(runner):
+    stream = runner.stream_message("s", "When do you close?", "qa")
+    assert next(stream) == "The kitchen "
+    runner.convo_mgr.pause("s")
+    parts, result = drain(stream)
+    assert parts == [] and result["status"] == "paused"
+    # only what was delivered is recorded
+    assert runner.convo_mgr.get_llm_history("s")[-1] == {"role": "assistant", "content": "The kitchen"}
+    assert runner.handle_message("s", "Hello?", "qa") == {"answer": None, "status": "paused"}
+
+
+def test_astream_message_yields_the_same_deltas(runner):
+    async def consume():
+        return [d async for d in runner.astream_message("s", "When do you close?", "qa")]
+
+    assert asyncio.run(consume()) == DELTAS
+    assert len(runner.convo_mgr.get_llm_history("s")) == 2
+
+
+def test_handle_message_records_each_turn_once(runner):
+    for question in ("When do you close?", "And on Sunday?"):
+        assert runner.handle_message("s", question, "qa")["answer"] == "The kitchen closes at ten."
+    assert [m["role"] for m in runner.convo_mgr.get_llm_history("s")] == ["user", "assistant"] * 2
@@ -0,0 +1,67 @@
+import asyncio
+import os
+
+import pytest
+from cryptography.fernet import Fernet
+
+from autoagent.config.llm_config import BaseConfig, TenantConfig, UserConfig
+from autoagent.executor.agent_runner import AgentRunner
+from autoagent.telemetry import tracing
+from autoagent.telemetry.profiling import RequestProfiler
+
+
+@pytest.fixture
+def runner(fake_server):
+    _, url = fake_server
+    fernet = Fernet(os.environ["FERNET_SECRET"].encode())
+    base_cfg = BaseConfig(fernet.encrypt(b"sk-fake").decode(), model="fake-model", base_url=url)
+    profiler = RequestProfiler(threshold_ms=0)
+    tracing.enable("memory")
+    tracing.recorder.clear()
+    runner = AgentRunner(base_cfg, {}, profiler=profiler)
+    runner.start_session("s", TenantConfig(False, tenant_id="t"), UserConfig(False), {"qa": {"agent_type": "cot"}})
+    yield runner
+    tracing.disable()
+    profiler.close()
+
+
+def drain(stream):
+    parts = []
+    while True:
+        try:
+            parts.append(next(stream))
+        except StopIteration as stop:
+            return "".join(parts), stop.value
+
+
+def check_profiled(runner, result):
+    stages = result["trace"][-1]["stages"]["stages"]
+    assert {"agent_runner.stream_message", "agent_runner.prepare_turn", "llm.call"} <= set(stages)
+    report = runner.profiler.reports()[-1]
+    assert report["labels"]["stream"] is True
+    names = {s["name"] for s in tracing.recorder.spans()}
+    assert "agent_runner.stream_message" in names
+
+
+def test_stream_message_is_traced_and_profiled(runner):
+    text, result = drain(runner.stream_message("s", "hello", "qa"))
+    assert text and result["status"] == "complete"
+    check_profiled(runner, result)
+    assert runner.profiler.requests == 1
+
+
+def test_astream_message_is_profiled_across_threads(runner):
+    async def consume():
+        return [d async for d in runner.astream_message("s", "hello", "qa")]
+
+    assert asyncio.run(consume())
+    assert runner.profiler.requests == 1
+    assert runner.profiler.reports()[-1]["stages"]["agent_runner.stream_message"]["count"] == 1
+
+
+def test_abandoned_stream_still_closes_its_profile(runner):
+    stream = runner.stream_message("s", "hello", "qa")
+    next(stream)
+    stream.close()
+    assert runner.profiler.requests == 1
+    assert runner.profiler.reports()[-1]["error"] is None
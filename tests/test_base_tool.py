@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from autoagent.tools.base import BaseTool, ToolInput, ToolOutput
+
+
+class EchoOutput(ToolOutput):
+    text: str
+
+
+class AsyncEcho(BaseTool):
+    name = "async_echo"
+    description = "Echo, natively async."
+    output_model = EchoOutput
+
+    async def async_execute(self, input, cancel_token=None):
+        await asyncio.sleep(0)
+        return EchoOutput(text="ok")
+
+
+def test_tool_without_execute_is_rejected():
+    with pytest.raises(TypeError, match="execute or async_execute"):
+        class Empty(BaseTool):
+            name = "empty"
+
+
+def test_async_only_tool_runs_from_sync_code():
+    assert AsyncEcho().execute(ToolInput()).text == "ok"
+
+
+def test_async_only_tool_runs_inside_a_running_loop():
+    async def caller():
+        return AsyncEcho().execute(ToolInput())  # sync call from a coroutine
+
+    assert asyncio.run(caller()).text == "ok"
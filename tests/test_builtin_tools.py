@@ -0,0 +1,24 @@
+import importlib
+import inspect
+import pkgutil
+
+from autoagent.tools import builtin_tools
+from autoagent.tools.base import BaseTool
+from autoagent.tools.builtin_tools import BUILTIN_TOOLS
+
+
+def test_manifest_matches_tool_classes():
+    for name, (target, description, categories) in BUILTIN_TOOLS.items():
+        module, _, attr = target.partition(":")
+        cls = getattr(importlib.import_module(f"{builtin_tools.__name__}.{module}"), attr)
+        assert cls.name == name
+        assert cls.description == description, name
+        assert list(getattr(cls, "categories", [])) == categories, name
+
+
+def test_every_builtin_tool_is_in_the_manifest():
+    for info in pkgutil.iter_modules(builtin_tools.__path__):
+        module = importlib.import_module(f"{builtin_tools.__name__}.{info.name}")
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if issubclass(cls, BaseTool) and cls is not BaseTool and cls.__module__ == module.__name__:
+                assert cls.name in BUILTIN_TOOLS, cls.name
@@ -0,0 +1,46 @@
+from autoagent.config.encryption import encrypt_value, secret_cache
+from autoagent.config.llm_config import BaseConfig, TenantConfig, UserConfig
+from autoagent.config.llm_resolver import ConfigResolver
+
+
+def configs():
+    base = BaseConfig(encrypt_value("sk-base"), model="m",
+                      endpoints=[{"base_url": "http://backup/v1", "encrypted_api_key": encrypt_value("sk-backup")},
+                                 {"base_url": "http://shared/v1"}])
+    tenant = TenantConfig(True, encrypt_value("sk-tenant"), tenant_id="t1")
+    return base, tenant, UserConfig(False, user_id="u1")
+
+
+def test_cached_entries_hold_no_plaintext_keys():
+    resolver = ConfigResolver()
+    base, tenant, user = configs()
+    tenant.update(encrypted_api_key=None)  # inherit the founder's key and endpoints
+    first = resolver.resolve(base, tenant, user)
+    second = resolver.resolve(base, tenant, user)
+    assert resolver.hits == 1
+    assert first == second
+    assert second["api_key"] == "sk-base"
+    assert [ep.get("api_key") for ep in second["endpoints"]] == ["sk-backup", None]
+    assert "sk-" not in repr(resolver._cache)
+
+
+def test_hit_fetches_key_after_cache_clear_and_rotation():
+    resolver = ConfigResolver()
+    base, tenant, user = configs()
+    assert resolver.resolve(base, tenant, user)["api_key"] == "sk-tenant"
+    secret_cache.clear()
+    assert resolver.resolve(base, tenant, user)["api_key"] == "sk-tenant"
+    tenant.update(encrypted_api_key=encrypt_value("sk-rotated"))
+    assert resolver.resolve(base, tenant, user)["api_key"] == "sk-rotated"
+
+
+def test_sdk_client_cache_holds_no_plaintext_keys():
+    from autoagent.llm import client as client_module
+
+    llm = client_module.LLMClient("sk-secret-123", model="fake-model", base_url="http://127.0.0.1:9/v1")
+    assert llm.client.api_key == "sk-secret-123"
+    cached = client_module._sdk_clients["http://127.0.0.1:9/v1"]
+    assert cached.api_key != "sk-secret-123"
+    assert "sk-secret-123" not in repr(list(client_module._sdk_clients.items()))
+    # the per-key copy shares the cached client's connection pool
+    assert llm.client._client is cached._client
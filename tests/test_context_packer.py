@@ -0,0 +1,58 @@
+import pytest
+
+from autoagent.rag.context_packer import ContextPacker
+from autoagent.rag.vector_store import FAISSStore
+
+
+def test_overlapping_windows_from_one_source_are_merged():
+    passages = [
+        {"source": "terrace.md", "text": "The terrace opens in May and closes in late September each year.", "score": 0.9},
+        {"source": "terrace.md", "text": "closes in late September each year. Heaters are out on cold nights.", "score": 0.4},
+        {"source": "other.md", "text": "closes in late September each year.", "score": 0.2},
+    ]
+    _, packed = ContextPacker().pack(passages)
+    assert [p["source"] for p in packed] == ["terrace.md", "other.md"]
+    assert packed[0]["text"] == ("The terrace opens in May and closes in late September each year. "
+                                 "Heaters are out on cold nights.")
+    assert packed[0]["score"] == 0.9
+
+
+def test_smaller_passage_fills_in_for_one_that_overflows():
+    passages = [
+        {"source": "long.md", "text": "Our full wine list changes with the seasons. " * 10, "score": 0.9},
+        {"source": "short.md", "text": "Corkage is fifteen euros.", "score": 0.5},
+    ]
+    context, packed = ContextPacker(token_budget=40).pack(passages)
+    assert [p["source"] for p in packed] == ["short.md"]
+    assert context == "[short.md] Corkage is fifteen euros."
+    assert sum(p["tokens"] for p in packed) <= 40
+
+
+NEAR = {"source": "near.md", "text": "The kitchen closes at ten on weekdays."}
+FAR = {"source": "far.md", "text": "Parking is available behind the building."}
+
+
+def store_hits():
+    faiss = pytest.importorskip("faiss")
+    store = FAISSStore(faiss.IndexFlatL2(2))
+    store.add([[0.0, 0.0], [5.0, 5.0]], [FAR, NEAR])
+    return store.query([4.0, 4.0], top_k=2)
+
+
+def test_nearest_store_hit_survives_a_tight_budget():
+    hits = store_hits()
+    assert [h["source"] for h in hits] == ["near.md", "far.md"]
+    packer = ContextPacker(token_budget=15)  # room for one passage only
+    context, packed = packer.pack(hits)
+    assert [p["source"] for p in packed] == ["near.md"]
+    assert NEAR["text"] in context
+
+
+def test_reranked_store_hits_keep_their_relevance_order():
+    # a reranker replaces the distance with a relevance and drops the marker
+    hits = store_hits()
+    for hit, relevance in zip(hits, (0.1, 0.9)):
+        hit["score"] = relevance
+        del hit["distance"]
+    _, packed = ContextPacker(token_budget=15).pack(hits)
+    assert [p["source"] for p in packed] == ["far.md"]
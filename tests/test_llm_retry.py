@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from autoagent.llm.client import LLMClient
+
+CHAT = "/v1/chat/completions"
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def client(url, **retry):
+    return LLMClient("sk-fake", model="fake-model", base_url=url, retry={"base_delay": 0, **retry})
+
+
+def test_retry_after_is_honoured(fake_server):
+    server, url = fake_server
+    server.options.rate_limit_rate = 1.0
+    server.options.retry_after = 0.3
+    start = time.perf_counter()
+    with pytest.raises(Exception) as info:
+        client(url, max_retries=1).chat(MESSAGES)
+    assert getattr(info.value, "status_code", None) == 429
+    assert time.perf_counter() - start >= 0.3
+    assert server.stats[CHAT] == 2
+
+
+def test_retries_stop_at_max_retries(fake_server):
+    server, url = fake_server
+    server.options.error_rate = 1.0
+    with pytest.raises(Exception) as info:
+        client(url, max_retries=2).chat(MESSAGES)
+    assert getattr(info.value, "status_code", None) == 500
+    assert server.stats[CHAT] == 3
+
+
+def test_client_errors_are_not_retried(fake_server):
+    server, url = fake_server
+    server.options.error_rate = 1.0
+    server.options.error_status = 400
+    with pytest.raises(Exception) as info:
+        client(url, max_retries=3).chat(MESSAGES)
+    assert getattr(info.value, "status_code", None) == 400
+    assert server.stats[CHAT] == 1
+
+
+def test_slow_call_is_hedged(fake_server):
+    server, url = fake_server
+    server.options.latency_ms = 300
+    assert client(url, hedge_after=0.05).chat(MESSAGES)
+    assert server.stats[CHAT] == 2
+
+
+def test_stream_is_not_hedged(fake_server):
+    server, url = fake_server
+    server.options.latency_ms = 300
+    assert "".join(client(url, hedge_after=0.05).stream_chat(MESSAGES))
+    assert server.stats[CHAT] == 1
+
+
+@pytest.fixture
+def second_server():
+    from fake_openai_server import start_fake_server
+    server, url = start_fake_server(latency_ms=0, jitter_ms=0)
+    yield server, url
+    server.shutdown()
+
+
+def failover_client(primary_url, backup_url, **retry):
+    from autoagent.llm.router import EndpointRouter
+    return LLMClient("sk-fake", model="fake-model", base_url=primary_url, router=EndpointRouter(),
+                     endpoints=[{"base_url": backup_url}], retry={"base_delay": 5, **retry})
+
+
+def test_failover_and_retries_share_one_budget(fake_server, second_server):
+    (primary, url), (backup, backup_url) = fake_server, second_server
+    primary.options.error_rate = backup.options.error_rate = 1.0
+    with pytest.raises(Exception):
+        failover_client(url, backup_url, max_retries=2, base_delay=0).chat(MESSAGES)
+    assert primary.stats.get(CHAT, 0) + backup.stats.get(CHAT, 0) == 3
+
+
+def test_failover_does_not_back_off(fake_server, second_server):
+    (primary, url), (backup, backup_url) = fake_server, second_server
+    primary.options.error_rate = 1.0
+    client = failover_client(url, backup_url, max_retries=0)
+    start = time.perf_counter()
+    for _ in range(3):
+        assert client.chat(MESSAGES)
+    assert time.perf_counter() - start < 2.0  # base_delay=5 would show
+    assert backup.stats[CHAT] == 3
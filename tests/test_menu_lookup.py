@@ -0,0 +1,40 @@
+import pytest
+
+from autoagent.tools.builtin_tools.menu_lookup import MenuCatalog, MenuLookupInput, MenuLookupTool, menu_catalog
+
+MENU = [{"item_name": "Latte", "price": 3.5}, {"item_name": "Cappuccino", "price": 3.8, "available": False}]
+
+
+def test_exact_and_fuzzy_matches():
+    catalog = MenuCatalog()
+    catalog.load("r1", MENU)
+    assert catalog.lookup("r1", " latte! ")["price"] == 3.5
+    assert catalog.lookup("r1", "capucino")["item_name"] == "Cappuccino"
+    assert catalog.lookup("r1", "Bagel") is None
+
+
+def test_fuzzy_memo_is_bounded():
+    catalog = MenuCatalog(fuzzy_cache_size=3)
+    catalog.load("r1", MENU)
+    for i in range(10):
+        catalog.lookup("r1", f"latte {i}x")
+    assert len(catalog._fuzzy) == 3
+
+
+def test_loader_is_called_once_per_ttl():
+    calls = []
+    catalog = MenuCatalog(loader=lambda rid: calls.append(rid) or MENU)
+    catalog.lookup_many("r1", ["Latte", "Cappuccino"])
+    catalog.lookup("r1", "Latte")
+    assert calls == ["r1"]
+
+
+def test_unconfigured_catalog_fails_loudly():
+    with pytest.raises(RuntimeError, match="no loader"):
+        MenuCatalog().lookup("r1", "Latte")
+
+
+def test_missing_item_has_no_price():
+    menu_catalog.load("test-r", MENU)
+    out = MenuLookupTool().execute(MenuLookupInput(restaurant_id="test-r", item_name="Bagel"))
+    assert (out.found, out.price) == (False, None)
@@ -0,0 +1,60 @@
+from autoagent.llm.agents.rag_agent import RAGAgent
+from autoagent.rag.prefetch import RetrievalPrefetcher, query_similarity
+from autoagent.rag.retrievers.base_retriever import BaseRetriever
+from autoagent.rag.retrievers.contextual_rag import ContextualRAG
+
+
+class RecordingRetriever(BaseRetriever):
+    def __init__(self):
+        self.queries = []
+
+    def retrieve(self, query, top_k=5):
+        self.queries.append(query)
+        return [{"source": f"doc-for:{query}", "text": query}]
+
+
+class CannedLLM:
+    def chat(self, messages, **kwargs):
+        return "It has coconut milk and chillies."
+
+
+def rag_agent(retriever):
+    agent = RAGAgent({"api_key": "sk-fake", "model": "fake-model"}, {}, retriever=retriever, prefetch=True)
+    agent.llm = CannedLLM()
+    return agent
+
+
+def test_similarity_calibration():
+    assert query_similarity("What's in the chicken curry?", "Is the chicken curry spicy?") >= 0.4
+    assert query_similarity("What's the price of the latte?", "What's the price of the croissant?") < 0.4
+    assert query_similarity("What's in the latte?", "What time do you close on Sunday?") == 0.0
+
+
+def test_prefetcher_matches_on_key_not_query():
+    pf = RetrievalPrefetcher(RecordingRetriever())
+    pf.schedule("chicken curry with coconut milk and chillies", match_text="what's in the chicken curry")
+    assert pf.take("when do you open on sunday") is None
+    assert pf.take("is the chicken curry spicy") is not None
+
+
+def test_off_topic_follow_up_misses_with_contextual_rag():
+    base = RecordingRetriever()
+    agent = rag_agent(ContextualRAG(base))
+    agent.session_state = {}
+    first = agent.run("What's in the chicken curry?")
+    history = [{"role": "user", "content": "What's in the chicken curry?"},
+               {"role": "assistant", "content": first["answer"]}]
+
+    second = agent.run("What time do you close on Sunday?", context=history)
+    assert {"prefetch": "miss"} in second["trace"]
+    # retrieved for real, with ContextualRAG's history-prefixed query
+    assert any(q.startswith("What's in the chicken curry?") and q.endswith("Sunday?") for q in base.queries)
+
+
+def test_same_topic_follow_up_hits():
+    base = RecordingRetriever()
+    agent = rag_agent(base)
+    agent.session_state = {}
+    agent.run("What's in the chicken curry?")
+    second = agent.run("Is the chicken curry spicy?")
+    assert {"prefetch": "hit"} in second["trace"]
@@ -0,0 +1,36 @@
+from autoagent.llm.client import LLMClient
+from autoagent.llm.rate_limit import RateLimiter
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+def test_idle_lanes_are_pruned():
+    limiter = RateLimiter(prune_interval=0)
+    for i in range(50):
+        limiter.acquire(f"t{i}", "sk", 0, tenant_limits={"max_in_flight": 2}).release()
+    busy = limiter.acquire("busy", "sk", 0, tenant_limits={"max_in_flight": 2})
+    limiter.acquire("busy", "sk", 0, tenant_limits={"max_in_flight": 2}).release()
+    assert len(limiter._lanes) == 1  # only the tenant still holding a permit
+    busy.release()
+
+
+def test_lanes_owing_tokens_are_kept_until_refilled():
+    limiter = RateLimiter(prune_interval=0)
+    limiter.acquire("t", "sk", 600, tenant_limits={"tpm": 6000}).release()
+    limiter.acquire("other", "sk", 0).release()
+    assert len(limiter._lanes) == 1  # dropping it now would forgive the 600 tokens
+    lane = limiter._lanes["tenant:t"]
+    lane.tokens.stamp -= 60  # a minute later the bucket is full again
+    limiter.acquire("other", "sk", 0).release()
+    assert len(limiter._lanes) == 0
+
+
+def test_stream_permit_is_settled(fake_server):
+    _, url = fake_server
+    limiter = RateLimiter()
+    client = LLMClient("sk-fake", model="fake-model", base_url=url, tenant_id="t",
+                       rate_limits={"tpm": 100000}, rate_limiter=limiter)
+    text = "".join(client.stream_chat(MESSAGES, max_tokens=4000))
+    bucket = limiter._lanes["tenant:t"].tokens
+    # charged the estimate of what was sent and received, not the 4000 reserved
+    assert 100000 - bucket.level < 100 + len(text)
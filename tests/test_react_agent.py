@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+from autoagent.llm.agents.react_agent import ReActAgent, _ToolResultCache
+from autoagent.telemetry import tracing
+from autoagent.tools.base import BaseTool, ToolInput, ToolOutput
+
+
+class EchoInput(ToolInput):
+    text: str
+
+
+class EchoOutput(ToolOutput):
+    text: str
+    calls: int
+
+
+class FlowMenuLookup(BaseTool):
+    """Shares its name with the builtin menu_lookup, but is not registered."""
+    name = "menu_lookup"
+    description = "flow-specific"
+    input_model = EchoInput
+    output_model = EchoOutput
+    calls = 0
+
+    def execute(self, input):
+        FlowMenuLookup.calls += 1
+        return EchoOutput(text=f"flow:{input.text}", calls=FlowMenuLookup.calls)
+
+
+class CachedEcho(FlowMenuLookup):
+    name = "cached_echo"
+    cacheable = True
+
+
+def agent(tools, **kwargs):
+    config = {"api_key": "sk-fake", "model": "fake-model", "base_url": "http://127.0.0.1:9/v1"}
+    a = ReActAgent(config, tools, **kwargs)
+    a.session_state = {}
+    return a
+
+
+def test_runs_the_flows_tool_class_not_the_global_one():
+    a = agent({"menu_lookup": FlowMenuLookup})
+    [(result, cached, _)] = a.call_tools([{"action": "menu_lookup", "input": {"text": "latte"}}])
+    assert result["text"] == "flow:latte" and not cached
+
+
+def test_tools_are_not_memoised_unless_cacheable():
+    a = agent({"menu_lookup": FlowMenuLookup, "cached_echo": CachedEcho})
+    call = [{"action": "menu_lookup", "input": {"text": "x"}}]
+    first, second = a.call_tools(call)[0], a.call_tools(call)[0]
+    assert not second[1] and second[0]["calls"] == first[0]["calls"] + 1
+
+    call = [{"action": "cached_echo", "input": {"text": "x"}}]
+    first, second = a.call_tools(call)[0], a.call_tools(call)[0]
+    assert second[1] and second[0] == first[0]
+
+
+def test_tool_cache_is_bounded_and_expires():
+    cache = _ToolResultCache(maxsize=2, ttl=0.05)
+    for i in range(3):
+        cache.put(("t", str(i)), i)
+    assert cache.get(("t", "0")) == (False, None)
+    assert cache.get(("t", "2")) == (True, 2)
+    time.sleep(0.06)
+    assert cache.get(("t", "2")) == (False, None)
+
+
+class TracedEcho(FlowMenuLookup):
+    name = "traced_echo"
+
+    def execute(self, input):
+        with tracing.span("test.inside_tool"):
+            return super().execute(input)
+
+
+def test_react_turn_traces_tool_runs():
+    a = agent({"traced_echo": TracedEcho})
+    replies = iter(['{"action": "traced_echo", "input": {"text": "x"}}',
+                    '{"action": "final_answer", "output": "done"}'])
+    a.llm.chat = lambda messages, **kwargs: next(replies)
+    tracing.enable("memory")
+    tracing.recorder.clear()
+    try:
+        assert a.run("q")["answer"] == "done"
+        spans = {s["name"]: s for s in tracing.recorder.spans()}
+    finally:
+        tracing.disable()
+    run = spans["tool.run"]
+    assert run["attributes"] == {"tool": "traced_echo"}
+    # execute ran on a pool thread, but its spans still nest under tool.run
+    assert spans["test.inside_tool"]["parent_id"] == run["span_id"]
+    assert run["trace_id"] == spans["test.inside_tool"]["trace_id"]
+
+
+def test_call_tools_inside_a_running_loop():
+    a = agent({"menu_lookup": FlowMenuLookup})
+
+    async def from_async_code():
+        return a.call_tools([{"action": "menu_lookup", "input": {"text": "y"}}])
+
+    [(result, _, _)] = asyncio.run(from_async_code())
+    assert result["text"] == "flow:y"
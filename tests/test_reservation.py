@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from autoagent.tools.builtin_tools import reservation
+from autoagent.tools.builtin_tools.reservation import ReservationEngine, _StaleIndex
+
+SEVEN = datetime(2030, 6, 1, 19, 0)
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "reservations.db")
+
+
+def test_full_slot_is_not_double_booked(db):
+    engine = ReservationEngine(db, default_seats=4)
+    engine.book("r1", SEVEN, 4)
+    with pytest.raises(ValueError):
+        engine.book("r1", SEVEN, 1)
+    assert not engine.is_available("r1", SEVEN, 1)
+    assert engine.next_available("r1", SEVEN, 1) == datetime(2030, 6, 1, 20, 30)
+
+
+def test_concurrent_bookings_never_overbook(db):
+    engine = ReservationEngine(db, default_seats=10)
+
+    def attempt(_):
+        try:
+            engine.book("r1", SEVEN, 3)
+            return True
+        except ValueError:
+            return False
+
+    with ThreadPoolExecutor(8) as pool:
+        assert sum(pool.map(attempt, range(16))) == 3
+
+
+def test_other_processes_bookings_are_seen(db):
+    # two engines on one database stand in for two worker processes
+    first, second = ReservationEngine(db, default_seats=6), ReservationEngine(db, default_seats=6)
+    assert second.is_available("r1", SEVEN, 4)  # second's index now holds the empty slots
+    first.book("r1", SEVEN, 4)
+    assert not second.is_available("r1", SEVEN, 4)
+    assert second.next_available("r1", SEVEN, 4) == datetime(2030, 6, 1, 20, 30)
+    with pytest.raises(ValueError):
+        second.book("r1", SEVEN, 4)
+    second.book("r1", SEVEN, 2)
+    assert not first.is_available("r1", SEVEN, 1)
+
+
+def test_stale_index_is_detected_by_version(db):
+    first, second = ReservationEngine(db, default_seats=6), ReservationEngine(db, default_seats=6)
+    request = [("r1", SEVEN, 4)]
+    plan = second._plan(request)  # read before the other writer commits
+    first.book("r1", SEVEN, 4)
+    with pytest.raises(_StaleIndex):
+        second._commit(request, plan)
+
+
+def test_book_many_is_all_or_nothing(db):
+    engine = ReservationEngine(db, default_seats=4)
+    with pytest.raises(ValueError):
+        engine.book_many([("r1", SEVEN, 2), ("r2", SEVEN, 5)])
+    assert engine.is_available("r1", SEVEN, 4)
+
+
+def test_default_engine_is_lazy(tmp_path, monkeypatch):
+    monkeypatch.setenv("AUTOAGENT_DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.delenv("AUTOAGENT_RESERVATIONS_DB", raising=False)
+    monkeypatch.setattr(reservation, "_engine", None)
+    assert not (tmp_path / "data").exists()
+    engine = reservation.reservation_engine
+    assert engine is reservation.get_reservation_engine()
+    engine.book("r1", SEVEN, 2)
+    assert (tmp_path / "data" / "reservations.db").exists()
@@ -0,0 +1,76 @@
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from autoagent.executor.runner_pool import RunnerPool
+
+
+class EchoRunner:
+    """Stands in for AgentRunner; records the order turns ran in."""
+
+    def __init__(self):
+        self.seen = []
+
+    def start_session(self, session_id, *args):
+        pass
+
+    def handle_message(self, session_id, user_message, flow_name):
+        if user_message == "lock":
+            return {"answer": threading.Lock()}
+        if user_message == "child":
+            p = multiprocessing.get_context("spawn").Process(target=time.sleep, args=(0.01,))
+            p.start()
+            p.join()
+            return {"answer": p.exitcode}
+        time.sleep(0.01)
+        self.seen.append((session_id, user_message))
+        return {"answer": [m for s, m in self.seen if s == session_id]}
+
+
+def echo_runner():
+    return EchoRunner()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with RunnerPool(echo_runner, workers=1, threads_per_worker=4) as p:
+        yield p
+
+
+def test_turns_of_a_session_run_in_order(pool):
+    futures = [pool.submit("handle_message", "s", str(i), "qa") for i in range(20)]
+    assert futures[-1].result(10)["answer"] == [str(i) for i in range(20)]
+
+
+def test_burst_does_not_block_other_sessions(pool):
+    burst = [pool.submit("handle_message", "busy", str(i), "qa") for i in range(50)]
+    start = time.perf_counter()
+    pool.handle_message("other", "x", "qa", timeout=10)
+    assert time.perf_counter() - start < 0.3
+    for f in burst:
+        f.result(10)
+
+
+def test_unpicklable_reply_fails_the_call(pool):
+    with pytest.raises(TypeError, match="not picklable"):
+        pool.handle_message("s2", "lock", "qa", timeout=10)
+
+
+def test_unpicklable_argument_raises_in_caller(pool):
+    with pytest.raises(TypeError):
+        pool.submit("handle_message", "s3", threading.Lock(), "qa")
+
+
+def test_workers_can_start_processes(pool):
+    assert pool.handle_message("s4", "child", "qa", timeout=30) == {"answer": 0}
+
+
+def test_drain_finishes_submitted_turns():
+    p = RunnerPool(echo_runner, workers=2).start()
+    futures = [p.submit("handle_message", f"d{i % 3}", str(i), "qa") for i in range(12)]
+    p.shutdown(drain=True, timeout=30)
+    assert all(f.exception() is None for f in futures)
+    with pytest.raises(RuntimeError):
+        p.submit("handle_message", "d0", "late", "qa")
@@ -0,0 +1,51 @@
+import pytest
+
+from autoagent.executor.sandbox import SandboxPool
+
+
+@pytest.fixture(scope="module")
+def pool():
+    p = SandboxPool(size=1)
+    yield p
+    p.shutdown()
+
+
+def test_builtins_changes_do_not_leak_between_runs(pool):
+    first = pool.run("import builtins\nbuiltins.print = lambda *a: None\nbuiltins.leaked = 1\nlen = None")
+    assert first["ok"]
+    second = pool.run("print('leaked' in __builtins__, len([1]))")
+    assert second["stdout"] == "False 1\n"
+
+
+def test_imported_modules_are_dropped(pool):
+    pool.run("import colorsys")
+    assert pool.run("import sys\nprint('colorsys' in sys.modules)")["stdout"] == "False\n"
+
+
+@pytest.fixture
+def limited_pool():
+    p = SandboxPool(size=1, cpu_seconds=1, memory_mb=256, wall_timeout=20)
+    yield p
+    p.shutdown()
+
+
+def test_cpu_limit_kills_a_busy_loop_and_the_pool_recovers(limited_pool):
+    result = limited_pool.run("while True:\n    pass")
+    assert not result["ok"]
+    assert "CPU or memory limit" in result["error"]
+    assert limited_pool.run("print(1 + 1)")["stdout"] == "2\n"
+
+
+def test_memory_limit_fails_a_large_allocation_cleanly(limited_pool):
+    result = limited_pool.run("blob = bytearray(1024 ** 3)")
+    assert not result["ok"]
+    assert "MemoryError" in result["error"]
+    assert limited_pool.run("print('alive')")["stdout"] == "alive\n"
+
+
+def test_snippet_is_retried_when_the_idle_worker_crashed(limited_pool):
+    idle = limited_pool._idle.queue[0]
+    idle.process.kill()
+    idle.process.join()
+    result = limited_pool.run("print('retried')")
+    assert result["ok"] and result["stdout"] == "retried\n"
@@ -0,0 +1,60 @@
+import types
+
+from autoagent.llm.agents import self_refine_agent
+from autoagent.llm.agents.self_refine_agent import SelfRefineAgent
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+class ScriptedLLM:
+    """Replies with `reply(n)` for the n-th call, advancing the clock by `draft_cost`, then `call_cost` per call."""
+
+    def __init__(self, clock, draft_cost, call_cost, reply):
+        self.clock = clock
+        self.costs = iter([draft_cost])
+        self.call_cost = call_cost
+        self.reply = reply
+        self.calls = 0
+
+    def chat(self, messages, **kwargs):
+        self.clock.now += next(self.costs, self.call_cost)
+        self.calls += 1
+        return self.reply(self.calls)
+
+
+def agent(monkeypatch, llm, **params):
+    clock = llm.clock
+    monkeypatch.setattr(self_refine_agent, "time", types.SimpleNamespace(perf_counter=clock.perf_counter))
+    refine = SelfRefineAgent({"api_key": "sk-fake", "model": "fake-model"}, {}, **params)
+    refine.llm = llm
+    return refine
+
+
+def test_llm_calls_are_counted_not_inferred(monkeypatch):
+    # the critique says REVISE, the refinement is a new answer: two calls per iteration
+    reply = lambda n: "VERDICT: REVISE needs work" if n % 2 == 0 else f"answer {'x' * n * 40}"
+    llm = ScriptedLLM(FakeClock(), 1, 1, reply)
+    result = agent(monkeypatch, llm, iterations=2).run("q")
+    assert result["trace"][-1]["llm_calls"] == llm.calls == 5
+
+    llm = ScriptedLLM(FakeClock(), 1, 1, lambda n: "VERDICT: OK")
+    result = agent(monkeypatch, llm, iterations=3, merge_steps=True).run("q")
+    assert result["trace"][-1]["llm_calls"] == llm.calls == 2
+
+
+def test_latency_budget_uses_measured_iteration_time(monkeypatch):
+    # a fast draft (1s) then slow iterations (10s each) against a 29s budget:
+    # averaging over elapsed time would allow a third iteration and end at 31s
+    reply = lambda n: f"VERDICT: REVISE\n{'y' * n * 40}"
+    llm = ScriptedLLM(FakeClock(), 1, 10, reply)
+    result = agent(monkeypatch, llm, iterations=5, merge_steps=True, max_latency=29).run("q")
+    summary = result["trace"][-1]
+    assert summary["stopped"] == "latency_budget"
+    assert summary["llm_calls"] == 3
+    assert llm.clock.now <= 29
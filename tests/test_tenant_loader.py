@@ -0,0 +1,56 @@
+import itertools
+import os
+import time
+
+import pytest
+
+from autoagent.config.tenant_loader import TenantLoader
+from autoagent.executor.session_router import FlowSpec
+from autoagent.tools.registry import ToolRegistry
+
+FLOW = "flows:\n  qa:\n    agent_type: cot\n"
+_stamps = itertools.count(int(time.time()))
+
+
+def write(path, text):
+    path.write_text(text)
+    # mtimes can be coarse; give every write a distinct one
+    stamp = next(_stamps)
+    os.utime(path, (stamp, stamp))
+
+
+def test_duplicate_tenant_id_is_rejected(tmp_path):
+    write(tmp_path / "a.yaml", "tenant_id: shared\n" + FLOW)
+    write(tmp_path / "b.yaml", "tenant_id: shared\n" + FLOW)
+    loader = TenantLoader(str(tmp_path), watch=False)
+    assert loader.get("shared").path.endswith("a.yaml")
+    assert "already defined" in loader.errors[str(tmp_path / "b.yaml")]
+
+    # once the first file goes away, the other one may claim the id
+    (tmp_path / "a.yaml").unlink()
+    loader.reload()
+    assert loader.get("shared").path.endswith("b.yaml")
+    assert not loader.errors
+
+
+def test_watcher_reloads_off_the_request_path(tmp_path):
+    write(tmp_path / "t.yaml", FLOW)
+    loader = TenantLoader(str(tmp_path), check_interval=0.05)
+    try:
+        assert loader.get("t").tenant_cfg.version == 0
+        write(tmp_path / "t.yaml", FLOW + "llm:\n  model: gpt-4o\n")
+        deadline = time.monotonic() + 5
+        while loader.get("t").tenant_cfg.version == 0 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert loader.get("t").tenant_cfg.model == "gpt-4o"
+    finally:
+        loader.close()
+
+
+def test_flow_tools_are_imported_on_first_use():
+    registry = ToolRegistry()
+    registry.register_lazy("ghost", "autoagent_missing_module:GhostTool")
+    spec = FlowSpec.compile("qa", {"agent_type": "cot", "tools": ["ghost"]}, registry)
+    assert spec.tool_names == ("ghost",)
+    with pytest.raises(ImportError):
+        spec.tools
@@ -0,0 +1,34 @@
+import sys
+import types
+
+import pytest
+
+from autoagent.llm import tokens
+
+
+@pytest.fixture
+def fake_tiktoken(monkeypatch):
+    module = types.ModuleType("tiktoken")
+    monkeypatch.setitem(sys.modules, "tiktoken", module)
+    tokens._encoder.cache_clear()
+    yield module
+    tokens._encoder.cache_clear()
+
+
+def test_encoding_load_failure_falls_back_to_heuristic(fake_tiktoken):
+    def offline(*args):
+        raise ConnectionError("cannot download cl100k_base")
+    fake_tiktoken.encoding_for_model = fake_tiktoken.get_encoding = offline
+    assert tokens.estimate_tokens("abcdefgh", "gpt-4") == 2
+
+
+def test_unknown_model_uses_default_encoding(fake_tiktoken):
+    class Encoding:
+        def encode(self, text, disallowed_special=()):
+            return text.split()
+
+    def for_model(model):
+        raise KeyError(model)
+    fake_tiktoken.encoding_for_model = for_model
+    fake_tiktoken.get_encoding = lambda name: Encoding()
+    assert tokens.estimate_tokens("one two <|endoftext|>", "my-model") == 3
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from autoagent.tools.base import BaseTool, ToolInput, ToolOutput
+from autoagent.tools.executor import ToolExecutor, ToolQueueFull, configure_executor, get_executor
+from autoagent.tools.tool_runner import get_tool_instance, run_tool
+
+
+class CountingTool(BaseTool):
+    """Counts how often it is built and remembers which thread ran it."""
+    name = "counting"
+    description = "Record the worker thread."
+    built = 0
+
+    def __init__(self):
+        type(self).built += 1
+        self.threads = []
+
+    def execute(self, input):
+        self.threads.append(threading.current_thread().name)
+        return ToolOutput()
+
+
+class SharedCountingTool(CountingTool):
+    stateless = True
+
+
+def test_only_stateless_tools_are_shared():
+    assert get_tool_instance(SharedCountingTool) is get_tool_instance(SharedCountingTool)
+    before = CountingTool.built
+    assert get_tool_instance(CountingTool) is not get_tool_instance(CountingTool)
+    assert CountingTool.built == before + 2
+
+
+def test_async_execute_runs_on_the_shared_pool():
+    ex = configure_executor(max_workers=2)
+    try:
+        assert get_executor() is ex is get_executor()
+        tool = CountingTool()
+        asyncio.run(tool.async_execute(ToolInput()))
+        assert tool.threads[0].startswith("autoagent-tool")
+    finally:
+        configure_executor()
+
+
+def test_full_queue_waits_for_a_slot():
+    ex = ToolExecutor(max_workers=1, max_queue=1, block_timeout=5)
+    gate = threading.Event()
+    try:
+        ex.submit(gate.wait)
+        threading.Timer(0.1, gate.set).start()
+        start = time.monotonic()
+        ex.submit(gate.is_set).result(5)
+        assert time.monotonic() - start >= 0.09  # admitted only once the first call returned
+    finally:
+        gate.set()
+        ex.shutdown()
+
+
+class SpinInput(ToolInput):
+    seconds: float = 5.0
+
+
+class SpinTool(BaseTool):
+    """Waits on its token; records whether it was cancelled."""
+    name = "spin"
+    description = "Wait until cancelled."
+    input_model = SpinInput
+    supports_cancellation = True
+    stateless = True
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+
+    def execute(self, input, cancel_token=None):
+        if cancel_token.wait(input.seconds):
+            self.cancelled.set()
+        return ToolOutput()
+
+
+@pytest.fixture
+def executor():
+    ex = configure_executor(max_workers=2, max_queue=2, block_timeout=0.05)
+    yield ex
+    configure_executor()
+
+
+def test_timeout_sets_cancellation_token(executor):
+    tool = get_tool_instance(SpinTool)  # the instance run_tool will use
+    tool.cancelled.clear()
+    with pytest.raises(TimeoutError):
+        run_tool(SpinTool, {}, timeout=0.05)
+    assert tool.cancelled.wait(2)
+
+
+def test_full_queue_is_not_reported_as_timeout(executor):
+    tool = SpinTool()
+    busy = [executor.submit(tool.execute_with_token, SpinInput(seconds=0.5)) for _ in range(2)]
+    with pytest.raises(ToolQueueFull):
+        run_tool(SpinTool, {}, timeout=1.0)
+    with pytest.raises(ToolQueueFull):
+        executor.submit(tool.execute_with_token, SpinInput(), block=False)
+    for f in busy:
+        f.result(2)
+
+
+def test_batch_timeout_cancels_items(executor):
+    tool = SpinTool()
+    results = tool.batch_execute([SpinInput(), SpinInput(seconds=0)], parallel=True, timeout=0.05)
+    assert isinstance(results[0], TimeoutError)
+    assert isinstance(results[1], ToolOutput)
+    assert tool.cancelled.wait(2)
+
+
+class PriceOutput(ToolOutput):
+    price: float
+
+
+def test_untrusted_output_is_validated_once_and_dumped():
+    from pydantic import ValidationError
+    from autoagent.tools.tool_runner import dump_output
+
+    class Loose(BaseTool):
+        name = "loose"
+        description = "Returns whatever it is given."
+        output_model = PriceOutput
+
+        def execute(self, input):
+            return input
+
+    tool = Loose()
+    assert dump_output(tool, {"price": "3.5"}) == {"price": 3.5}
+    assert dump_output(tool, PriceOutput(price=2)) == {"price": 2.0}
+    with pytest.raises(ValidationError):
+        dump_output(tool, PriceOutput.model_construct(price="free"))
@@ -0,0 +1,60 @@
+import re
+import threading
+import time
+
+from autoagent.llm.agents.tot_agent import TOTAgent
+
+_PATH = re.compile(r"^\[Path (\d+)\]")
+_PARENT = re.compile(r"Reasoning so far:\n(.*?)\n\n", re.S)
+
+
+class TreeLLM:
+    """Expansions answer `<parent>><path>` after `delay` seconds; scoring calls pop the next reply from `scores`."""
+
+    def __init__(self, scores, delay=0.0):
+        self.scores = list(scores)
+        self.delay = delay
+        self.expansions = []
+        self.lock = threading.Lock()
+
+    def chat(self, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        if "Candidate answers" in prompt:
+            return self.scores.pop(0)
+        time.sleep(self.delay)
+        parent = _PARENT.search(prompt)
+        out = _PATH.match(prompt).group(1)
+        if parent:
+            out = f"{parent.group(1)}>{out}"
+        with self.lock:
+            self.expansions.append(out)
+        return out
+
+
+def agent(llm, **params):
+    tot = TOTAgent({"api_key": "sk-fake", "model": "fake-model"}, {}, **params)
+    tot.llm = llm
+    return tot
+
+
+def test_branches_are_generated_concurrently():
+    llm = TreeLLM(["0: 0.1\n1: 0.2\n2: 0.3\n3: 0.4"], delay=0.2)
+    tot = agent(llm, branches=4, beam_width=1)
+    start = time.perf_counter()
+    result = tot.run("q")
+    assert time.perf_counter() - start < 0.6  # four 0.2s calls, not one after another
+    assert result["answer"] == "4"
+    assert len(llm.expansions) == 4
+
+
+def test_beam_keeps_the_best_paths_and_stops_at_the_threshold():
+    llm = TreeLLM([
+        "0: 0.2\n1: 0.7\n2: 0.5",
+        "0: 0.1\n1: 0.3\n4: 0.95",
+    ])
+    result = agent(llm, branches=3, beam_width=2, depth=3, score_threshold=0.9).run("q")
+    # level 2 only expands the two kept level-1 paths, three branches each
+    assert sorted(llm.expansions[3:]) == ["2>1", "2>2", "2>3", "3>4", "3>5", "3>6"]
+    assert result["answer"] == "3>5"
+    assert result["trace"][-1] == {"early_stop": 2, "score": 0.95}
+    assert len(llm.expansions) == 9  # no third level
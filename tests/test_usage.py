@@ -0,0 +1,31 @@
+from autoagent.llm.client import LLMClient
+from autoagent.llm.usage import TurnUsage, UsageRegistry
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+LABELS = {"tenant": "t", "flow": "qa", "agent": "CoTAgent"}
+
+
+def test_calls_are_recorded_per_turn_and_label(fake_server):
+    _, url = fake_server
+    registry = UsageRegistry()
+    registry.set_price("fake-model", input=1.0, output=2.0)
+    usage = TurnUsage(LABELS, registry=registry)
+    client = LLMClient("sk-fake", model="fake-model", base_url=url, usage=usage)
+    client.chat(MESSAGES)
+    "".join(client.stream_chat(MESSAGES))
+
+    summary = usage.summary()
+    assert summary["llm_calls"] == 2 and summary["errors"] == 0
+    assert summary["models"] == {"fake-model": 2}
+    chat = usage.records[0]
+    assert chat.op == "chat" and chat.prompt_tokens > 0 and chat.completion_tokens > 0
+    assert summary["cost_usd"] == round(sum(registry.cost(r) for r in usage.records), 6) > 0
+
+    rows = {row["op"]: row for row in registry.snapshot(group_by=("tenant", "op"))}
+    assert set(rows) == {"chat", "stream"}
+    assert rows["chat"]["calls"] == rows["stream"]["calls"] == 1
+    assert rows["chat"]["prompt_tokens"] == chat.prompt_tokens
+
+    text = registry.to_prometheus()
+    assert ('autoagent_llm_calls_total{tenant="t",flow="qa",agent="CoTAgent",'
+            'model="fake-model",op="chat"} 1') in text
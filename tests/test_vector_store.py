@@ -0,0 +1,54 @@
+import pytest
+
+from autoagent.rag.vector_store import ChromaStore, FAISSStore
+
+VECTORS = [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0]]
+METAS = [{"source": "a.md", "text": "alpha"}, {"source": "b.md", "text": "beta"}]
+
+
+def faiss_store():
+    faiss = pytest.importorskip("faiss")
+    store = FAISSStore(faiss.IndexFlatL2(4))
+    store.add(VECTORS, METAS)
+    return store
+
+
+def test_faiss_hits_expose_metadata_at_top_level():
+    hit = faiss_store().query([1.0, 0.0, 0.0, 0.0], top_k=1)[0]
+    assert hit["source"] == "a.md" and hit["text"] == "alpha"
+    assert hit["metadata"] == METAS[0]
+    assert hit["score"] == 0.0
+
+
+def test_faiss_drops_padding_hits():
+    # only two vectors stored: faiss pads the other three slots with id -1
+    hits = faiss_store().query([1.0, 0.0, 0.0, 0.0], top_k=5)
+    assert [h["source"] for h in hits] == ["a.md", "b.md"]
+
+
+def chroma_store():
+    chromadb = pytest.importorskip("chromadb")
+    client = chromadb.EphemeralClient()
+    name = f"test_{id(client)}"
+    return ChromaStore(client, name)
+
+
+def test_chroma_repeated_adds_append():
+    store = chroma_store()
+    store.add(VECTORS[:1], METAS[:1])
+    store.add(VECTORS[1:], METAS[1:])
+    assert store.collection.count() == 2
+    hits = store.query([0.0, 1.0, 0.0, 0.0], top_k=2)
+    assert [h["source"] for h in hits] == ["b.md", "a.md"]
+    assert hits[0]["metadata"] == METAS[1]
+
+
+def test_chroma_adds_in_client_batches(monkeypatch):
+    store = chroma_store()
+    monkeypatch.setattr(store.client, "get_max_batch_size", lambda: 1)
+    batches = []
+    add = store.collection.add
+    monkeypatch.setattr(store.collection, "add", lambda **kw: batches.append(len(kw["ids"])) or add(**kw))
+    store.add(VECTORS, METAS)
+    assert batches == [1, 1]
+    assert store.collection.count() == 2